@@ -0,0 +1,228 @@
+# agregados.py
+"""Capa de agregados por faceta de las secciones Analytics e Insights"""
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+# Facetas de valor único que cuentan Analytics e Insights
+FACETAS_AGREGADAS = [
+    "Categoría rol",
+    "Ubicación normalizada",
+    "Generación",
+    "¿Años de experiencia?",
+    "Superpoder",
+    "¿Empresa?",
+    "¿Universidad?",
+    "Área de estudio:",
+    "¿Motivación para unirte?",
+    "¿Quiere ser mentor?",
+    "¿Dar charlas o talleres?",
+    "¿Colaborar con universidades o empresas?",
+    "Ha hecho sesión de coaching?",
+    "¿Grupal o individual?",
+]
+
+COLUMNA_EXPERIENCIA = "Años experiencia num"
+
+
+class CuboAgregados:
+    """
+    Conteos por faceta del directorio, preparados una vez por versión de datos.
+
+    Cada faceta de valor único se guarda como códigos enteros por fila
+    (`pd.factorize`, en orden de aparición) y sus conteos sobre todo el
+    directorio quedan ya calculados. Los de una vista filtrada salen de un
+    `np.bincount` de los códigos de sus filas, sin materializar la vista ni
+    volver a recorrer la columna. Las facetas multi-etiqueta (industrias,
+    áreas de acción) se delegan en su MatrizMultietiqueta. Las tablas
+    cruzadas entre dos facetas cualesquiera son un producto de sus matrices
+    indicadoras dispersas (`cruce`).
+
+    Los conteos son los de `contar_valores`/`value_counts`: de mayor a menor,
+    sin nulos ni valores sin filas y con los empates en el mismo orden.
+    """
+
+    def __init__(self, df, multietiquetas=None):
+        self.n = len(df)
+        self.matrices = dict(multietiquetas or {})
+        self._codigos = {}
+        self._valores = {}
+        for columna in FACETAS_AGREGADAS:
+            if columna in df.columns:
+                codigos, valores = pd.factorize(df[columna])
+                self._codigos[columna] = codigos.astype(np.int32)
+                self._valores[columna] = np.asarray(valores, dtype=object)
+
+        self._experiencia = (
+            df[COLUMNA_EXPERIENCIA].to_numpy(dtype=float, na_value=np.nan)
+            if COLUMNA_EXPERIENCIA in df.columns else None
+        )
+
+        # Todo el directorio: los conteos que lee Insights en cada ejecución
+        self._totales = {columna: self._contar(columna, None) for columna in self._codigos}
+        self._experiencia_total = self._resumir_experiencia(None)
+
+    def __contains__(self, columna):
+        return columna in self._codigos or columna in self.matrices
+
+    def posiciones(self, filas=None):
+        """
+        Normalizar una selección de filas.
+
+        Args:
+            filas: None (todas), array de posiciones o máscara booleana
+
+        Returns:
+            Array de posiciones, o None si la selección son todas las filas
+        """
+        if filas is None:
+            return None
+        filas = np.asarray(filas)
+        if filas.dtype == bool:
+            filas = np.flatnonzero(filas)
+        return None if len(filas) == self.n else filas
+
+    def _contar(self, columna, posiciones, ordenar=True):
+        codigos = self._codigos[columna]
+        if posiciones is not None:
+            codigos = codigos[posiciones]
+        presentes = codigos[codigos >= 0]
+        cuentas = np.bincount(presentes, minlength=len(self._valores[columna]))
+        if posiciones is None:
+            orden = np.flatnonzero(cuentas)
+        else:
+            # Valores en orden de primera aparición en la vista (desempate de value_counts)
+            orden = pd.unique(presentes)
+        conteos = pd.Series(
+            cuentas[orden], index=pd.Index(self._valores[columna][orden], name=columna), name="count"
+        )
+        return conteos.sort_values(ascending=False) if ordenar else conteos
+
+    def conteos(self, columna, filas=None, ordenar=True):
+        """
+        Número de filas por valor de una faceta, de mayor a menor.
+
+        Args:
+            columna: Faceta de FACETAS_AGREGADAS o multi-etiqueta
+            filas: Selección de filas (ver `posiciones`); None = todo el directorio
+            ordenar: False para dejar los valores en orden de primera aparición
+                (solo facetas de valor único; un pie asigna así sus colores)
+
+        Returns:
+            pd.Series valor -> filas (solo valores con filas). La de todo el
+            directorio es compartida: no se modifica
+        """
+        posiciones = self.posiciones(filas)
+        if columna in self.matrices:
+            return self.matrices[columna].conteos(posiciones)
+        if posiciones is None and ordenar:
+            return self._totales[columna]
+        return self._contar(columna, posiciones, ordenar)
+
+    def distintos(self, columna, filas=None, nulos=False):
+        """
+        Número de valores distintos de una faceta en la selección.
+
+        Args:
+            nulos: Contar el nulo como un valor más si aparece (como `len(serie.unique())`)
+        """
+        distintos = len(self.conteos(columna, filas))
+        if nulos and columna in self._codigos:
+            posiciones = self.posiciones(filas)
+            codigos = self._codigos[columna] if posiciones is None else self._codigos[columna][posiciones]
+            distintos += int((codigos < 0).any())
+        return distintos
+
+    def filas_valor(self, columna, valor):
+        """Posiciones (ordenadas) de las filas con ese valor de la faceta"""
+        encontrados = np.flatnonzero(self._valores[columna] == valor)
+        if not len(encontrados):
+            return np.empty(0, dtype=np.intp)
+        return np.flatnonzero(self._codigos[columna] == encontrados[0])
+
+    def indicadora(self, columna, filas=None):
+        """
+        Matriz indicadora dispersa filas × valores de una faceta.
+
+        Las facetas de valor único tienen como mucho un 1 por fila (ninguno
+        si la fila no tiene valor); las multi-etiqueta, uno por etiqueta.
+
+        Returns:
+            (scipy.sparse.csr_matrix de las filas seleccionadas, lista de valores)
+        """
+        posiciones = self.posiciones(filas)
+        if columna in self.matrices:
+            matriz = self.matrices[columna]
+            indicadora = matriz.matriz if posiciones is None else matriz.matriz[posiciones]
+            return indicadora, matriz.etiquetas
+        codigos = self._codigos[columna]
+        if posiciones is not None:
+            codigos = codigos[posiciones]
+        con_valor = codigos >= 0
+        indptr = np.concatenate([[0], np.cumsum(con_valor)])
+        indicadora = sparse.csr_matrix(
+            (np.ones(int(indptr[-1]), dtype=np.int32), codigos[con_valor], indptr),
+            shape=(len(codigos), len(self._valores[columna])),
+        )
+        return indicadora, list(self._valores[columna])
+
+    def cruce(self, columna_filas, columna_columnas, filas=None):
+        """
+        Tabla cruzada de dos facetas con un solo producto disperso (Xᵀ·Y).
+
+        Cada celda es el número de filas que tienen a la vez los dos valores
+        (con facetas multi-etiqueta, una fila cuenta en cada etiqueta suya).
+
+        Args:
+            columna_filas: Faceta de las filas de la tabla
+            columna_columnas: Faceta de las columnas de la tabla
+            filas: Selección de filas del directorio (ver `posiciones`)
+
+        Returns:
+            pd.DataFrame de conteos, sin valores sin filas y con filas y
+            columnas de más a menos frecuentes (como `conteos`)
+        """
+        izquierda, valores_filas = self.indicadora(columna_filas, filas)
+        derecha, valores_columnas = self.indicadora(columna_columnas, filas)
+        producto = (izquierda.T @ derecha).toarray()
+        orden_filas = _orden_frecuencia(izquierda)
+        orden_columnas = _orden_frecuencia(derecha)
+        return pd.DataFrame(
+            producto[np.ix_(orden_filas, orden_columnas)],
+            index=pd.Index([valores_filas[i] for i in orden_filas], dtype=object, name=columna_filas),
+            columns=pd.Index([valores_columnas[i] for i in orden_columnas], dtype=object, name=columna_columnas),
+        )
+
+    def _resumir_experiencia(self, posiciones):
+        valores = self._experiencia if posiciones is None else self._experiencia[posiciones]
+        valores = valores[~np.isnan(valores)]
+        distintos, cuentas = np.unique(valores, return_counts=True)
+        return {
+            "conteos": pd.Series(cuentas, index=pd.Index(distintos, name=COLUMNA_EXPERIENCIA), name="count"),
+            "media": valores.mean() if len(valores) else np.nan,
+            "mediana": np.median(valores) if len(valores) else np.nan,
+        }
+
+    def experiencia(self, filas=None):
+        """
+        Distribución de los años de experiencia numéricos de la selección.
+
+        Returns:
+            dict con "conteos" (pd.Series años -> filas, por años ascendentes),
+            "media" y "mediana" (NaN si nadie tiene el dato), o None si el
+            directorio no tiene la columna
+        """
+        if self._experiencia is None:
+            return None
+        posiciones = self.posiciones(filas)
+        if posiciones is None:
+            return self._experiencia_total
+        return self._resumir_experiencia(posiciones)
+
+
+def _orden_frecuencia(indicadora):
+    """Columnas de una matriz indicadora con algún 1, de más a menos filas (empates en orden)"""
+    cuentas = np.bincount(indicadora.indices, minlength=indicadora.shape[1])
+    orden = np.argsort(-cuentas, kind="stable")
+    return orden[cuentas[orden] > 0]
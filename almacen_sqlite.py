@@ -0,0 +1,512 @@
+# almacen_sqlite.py
+"""
+Almacén opcional del directorio limpio en SQLite (modo WAL).
+
+Cada miembro es una fila de `facetas` (columnas de las facetas del
+sidebar y la experiencia, indexadas) y otra de `miembros` (el resto de
+columnas escalares del DataFrame limpio), con `posicion` = posición de la
+fila en el DataFrame. Las columnas multi-etiqueta (industrias y áreas de
+acción) van en tablas puente `(posicion, orden, valor)` indexadas por
+valor. Los filtros del sidebar solo leen la tabla estrecha de facetas, el
+listado del directorio une `miembros` solo para las filas filtradas, y las
+altas son una transacción en lugar de reescribir un archivo.
+
+Uso (importar el CSV o el Excel del directorio):
+    python almacen_sqlite.py [ORIGEN] [DESTINO]
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from data import (
+    COLUMNAS_LISTA,
+    RUTA_CSV,
+    VERSION_REGLAS,
+    cargar_snapshot,
+    guardar_snapshot,
+    leer_fuente,
+    limpiar_datos,
+    parsear_filas,
+    tipar_directorio,
+)
+from filtros import COLUMNA_EXPERIENCIA, FACETAS, desempaquetar, es_bitmap
+
+RUTA_SQLITE = Path("directorio.sqlite")
+
+# Versión del esquema de tablas: incrementar al cambiarlo (hay que volver a migrar)
+VERSION_ESQUEMA = 1
+
+# Tabla puente de cada columna multi-etiqueta
+TABLAS_MULTIETIQUETA = {
+    "Industrias normalizadas": "miembro_industria",
+    "Areas de acción normalizadas": "miembro_area_accion",
+}
+
+# Columnas de la tabla estrecha `facetas` (las únicas que leen los filtros)
+COLUMNAS_FACETAS = FACETAS + [COLUMNA_EXPERIENCIA]
+
+# Afinidad SQLite de cada tipo de columna del DataFrame limpio
+AFINIDADES = {"float": "REAL", "int": "INTEGER", "bool": "INTEGER", "texto": "TEXT"}
+
+# Columnas del listado del directorio ("Industrias" se compone desde su tabla puente)
+COLUMNAS_LISTADO = [
+    "Nombre y apellido",
+    "Correo electrónico1",
+    "Industrias",
+    "Categoría rol",
+    "¿Rol actual?",
+    "Ubicación normalizada",
+    "¿Años de experiencia?",
+    "Superpoder",
+]
+
+
+def identificador(nombre):
+    """Nombre de columna entre comillas dobles (las columnas tienen espacios, tildes y signos)"""
+    return '"' + str(nombre).replace('"', '""') + '"'
+
+
+@contextmanager
+def conectar(ruta=RUTA_SQLITE):
+    """
+    Conexión en modo autocommit (las transacciones se abren explícitamente).
+
+    Con WAL los lectores no bloquean al escritor ni al revés; `timeout`
+    hace que un alta concurrente espere al bloqueo de escritura en lugar
+    de fallar.
+    """
+    conexion = sqlite3.connect(ruta, timeout=30, isolation_level=None)
+    try:
+        conexion.execute("PRAGMA synchronous=NORMAL")
+        yield conexion
+    finally:
+        conexion.close()
+
+
+@contextmanager
+def transaccion(conexion):
+    """Transacción de escritura (BEGIN IMMEDIATE toma el bloqueo de escritura al empezar)"""
+    conexion.execute("BEGIN IMMEDIATE")
+    try:
+        yield
+    except BaseException:
+        conexion.execute("ROLLBACK")
+        raise
+    conexion.execute("COMMIT")
+
+
+def leer_meta(conexion):
+    """Metadatos del almacén: id, versión de datos, columnas y tipos"""
+    meta = dict(conexion.execute("SELECT clave, valor FROM meta"))
+    for clave in ("columnas_crudas", "columnas", "tipos"):
+        meta[clave] = json.loads(meta[clave])
+    meta["version"] = int(meta["version"])
+    return meta
+
+
+def _huella(meta):
+    return f"{meta['id'][:8]}v{meta['version']}-r{VERSION_REGLAS}"
+
+
+def huella_sqlite(ruta=RUTA_SQLITE):
+    """
+    Versión de los datos del almacén, con el mismo papel que `huella_datos` del CSV.
+
+    Combina el id del almacén (nuevo en cada migración), el contador de
+    versión (se incrementa en cada alta) y VERSION_REGLAS. Es una consulta
+    a la tabla meta: no hay que leer ni hashear los datos.
+    """
+    with conectar(ruta) as conexion:
+        return _huella(leer_meta(conexion))
+
+
+def tipo_columna(serie):
+    """Tipo de almacenamiento de una columna del DataFrame limpio"""
+    if serie.name in COLUMNAS_LISTA:
+        return "lista"
+    if serie.dtype.kind == "f":
+        return "float"
+    if serie.dtype.kind in "iu":
+        return "int"
+    if serie.dtype == object and len(serie.dropna()) and serie.dropna().map(type).eq(bool).all():
+        return "bool"
+    return "texto"
+
+
+def columnas_tabla(columnas, tabla):
+    """Columnas escalares de `columnas` que se guardan en la tabla dada"""
+    return [
+        c for c in columnas
+        if c not in COLUMNAS_LISTA and (c in COLUMNAS_FACETAS) == (tabla == "facetas")
+    ]
+
+
+def crear_esquema(conexion, df, columnas_crudas):
+    tipos = {columna: tipo_columna(df[columna]) for columna in df.columns}
+    for tabla in ("facetas", "miembros"):
+        columnas_sql = "".join(
+            f", {identificador(columna)} {AFINIDADES[tipos[columna]]}"
+            for columna in columnas_tabla(df.columns, tabla)
+        )
+        conexion.execute(f"CREATE TABLE {tabla} (posicion INTEGER PRIMARY KEY{columnas_sql})")
+    for i, columna in enumerate(columnas_tabla(df.columns, "facetas")):
+        conexion.execute(f"CREATE INDEX facetas_{i} ON facetas ({identificador(columna)})")
+
+    for columna, tabla in TABLAS_MULTIETIQUETA.items():
+        if columna in df.columns:
+            conexion.execute(
+                f"CREATE TABLE {tabla} ("
+                "posicion INTEGER NOT NULL REFERENCES miembros (posicion), "
+                "orden INTEGER NOT NULL, valor TEXT NOT NULL, PRIMARY KEY (posicion, orden))"
+            )
+            conexion.execute(f"CREATE INDEX {tabla}_valor ON {tabla} (valor, posicion)")
+
+    conexion.execute("CREATE TABLE meta (clave TEXT PRIMARY KEY, valor TEXT NOT NULL)")
+    conexion.executemany("INSERT INTO meta VALUES (?, ?)", [
+        ("version_esquema", str(VERSION_ESQUEMA)),
+        ("id", uuid.uuid4().hex),
+        ("version", "0"),
+        ("columnas_crudas", json.dumps(list(columnas_crudas))),
+        ("columnas", json.dumps(list(df.columns))),
+        ("tipos", json.dumps(tipos)),
+    ])
+
+
+def insertar_filas(conexion, df, inicio):
+    """
+    Insertar filas limpias a partir de la posición `inicio`.
+
+    Las columnas escalares van a `facetas` o a `miembros` (NaN -> NULL) y
+    cada etiqueta de las columnas multi-etiqueta a su tabla puente,
+    conservando su orden.
+    """
+    posiciones = np.arange(inicio, inicio + len(df))
+    for tabla in ("facetas", "miembros"):
+        escalares = df[columnas_tabla(df.columns, tabla)]
+        valores = escalares.astype(object).where(escalares.notna(), None)
+        marcas = ", ".join("?" * (len(escalares.columns) + 1))
+        conexion.executemany(
+            f"INSERT INTO {tabla} (posicion{''.join(', ' + identificador(c) for c in escalares.columns)}) "
+            f"VALUES ({marcas})",
+            ((int(posicion), *fila)
+             for posicion, fila in zip(posiciones, valores.itertuples(index=False, name=None))),
+        )
+    for columna, tabla in TABLAS_MULTIETIQUETA.items():
+        if columna in df.columns:
+            conexion.executemany(
+                f"INSERT INTO {tabla} (posicion, orden, valor) VALUES (?, ?, ?)",
+                ((int(posicion), orden, valor)
+                 for posicion, lista in zip(posiciones, df[columna])
+                 for orden, valor in enumerate(lista)),
+            )
+
+
+def migrar(origen=RUTA_CSV, destino=RUTA_SQLITE):
+    """
+    Crear el almacén a partir del CSV o el Excel del directorio.
+
+    Limpia los datos con limpiar_datos (mismas reglas que la app) y escribe
+    el almacén en un archivo temporal que sustituye al destino al terminar.
+
+    Returns:
+        Número de miembros importados
+    """
+    crudo = leer_fuente(origen)
+    columnas_crudas = list(crudo.columns)
+    df = tipar_directorio(limpiar_datos(crudo))
+
+    destino = Path(destino)
+    temporal = destino.with_name(destino.name + ".tmp")
+    temporal.unlink(missing_ok=True)
+    with conectar(temporal) as conexion:
+        conexion.execute("PRAGMA journal_mode=WAL")
+        with transaccion(conexion):
+            crear_esquema(conexion, df, columnas_crudas)
+            insertar_filas(conexion, df, 0)
+    os.replace(temporal, destino)
+    return len(df)
+
+
+def _restaurar_tipos(df, tipos):
+    for columna, tipo in tipos.items():
+        valores = df[columna]
+        if tipo in ("float", "int"):
+            numericos = pd.to_numeric(valores, errors="coerce")
+            if numericos.notna().sum() == valores.notna().sum():
+                entera = tipo == "int" and numericos.notna().all()
+                df[columna] = numericos.astype(np.int64 if entera else float)
+                continue
+            # Un alta guardó texto en una columna numérica: objeto, como al leer el CSV
+        elif tipo == "bool":
+            valores = valores.map({1: True, 0: False}).where(valores.isin([0, 1]), valores)
+        if tipo != "lista":
+            # sqlite3 devuelve None para NULL: mantener NaN como el CSV
+            df[columna] = valores.astype(object).where(valores.notna(), np.nan)
+    return df
+
+
+def alinear_tipos(nuevas, tipos):
+    """
+    Convertir las filas recién parseadas (texto) a los tipos guardados en el almacén.
+
+    Los valores que no encajan se quedan como texto (SQLite lo admite en
+    cualquier columna) y `_restaurar_tipos` los lee como columna de objetos.
+    """
+    for columna, tipo in tipos.items():
+        valores = nuevas[columna]
+        if tipo == "bool":
+            booleanos = valores.astype(str).str.lower().map({"true": True, "false": False})
+            nuevas[columna] = booleanos.where(booleanos.notna(), valores).astype(object)
+        elif tipo in ("float", "int"):
+            numericos = pd.to_numeric(valores, errors="coerce")
+            if numericos.notna().sum() == valores.notna().sum():
+                nuevas[columna] = numericos
+    return nuevas
+
+
+def leer_directorio(ruta=RUTA_SQLITE):
+    """
+    Leer todo el directorio limpio del almacén como DataFrame.
+
+    Mismas columnas, orden y tipos que `data.cargar_directorio` sobre la
+    fuente migrada; las listas se reconstruyen desde las tablas puente.
+    """
+    with conectar(ruta) as conexion:
+        meta = leer_meta(conexion)
+        conexion.execute("BEGIN")  # lectura consistente de todas las tablas
+        df = pd.read_sql_query(
+            "SELECT * FROM facetas JOIN miembros USING (posicion) ORDER BY posicion", conexion, index_col="posicion"
+        )
+        for columna, tabla in TABLAS_MULTIETIQUETA.items():
+            if columna in meta["columnas"]:
+                etiquetas = pd.read_sql_query(
+                    f"SELECT posicion, valor FROM {tabla} ORDER BY posicion, orden", conexion
+                )
+                listas = etiquetas.groupby("posicion", sort=False)["valor"].agg(list)
+                df[columna] = [x if isinstance(x, list) else [] for x in listas.reindex(df.index)]
+        conexion.execute("COMMIT")
+
+    df = _restaurar_tipos(df[meta["columnas"]], meta["tipos"])
+    return tipar_directorio(df.reset_index(drop=True))
+
+
+def cargar_directorio_sqlite(ruta=RUTA_SQLITE):
+    """
+    Cargar el directorio limpio del almacén, usando el snapshot Arrow si sigue siendo válido.
+
+    Igual que `data.cargar_directorio`: el snapshot se guarda con la huella
+    del almacén, así que solo se lee SQLite cuando hay un alta nueva.
+    """
+    huella = huella_sqlite(ruta)
+    df = cargar_snapshot(huella)
+    if df is not None:
+        return df
+    df = leer_directorio(ruta)
+    try:
+        guardar_snapshot(df, huella)
+    except (OSError, pa.ArrowException):
+        pass
+    return df
+
+
+def columnas_crudas(ruta=RUTA_SQLITE):
+    """Columnas de la fuente original, en su orden (la cabecera del CSV migrado)"""
+    with conectar(ruta) as conexion:
+        return leer_meta(conexion)["columnas_crudas"]
+
+
+def insertar_miembros(filas, ruta=RUTA_SQLITE, al_guardar=()):
+    """
+    Añadir miembros nuevos al almacén en una sola transacción.
+
+    Las filas se limpian como si vinieran de la fuente original (con su
+    cabecera guardada en meta) y se insertan tras la última posición; la
+    versión de datos se incrementa en la misma transacción. Las funciones
+    de `al_guardar` se llaman con (filas, huella_anterior, huella_nueva)
+    con el bloqueo de escritura aún tomado, como en `agregar_filas_csv`.
+
+    Returns:
+        Lista con el resultado de cada función de `al_guardar`
+    """
+    with conectar(ruta) as conexion:
+        with transaccion(conexion):
+            meta = leer_meta(conexion)
+            nuevas = limpiar_datos(parsear_filas(filas, meta["columnas_crudas"]))
+            nuevas = alinear_tipos(nuevas.reindex(columns=meta["columnas"]), meta["tipos"])
+            inicio, = conexion.execute("SELECT COALESCE(MAX(posicion) + 1, 0) FROM facetas").fetchone()
+            insertar_filas(conexion, nuevas, inicio)
+
+            huella_anterior = _huella(meta)
+            meta["version"] += 1
+            conexion.execute("UPDATE meta SET valor = ? WHERE clave = 'version'", (str(meta["version"]),))
+            huella_nueva = _huella(meta)
+            return [funcion(filas, huella_anterior, huella_nueva) for funcion in al_guardar]
+
+
+class MotorFiltrosSql:
+    """
+    Filtros del sidebar resueltos en SQLite, con la interfaz de `MotorFiltros`.
+
+    Cada faceta seleccionada se traduce en un `IN (...)` sobre su columna
+    indexada de `facetas` (o un `IN` sobre la tabla puente si es
+    multi-etiqueta), AND entre facetas; la memoria no depende del tamaño
+    del directorio. Las
+    restricciones (posiciones o bitmaps, p. ej. la búsqueda por rol) se
+    pasan como un array JSON.
+    """
+
+    def __init__(self, ruta=RUTA_SQLITE):
+        self.ruta = ruta
+        self._opciones = {}
+        with conectar(ruta) as conexion:
+            meta = leer_meta(conexion)
+            self.n, = conexion.execute("SELECT COUNT(*) FROM facetas").fetchone()
+            for columna in COLUMNAS_FACETAS:
+                if columna in meta["columnas"]:
+                    self._opciones[columna] = sorted(
+                        valor for valor, in conexion.execute(
+                            f"SELECT DISTINCT {identificador(columna)} FROM facetas "
+                            f"WHERE {identificador(columna)} IS NOT NULL"
+                        )
+                    )
+            for columna, tabla in TABLAS_MULTIETIQUETA.items():
+                if columna in meta["columnas"]:
+                    self._opciones[columna] = sorted(
+                        valor for valor, in conexion.execute(f"SELECT DISTINCT valor FROM {tabla}")
+                    )
+
+    def opciones(self, columna):
+        """Valores disponibles de una faceta, ordenados"""
+        return self._opciones.get(columna, [])
+
+    def _condiciones(self, selecciones, rango_experiencia=None, restricciones=(), excluida=None):
+        """
+        Cláusula WHERE (y sus parámetros) de todos los filtros activos salvo `excluida`.
+        """
+        condiciones, parametros = [], []
+        for columna, valores in selecciones.items():
+            if not valores or columna == excluida or columna not in self._opciones:
+                continue
+            marcas = ", ".join("?" * len(valores))
+            if columna in TABLAS_MULTIETIQUETA:
+                condiciones.append(
+                    f"posicion IN (SELECT posicion FROM {TABLAS_MULTIETIQUETA[columna]} WHERE valor IN ({marcas}))"
+                )
+            else:
+                condiciones.append(f"{identificador(columna)} IN ({marcas})")
+            parametros += list(valores)
+
+        if rango_experiencia is not None and COLUMNA_EXPERIENCIA in self._opciones:
+            exp_min, exp_max = rango_experiencia
+            if not all(exp_min <= v <= exp_max for v in self._opciones[COLUMNA_EXPERIENCIA]):
+                # Los perfiles sin dato de experiencia siempre se incluyen (IFNULL en
+                # lugar de OR: el planificador no cambia el recorrido por dos búsquedas)
+                condiciones.append(f"IFNULL({identificador(COLUMNA_EXPERIENCIA)} BETWEEN ? AND ?, 1)")
+                parametros += [exp_min, exp_max]
+
+        for contenedor in restricciones:
+            if es_bitmap(contenedor):
+                contenedor = np.flatnonzero(desempaquetar(contenedor, self.n))
+            condiciones.append("posicion IN (SELECT value FROM json_each(?))")
+            parametros.append(json.dumps(np.asarray(contenedor).tolist()))
+
+        return " AND ".join(condiciones) or "1", parametros
+
+    def resolver(self, selecciones, rango_experiencia=None, restricciones=()):
+        """
+        Resolver las selecciones del sidebar a posiciones de fila.
+
+        Returns:
+            Array ordenado de posiciones de las filas que cumplen todos los filtros
+        """
+        donde, parametros = self._condiciones(selecciones, rango_experiencia, restricciones)
+        with conectar(self.ruta) as conexion:
+            filas = conexion.execute(
+                f"SELECT posicion FROM facetas WHERE {donde} ORDER BY posicion", parametros
+            ).fetchall()
+        return np.array([posicion for posicion, in filas], dtype=np.intp)
+
+    def conteos_facetas(self, selecciones, rango_experiencia=None, restricciones=()):
+        """
+        Conteos por opción de cada faceta, sin aplicar los filtros de su propia faceta.
+
+        Un GROUP BY por faceta sobre la tabla de facetas (o su tabla puente).
+
+        Returns:
+            dict columna -> dict valor -> número de miembros
+        """
+        conteos = {}
+        with conectar(self.ruta) as conexion:
+            conexion.execute("BEGIN")
+            for columna, opciones in self._opciones.items():
+                if columna == COLUMNA_EXPERIENCIA:
+                    continue
+                donde, parametros = self._condiciones(selecciones, rango_experiencia, restricciones, columna)
+                if columna in TABLAS_MULTIETIQUETA:
+                    filtradas = f"WHERE posicion IN (SELECT posicion FROM facetas WHERE {donde})" if parametros else ""
+                    consulta = (
+                        f"SELECT valor, COUNT(DISTINCT posicion) FROM {TABLAS_MULTIETIQUETA[columna]} "
+                        f"{filtradas} GROUP BY valor"
+                    )
+                else:
+                    agrupada = identificador(columna)
+                    if parametros:
+                        # Con filtros, "+" descarta el índice de la propia faceta: recorrer la
+                        # tabla estrecha sale más barato que saltar de su índice a cada fila
+                        agrupada = "+" + agrupada
+                    consulta = (
+                        f"SELECT {identificador(columna)}, COUNT(*) FROM facetas "
+                        f"WHERE {agrupada} IS NOT NULL AND {donde} GROUP BY {agrupada}"
+                    )
+                conteos[columna] = dict.fromkeys(opciones, 0)
+                conteos[columna].update(conexion.execute(consulta, parametros))
+            conexion.execute("COMMIT")
+        return conteos
+
+    def listado(self, selecciones, rango_experiencia=None, restricciones=(), columnas=COLUMNAS_LISTADO):
+        """
+        Filas filtradas del directorio, solo con las columnas del listado.
+
+        "Industrias" se compone con las industrias normalizadas del miembro
+        separadas por comas ("N/A" si no tiene).
+
+        Returns:
+            DataFrame ordenado por posición
+        """
+        expresiones = []
+        for columna in columnas:
+            if columna == "Industrias":
+                expresiones.append(
+                    "COALESCE((SELECT group_concat(valor, ', ') FROM (SELECT valor FROM "
+                    f"{TABLAS_MULTIETIQUETA['Industrias normalizadas']} i WHERE i.posicion = facetas.posicion "
+                    "ORDER BY orden)), 'N/A') AS \"Industrias\""
+                )
+            else:
+                expresiones.append(identificador(columna))
+        donde, parametros = self._condiciones(selecciones, rango_experiencia, restricciones)
+        with conectar(self.ruta) as conexion:
+            return pd.read_sql_query(
+                f"SELECT {', '.join(expresiones)} FROM facetas JOIN miembros USING (posicion) "
+                f"WHERE {donde} ORDER BY posicion",
+                conexion, params=parametros,
+            )
+
+
+def main():
+    origen = Path(sys.argv[1]) if len(sys.argv) > 1 else RUTA_CSV
+    destino = Path(sys.argv[2]) if len(sys.argv) > 2 else RUTA_SQLITE
+    n = migrar(origen, destino)
+    print(f"{n:,} miembros importados de {origen} en {destino} ({destino.stat().st_size / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,15 +3,46 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
+import os
+from functools import partial
 from pathlib import Path
 import plotly.express as px
 import plotly.graph_objects as go
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 import altair as alt
-import re
 import base64
 
+from almacen_sqlite import (
+    COLUMNAS_LISTADO,
+    RUTA_SQLITE,
+    MotorFiltrosSql,
+    cargar_directorio_sqlite,
+    columnas_crudas,
+    huella_sqlite,
+    insertar_miembros,
+)
+from agregados import CuboAgregados
+from cohortes import resumen_generaciones
+from data import RUTA_CSV, agregar_filas_csv, cargar_directorio, huella_datos
+from directorio_compartido import DirectorioCompartido
+from busqueda import IndiceTrigramas, cargar_indice_bm25, mejor_fragmento
+from filtros import MotorFiltros
+from incremental import agregar_miembros
+from multietiqueta import construir_multietiquetas
+from similitud import (
+    IndiceTfidf,
+    SimilitudNumerica,
+    cargar_indice_lsa,
+    cargar_indice_tfidf,
+    filtrar_perfiles_validos_matchmaking,
+    puntuacion_hibrida,
+    umbral_matches,
+)
+from tabla_matches import TablaMatches
+from vecinos_aproximados import MIN_PERFILES_ANN, MUESTRA_UMBRAL, SONDAS_POR_DEFECTO, cargar_indice_ivf
+
+# Copy-on-write: lo que se deriva del directorio compartido entre sesiones nunca lo modifica
+pd.set_option("mode.copy_on_write", True)
+
 # --- Configuración general ---
 st.set_page_config(
     page_title="Celera Community Directory", 
@@ -307,323 +338,129 @@ def create_header(total_members, total_generations):
 load_css()
 
 # --- Cargar datos ---
-@st.cache_data
-def cargar_datos():
+# Almacén del directorio: el CSV o, con CELERA_ALMACEN=sqlite, la base SQLite
+# creada con `python almacen_sqlite.py` (filtros y listado se consultan en SQL)
+ALMACEN_SQLITE = os.environ.get("CELERA_ALMACEN", "").lower() == "sqlite"
+RUTA_ALMACEN = RUTA_SQLITE if ALMACEN_SQLITE else RUTA_CSV
+
+# Columnas de las que sale el listado de la pestaña Directorio, además de COLUMNAS_LISTADO
+COLUMNAS_FUENTE_LISTADO = ["Industrias normalizadas", "Industria trabaja", "Ubicación actual (ciudad/pais)"]
+
+def huella_actual():
+    """Versión de los datos del almacén activo (clave de todas las cachés)"""
+    return huella_sqlite(RUTA_SQLITE) if ALMACEN_SQLITE else huella_datos(RUTA_CSV)
+
+@st.cache_resource
+def cargar_datos(huella):
+    """
+    Cargar el directorio limpio (la huella invalida la caché si cambian datos o reglas).
+
+    Es el mismo objeto para todas las sesiones (sin copia por rerun): no se modifica.
+    """
     try:
-        path_csv = Path("directorio.csv.csv")
-        if path_csv.exists():
-            df = pd.read_csv(path_csv)
-            # Limpiar columnas
-            df = df.rename(columns=lambda x: x.strip() if isinstance(x, str) else x)
-            
-            # Limpiar datos
-            df = limpiar_datos(df)
-            return df
-        else:
-            st.error("No se encontró el archivo 'directorio.csv.csv'")
-            return pd.DataFrame()
+        if ALMACEN_SQLITE:
+            return cargar_directorio_sqlite(RUTA_SQLITE)
+        return cargar_directorio(RUTA_CSV)
     except Exception as e:
         st.error(f"Error cargando datos: {e}")
         return pd.DataFrame()
 
-def limpiar_datos(df):
-    """Limpiar y procesar los datos del CSV"""
-    # Limpiar nombres de columnas
-    df.columns = df.columns.str.strip()
-    
-    # Limpiar valores nulos
-    df = df.replace(['', 'nan', 'NaN', 'N/A'], np.nan)
-    
-    # Extraer generación de la primera columna
-    df['Generación'] = df.iloc[:, 0].str.extract(r'G(\d+)')[0]
-    
-    # Limpiar nombres (quitar prefijos G1, G2, etc.)
-    df['Nombre y apellido'] = df['Nombre y apellido'].str.replace(r'^G\d+\s*-\s*', '', regex=True)
-    
-    # Procesar años de experiencia
-    if '¿Años de experiencia?' in df.columns:
-        df['Años experiencia num'] = df['¿Años de experiencia?'].map({
-            '0-2 Años': 1,
-            '3-5 Años': 4,
-            '6-10 Años': 8,
-            'Más de 10 años': 15
-        })
-    
-    # ===== FASE 1: NORMALIZACIONES =====
-    
-    # 1. NORMALIZAR UBICACIONES
-    def normalizar_ubicacion(ub):
-        if pd.isna(ub):
-            return np.nan
-        ub = str(ub).strip()
-        
-        # Diccionario de normalizaciones por ciudad
-        normalizaciones = {
-            'Madrid, España': [r'madrid', r'manzanares.*madrid', r'san\s+sebastian.*reyes', r'guadalajara.*españa'],
-            'Barcelona, España': [r'barcelona'],
-            'Valencia, España': [r'valencia'],
-            'Sevilla, España': [r'sevilla'],
-            'Alicante, España': [r'alicante'],
-            'Bilbao, España': [r'bilbao'],
-            'Zaragoza, España': [r'zaragoza'],
-            'Santiago de Compostela, España': [r'santiago.*compostela', r'santiago.*galicia'],
-            'Ciudad Real, España': [r'ciudad\s*real'],
-            'Donostia, España': [r'donosti'],
-            'Berlín, Alemania': [r'berlín', r'berlin'],
-            'Londres, Reino Unido': [r'londres', r'london'],
-            'París, Francia': [r'parís', r'paris'],
-            'Copenhague, Dinamarca': [r'copenhague', r'copenhagen'],
-            'Lima, Perú': [r'lima.*per[uú]'],
-            'Sydney, Australia': [r'sydney'],
-        }
-        
-        ub_lower = ub.lower()
-        for ciudad_normalizada, patrones in normalizaciones.items():
-            for patron in patrones:
-                if re.search(patron, ub_lower):
-                    return ciudad_normalizada
-        
-        # Limpieza genérica si no coincide con ningún patrón
-        ub = re.sub(r'\s*[/\-]\s*', ', ', ub)
-        ub = re.sub(r'\s*\([^)]*\)', '', ub)
-        return ub.strip()
-    
-    if 'Ubicación actual (ciudad/pais)' in df.columns:
-        df['Ubicación normalizada'] = df['Ubicación actual (ciudad/pais)'].apply(normalizar_ubicacion)
-    
-    # 2. NORMALIZAR INDUSTRIAS (manejo de múltiples valores)
-    def normalizar_industrias(ind):
-        if pd.isna(ind):
-            return []
-        
-        # Separar por comas
-        industrias_raw = [i.strip() for i in str(ind).split(',')]
-        industrias_normalizadas = []
-        
-        for ind_raw in industrias_raw:
-            ind_lower = ind_raw.lower()
-            
-            # Categorizar cada industria
-            if any(palabra in ind_lower for palabra in ['ciencia', 'salud', 'biotech', 'biomedicina', 'médico', 'farmacéutica', 'medicina']):
-                if 'Ciencia y Salud' not in industrias_normalizadas:
-                    industrias_normalizadas.append('Ciencia y Salud')
-            elif any(palabra in ind_lower for palabra in ['tecnología', 'tech', 'software', 'producto', 'ai', 'inteligencia artificial', 'digital']):
-                if 'Tecnología y Producto' not in industrias_normalizadas:
-                    industrias_normalizadas.append('Tecnología y Producto')
-            elif any(palabra in ind_lower for palabra in ['energía', 'sostenibilidad', 'renovable', 'medio ambiente', 'clima']):
-                if 'Energía y Sostenibilidad' not in industrias_normalizadas:
-                    industrias_normalizadas.append('Energía y Sostenibilidad')
-            elif any(palabra in ind_lower for palabra in ['educación', 'educacion', 'academia', 'universidad', 'formación']):
-                if 'Educación' not in industrias_normalizadas:
-                    industrias_normalizadas.append('Educación')
-            elif any(palabra in ind_lower for palabra in ['finanzas', 'banca', 'inversión', 'inversion', 'financiero']):
-                if 'Finanzas' not in industrias_normalizadas:
-                    industrias_normalizadas.append('Finanzas')
-            elif any(palabra in ind_lower for palabra in ['consultoría', 'consultoria', 'consulting']):
-                if 'Consultoría' not in industrias_normalizadas:
-                    industrias_normalizadas.append('Consultoría')
-            elif any(palabra in ind_lower for palabra in ['emprendimiento', 'startup', 'founder']):
-                if 'Emprendimiento' not in industrias_normalizadas:
-                    industrias_normalizadas.append('Emprendimiento')
-            elif any(palabra in ind_lower for palabra in ['ingeniería', 'ingenieria', 'engineering']):
-                if 'Ingeniería' not in industrias_normalizadas:
-                    industrias_normalizadas.append('Ingeniería')
-            elif any(palabra in ind_lower for palabra in ['asuntos públicos', 'público', 'gobierno', 'administración']):
-                if 'Asuntos Públicos' not in industrias_normalizadas:
-                    industrias_normalizadas.append('Asuntos Públicos')
-            elif any(palabra in ind_lower for palabra in ['servicios profesionales', 'servicios']):
-                if 'Servicios Profesionales' not in industrias_normalizadas:
-                    industrias_normalizadas.append('Servicios Profesionales')
-            elif 'otro' not in ind_lower and 'corporate' not in ind_lower:
-                # Si no es "Otro" ni "Corporate", mantener como categoría única
-                if ind_raw not in industrias_normalizadas:
-                    industrias_normalizadas.append(ind_raw)
-        
-        return industrias_normalizadas if industrias_normalizadas else []
-    
-    if 'Industria trabaja' in df.columns:
-        df['Industrias normalizadas'] = df['Industria trabaja'].apply(normalizar_industrias)
-    
-    # 3. CATEGORIZAR ROLES
-    def categorizar_rol(rol):
-        if pd.isna(rol):
-            return 'Sin especificar'
-        
-        rol_lower = str(rol).lower()
-        
-        # Orden de prioridad en la categorización
-        if any(palabra in rol_lower for palabra in ['ceo', 'founder', 'cofundador', 'chief', 'co-founder']):
-            return 'Liderazgo Ejecutivo'
-        elif any(palabra in rol_lower for palabra in ['director', 'head of', 'subdirector']):
-            return 'Liderazgo Ejecutivo'
-        elif any(palabra in rol_lower for palabra in ['médico', 'doctor', 'residente', 'msl', 'cirujano']):
-            return 'Medicina'
-        elif any(palabra in rol_lower for palabra in ['investigador', 'researcher', 'postdoc', 'científico', 'phd']):
-            return 'Investigación'
-        elif any(palabra in rol_lower for palabra in ['profesor', 'docente', 'teacher', 'lecturer']):
-            return 'Docencia'
-        elif any(palabra in rol_lower for palabra in ['manager', 'lead', 'responsable', 'coordinador']):
-            return 'Gestión'
-        elif any(palabra in rol_lower for palabra in ['consultor', 'consultant', 'advisor', 'asesor']):
-            return 'Consultoría'
-        elif any(palabra in rol_lower for palabra in ['engineer', 'ingeniero', 'developer', 'cto', 'architect']):
-            return 'Ingeniería/Desarrollo'
-        elif any(palabra in rol_lower for palabra in ['product', 'producto']):
-            return 'Producto'
-        elif any(palabra in rol_lower for palabra in ['estudiante', 'student']):
-            return 'Estudiante'
-        elif any(palabra in rol_lower for palabra in ['analista', 'analyst', 'data']):
-            return 'Análisis'
-        elif any(palabra in rol_lower for palabra in ['policy', 'política', 'gobierno']):
-            return 'Asuntos Públicos'
-        elif any(palabra in rol_lower for palabra in ['divulgador', 'comunicación']):
-            return 'Divulgación'
-        else:
-            return 'Otro'
-    
-    if '¿Rol actual?' in df.columns:
-        df['Categoría rol'] = df['¿Rol actual?'].apply(categorizar_rol)
-    
-    # 4. PROCESAR ÁREA DE ACCIÓN (múltiples valores)
-    def procesar_areas_accion(area):
-        if pd.isna(area):
-            return []
-        
-        # Separar por comas y limpiar
-        areas = [a.strip() for a in str(area).split(',')]
-        return [a for a in areas if a]  # Filtrar vacíos
-    
-    if 'Area de acción' in df.columns:
-        df['Areas de acción normalizadas'] = df['Area de acción'].apply(procesar_areas_accion)
-    
-    return df
+@st.cache_resource
+def cargar_directorio_compartido(huella):
+    """Directorio de solo lectura del que cada sesión materializa sus vistas"""
+    return DirectorioCompartido(cargar_datos(huella))
 
-# --- Funciones auxiliares ---
-def filtrar_perfiles_validos_matchmaking(df):
-    """
-    Filtrar solo perfiles con datos mínimos necesarios para matchmaking.
-    Requisitos: Al menos tener industria O rol Y nombre completo
-    """
-    perfiles_validos = df[
-        # Debe tener nombre
-        (df["Nombre y apellido"].notna()) &
-        (df["Nombre y apellido"].str.strip() != "") &
-        # Y debe tener AL MENOS industria O rol
-        (
-            (df["Industrias normalizadas"].apply(lambda x: isinstance(x, list) and len(x) > 0)) |
-            (df["Categoría rol"].notna() & (df["Categoría rol"] != "Sin especificar"))
-        )
-    ]
-    return perfiles_validos
-
-def calcular_similitud_numerica(perfil1, perfil2):
-    """Calcular similitud basada en características numéricas"""
-    score = 0.0
-    features_count = 0
-    
-    # Similitud de experiencia (normalizado 0-1)
-    if pd.notna(perfil1.get("Años experiencia num")) and pd.notna(perfil2.get("Años experiencia num")):
-        exp1 = perfil1["Años experiencia num"]
-        exp2 = perfil2["Años experiencia num"]
-        # Usar diferencia normalizada (más cercano = más similar)
-        diff = abs(exp1 - exp2)
-        max_diff = 15  # Máxima diferencia posible
-        sim_exp = 1 - (min(diff, max_diff) / max_diff)
-        score += sim_exp
-        features_count += 1
-    
-    # Similitud de generación (generaciones cercanas tienen más afinidad)
-    if pd.notna(perfil1.get("Generación")) and pd.notna(perfil2.get("Generación")):
-        try:
-            gen1 = int(perfil1["Generación"])
-            gen2 = int(perfil2["Generación"])
-            diff_gen = abs(gen1 - gen2)
-            # Si están en la misma generación o ±1, alto score
-            if diff_gen == 0:
-                score += 1.0
-            elif diff_gen == 1:
-                score += 0.7
-            elif diff_gen == 2:
-                score += 0.4
-            else:
-                score += 0.1
-            features_count += 1
-        except:
-            pass
-    
-    return score / features_count if features_count > 0 else 0.0
+@st.cache_resource
+def cargar_multietiquetas(huella):
+    """Matrices indicadoras de industrias y áreas de acción (una vez por versión de datos)"""
+    return construir_multietiquetas(cargar_datos(huella))
 
-def crear_features_enriquecidas(row):
-    """Crear representación textual enriquecida con pesos semánticos"""
-    features = []
-    
-    # NIVEL 1: Características CORE (peso x4) - Más importantes
-    if "Industrias normalizadas" in row and isinstance(row["Industrias normalizadas"], list):
-        for _ in range(4):
-            features.extend(row["Industrias normalizadas"])
-    
-    if pd.notna(row.get("Categoría rol")):
-        categoria = str(row["Categoría rol"])
-        features.extend([categoria] * 4)
-    
-    # NIVEL 2: Características IMPORTANTES (peso x3)
-    if "Areas de acción normalizadas" in row and isinstance(row["Areas de acción normalizadas"], list):
-        for _ in range(3):
-            features.extend(row["Areas de acción normalizadas"])
-    
-    # NIVEL 3: Características SECUNDARIAS (peso x2)
-    if pd.notna(row.get("Ubicación normalizada")):
-        ubicacion = str(row["Ubicación normalizada"])
-        features.extend([ubicacion] * 2)
-    
-    if pd.notna(row.get("Área de estudio:")):
-        area = str(row["Área de estudio:"])
-        features.extend([area] * 2)
-    
-    # NIVEL 4: Características CONTEXTUALES (peso x2)
-    if pd.notna(row.get("¿Rol actual?")):
-        features.extend([str(row["¿Rol actual?"])] * 2)
-    
-    if pd.notna(row.get("Superpoder")):
-        features.extend([str(row["Superpoder"])] * 2)
-    
-    if pd.notna(row.get("¿Motivación para unirte?")):
-        features.extend([str(row["¿Motivación para unirte?"])] * 2)
-    
-    # NIVEL 5: Características ADICIONALES (peso x2) - Conexiones y expertise
-    if pd.notna(row.get("¿Qué conexiones buscas?")):
-        features.extend([str(row["¿Qué conexiones buscas?"])] * 2)
-    
-    if pd.notna(row.get("¿Área mas valor aportaría?")):
-        features.extend([str(row["¿Área mas valor aportaría?"])] * 2)
-    
-    if pd.notna(row.get("Áreas de especialización o interés:")):
-        features.extend([str(row["Áreas de especialización o interés:"])] * 2)
-    
-    # NIVEL 6: Características COMPLEMENTARIAS (peso x1)
-    if pd.notna(row.get("¿Temas podría abordar?")):
-        features.append(str(row["¿Temas podría abordar?"]))
-    
-    if pd.notna(row.get("¿Empresa?")):
-        features.append(str(row["¿Empresa?"]))
-    
-    if pd.notna(row.get("¿Universidad?")):
-        features.append(str(row["¿Universidad?"]))
-    
-    # NIVEL 7: Meta-características (generación como contexto)
-    if pd.notna(row.get("Generación")):
-        features.append(f"Gen{row['Generación']}")
-    
-    return " ".join(str(f) for f in features if f)
+@st.cache_resource
+def cargar_agregados(huella):
+    """Conteos por faceta de Analytics e Insights (una vez por versión de datos)"""
+    return CuboAgregados(cargar_datos(huella), cargar_multietiquetas(huella))
+
+@st.cache_resource
+def cargar_cohortes(huella):
+    """Estadísticas por generación de Insights (una vez por versión de datos)"""
+    return resumen_generaciones(cargar_datos(huella), cargar_agregados(huella))
+
+@st.cache_resource
+def cargar_motor_filtros(huella):
+    """Bitmaps por valor de cada faceta del sidebar (una vez por versión de datos)"""
+    if ALMACEN_SQLITE:
+        return MotorFiltrosSql(RUTA_SQLITE)
+    return MotorFiltros(cargar_datos(huella), cargar_multietiquetas(huella))
+
+@st.cache_resource
+def cargar_indice_roles(huella):
+    """Índice de trigramas del rol actual para la búsqueda de texto (una vez por versión de datos)"""
+    return IndiceTrigramas(cargar_datos(huella)["¿Rol actual?"])
+
+@st.cache_resource
+def cargar_indice_busqueda(huella):
+    """Índice BM25 de las respuestas de texto libre (persistido junto a la caché de datos)"""
+    return cargar_indice_bm25(cargar_datos(huella), huella)
+
+@st.cache_resource
+def cargar_indice_similitud(huella):
+    """Matriz TF-IDF del matchmaking ajustada sobre todo el directorio (persistida junto a la caché)"""
+    return cargar_indice_tfidf(cargar_datos(huella), huella)
+
+@st.cache_resource
+def cargar_indice_embeddings(huella):
+    """Embeddings LSA densos del matchmaking (solo si se eligen; persistidos junto a la caché)"""
+    return cargar_indice_lsa(cargar_indice_similitud(huella), huella)
+
+@st.cache_resource
+def cargar_similitud_numerica(huella):
+    """Experiencia y generación de todo el directorio como arrays (una vez por versión de datos)"""
+    return SimilitudNumerica(cargar_datos(huella))
+
+@st.cache_resource
+def cargar_tabla_matches(huella):
+    """Tabla de matches precalculada por `python tabla_matches.py` (None si no existe)"""
+    return TablaMatches.cargar(huella, cargar_datos(huella).index)
 
-def encontrar_matches(df, perfil_nombre):
+@st.cache_resource
+def cargar_indice_vecinos(huella):
+    """Índice IVF de vecinos aproximados (solo para directorios grandes; persistido en caché)"""
+    if len(cargar_datos(huella)) < MIN_PERFILES_ANN:
+        return None
+    return cargar_indice_ivf(cargar_indice_similitud(huella), huella)
+
+CARGADORES_POR_VERSION = [
+    cargar_datos, cargar_directorio_compartido, cargar_multietiquetas, cargar_agregados, cargar_cohortes,
+    cargar_motor_filtros,
+    cargar_indice_roles, cargar_indice_busqueda, cargar_indice_similitud, cargar_indice_embeddings,
+    cargar_similitud_numerica, cargar_tabla_matches, cargar_indice_vecinos,
+]
+
+def invalidar_version_anterior(filas, huella_anterior, huella_nueva):
+    """Hook tras un alta: liberar solo las entradas en caché de la versión de datos anterior"""
+    for cargador in CARGADORES_POR_VERSION:
+        cargador.clear(huella_anterior)
+
+# --- Funciones auxiliares ---
+def encontrar_matches(df, perfil_nombre, multietiquetas=None, indice_tfidf=None, similitud_numerica=None,
+                      tabla_matches=None, indice_ivf=None, sondas=SONDAS_POR_DEFECTO):
     """
     Sistema de matchmaking híbrido robusto con múltiples métricas.
     Combina similitud textual (TF-IDF + coseno) con características numéricas.
+
+    Con `indice_tfidf` (ajustado sobre todo el directorio) la similitud
+    textual es un producto escalar restringido a las filas de `df`; sin él
+    se ajusta un TF-IDF solo sobre `df`. También acepta un IndiceLsa
+    (embeddings densos) con la misma interfaz. Lo mismo con `similitud_numerica`.
+    Si `tabla_matches` cubre todos los perfiles elegibles de `df`, los
+    matches se leen de la tabla precalculada en lugar de calcularse. Con
+    `indice_ivf` solo se puntúan los perfiles de las `sondas` listas más
+    cercanas (búsqueda aproximada) y el threshold se estima con una muestra.
     """
+    multietiquetas = multietiquetas or {}
     try:
         # PASO 0: Filtrar solo perfiles válidos (con datos mínimos)
-        df_validos = filtrar_perfiles_validos_matchmaking(df)
+        df_validos = filtrar_perfiles_validos_matchmaking(df, multietiquetas.get("Industrias normalizadas"))
         
         perfiles_excluidos = len(df) - len(df_validos)
         if perfiles_excluidos > 0:
@@ -634,81 +471,77 @@ def encontrar_matches(df, perfil_nombre):
             st.warning("⚠️ Se necesitan al menos 2 perfiles con datos completos para hacer matchmaking")
             return []
         
-        df_copy = df_validos.copy().reset_index(drop=True)
+        # Se conserva el índice original para consultar las matrices multi-etiqueta
+        df_copy = df_validos
         
         if perfil_nombre not in df_copy["Nombre y apellido"].values:
             st.error(f"❌ No se encontró el perfil: {perfil_nombre}")
             st.caption("Este perfil puede no tener datos suficientes para matchmaking")
             return []
         
-        # Crear representación enriquecida
-        st.write(f"🔍 Analizando {len(df_copy)} perfiles...")
-        features_texto = df_copy.apply(crear_features_enriquecidas, axis=1)
-        
-        # Vectorización con TF-IDF optimizado
-        vectorizer = TfidfVectorizer(
-            stop_words='english',
-            max_features=1500,  # Más features para mejor captura
-            min_df=1,
-            max_df=0.95,  # Ignorar términos muy comunes
-            ngram_range=(1, 2),  # Unigramas y bigramas
-            sublinear_tf=True  # Usar escala logarítmica para TF
-        )
-        
-        tfidf_matrix = vectorizer.fit_transform(features_texto)
-        perfil_idx = df_copy[df_copy["Nombre y apellido"] == perfil_nombre].index[0]
-        
-        # PASO 1: Similitud textual (TF-IDF + Coseno)
-        similitudes_texto = cosine_similarity(
-            tfidf_matrix[perfil_idx:perfil_idx+1], 
-            tfidf_matrix
-        ).flatten()
-        
-        # PASO 2: Similitud numérica (experiencia, generación)
+        perfil_idx = np.flatnonzero(df_copy["Nombre y apellido"].to_numpy() == perfil_nombre)[0]
         perfil_ref = df_copy.iloc[perfil_idx]
-        similitudes_numericas = np.array([
-            calcular_similitud_numerica(perfil_ref, df_copy.iloc[i])
-            for i in range(len(df_copy))
-        ])
-        
-        # PASO 3: Score híbrido ponderado (70% texto, 30% numérico)
-        scores_hibridos = (0.70 * similitudes_texto) + (0.30 * similitudes_numericas)
-        
-        # PASO 4: Penalización por diversidad (evitar clones exactos)
-        # Si la similitud es DEMASIADO alta (>0.95), reducir ligeramente para promover diversidad
-        diversity_penalty = np.where(scores_hibridos > 0.95, 0.05, 0)
-        scores_finales = scores_hibridos - diversity_penalty
-        
-        # Excluir el propio perfil
-        scores_finales[perfil_idx] = -1
-        
-        # PASO 5: Threshold adaptativo basado en distribución
-        scores_validos = scores_finales[scores_finales > 0]
-        if len(scores_validos) > 0:
-            threshold = max(0.1, np.percentile(scores_validos, 25))  # 25% percentil mínimo
-        else:
-            threshold = 0.1
         
-        # Obtener top matches
-        num_matches = min(15, len(df_copy) - 1)
-        indices_matches = np.argsort(scores_finales)[-num_matches:][::-1]
+        if tabla_matches is not None and tabla_matches.cubre(df_copy):
+            # Matches precalculados por el proceso batch (tabla_matches.py)
+            st.write(f"⚡ Matches precalculados entre {len(df_copy)} perfiles")
+            vecinos, scores_matches, threshold = tabla_matches.matches(df_copy.index[perfil_idx])
+            indices_matches = df_copy.index.get_indexer(vecinos)
+        else:
+            st.write(f"🔍 Analizando {len(df_copy)} perfiles...")
+            if indice_tfidf is None:
+                indice_tfidf = IndiceTfidf.construir(df_copy)
+            if similitud_numerica is None:
+                similitud_numerica = SimilitudNumerica(df_copy)
+            
+            def puntuar(posiciones):
+                """Score híbrido del perfil con las filas dadas de df_copy"""
+                filas = df_copy.index[posiciones]
+                # PASO 1: Similitud textual (TF-IDF + Coseno): filas L2-normalizadas,
+                # así que el coseno es el producto escalar con la fila del perfil
+                similitudes_texto = indice_tfidf.similitudes(df_copy.index[perfil_idx], filas)
+                # PASO 2: Similitud numérica (experiencia, generación), vectorizada
+                similitudes_numericas = similitud_numerica.similitudes(df_copy.index[perfil_idx], filas)
+                # PASO 3 y 4: Score híbrido ponderado (70% texto, 30% numérico) con
+                # penalización por diversidad (evitar clones exactos)
+                scores = puntuacion_hibrida(similitudes_texto, similitudes_numericas)
+                # Excluir el propio perfil
+                scores[posiciones == perfil_idx] = -1
+                return scores
+            
+            if indice_ivf is not None and len(df_copy) >= MIN_PERFILES_ANN:
+                # Búsqueda aproximada: solo los candidatos de las listas más cercanas
+                posiciones_copy = indice_tfidf.posiciones(df_copy.index)
+                vector = indice_tfidf.matriz[posiciones_copy[perfil_idx]].toarray().ravel()
+                candidatos = np.intersect1d(indice_ivf.candidatos(vector, sondas), posiciones_copy)
+                candidatos = np.searchsorted(posiciones_copy, candidatos)
+                # PASO 5: Threshold adaptativo estimado con una muestra de perfiles
+                muestra = np.random.default_rng(0).choice(
+                    len(df_copy), size=min(MUESTRA_UMBRAL, len(df_copy)), replace=False
+                )
+                threshold = umbral_matches(puntuar(np.sort(muestra)))
+            else:
+                candidatos = np.arange(len(df_copy))
+                threshold = None
+            
+            scores_finales = puntuar(candidatos)
+            
+            # PASO 5: Threshold adaptativo basado en distribución
+            if threshold is None:
+                threshold = umbral_matches(scores_finales)
+            
+            # Obtener top matches (el propio perfil puede no estar entre los candidatos IVF)
+            num_matches = min(15, np.count_nonzero(candidatos != perfil_idx))
+            top = np.argsort(scores_finales)[::-1][:num_matches]
+            indices_matches = candidatos[top]
+            scores_matches = scores_finales[top]
         
         # Construir lista de matches
         matches = []
-        for idx in indices_matches:
-            score = scores_finales[idx]
+        for idx, score in zip(indices_matches, scores_matches):
             if score >= threshold:
                 nombre = df_copy.iloc[idx]["Nombre y apellido"]
-                razones = generar_razones_match(perfil_ref, df_copy.iloc[idx])
-                
-                # Metadata adicional del match
-                match_info = {
-                    'nombre': nombre,
-                    'score': score,
-                    'razones': razones,
-                    'score_texto': similitudes_texto[idx],
-                    'score_numerico': similitudes_numericas[idx]
-                }
+                razones = generar_razones_match(perfil_ref, df_copy.iloc[idx], multietiquetas)
                 matches.append((nombre, score, razones))
         
         # Reporting
@@ -725,17 +558,25 @@ def encontrar_matches(df, perfil_nombre):
         st.error(traceback.format_exc())
         return []
 
-def generar_razones_match(perfil1, perfil2):
+def etiquetas_comunes(perfil1, perfil2, columna, multietiquetas):
+    """Etiquetas compartidas de una columna multi-etiqueta (vía matriz indicadora si existe)"""
+    if columna in multietiquetas:
+        # perfil.name es la etiqueta del índice del DataFrame completo
+        return multietiquetas[columna].comunes(perfil1.name, perfil2.name)
+    if (columna in perfil1 and columna in perfil2 and
+        isinstance(perfil1[columna], list) and isinstance(perfil2[columna], list)):
+        return list(set(perfil1[columna]) & set(perfil2[columna]))
+    return []
+
+def generar_razones_match(perfil1, perfil2, multietiquetas=None):
     """Generar razones específicas del match usando columnas normalizadas"""
     razones = []
+    multietiquetas = multietiquetas or {}
     
     # Comparar industrias normalizadas
-    if ("Industrias normalizadas" in perfil1 and "Industrias normalizadas" in perfil2 and
-        isinstance(perfil1["Industrias normalizadas"], list) and 
-        isinstance(perfil2["Industrias normalizadas"], list)):
-        industrias_comunes = set(perfil1["Industrias normalizadas"]) & set(perfil2["Industrias normalizadas"])
-        if industrias_comunes:
-            razones.append(f"Industrias en común: {', '.join(industrias_comunes)}")
+    industrias_comunes = etiquetas_comunes(perfil1, perfil2, "Industrias normalizadas", multietiquetas)
+    if industrias_comunes:
+        razones.append(f"Industrias en común: {', '.join(industrias_comunes)}")
     
     # Comparar categoría de rol
     if (pd.notna(perfil1.get("Categoría rol")) and 
@@ -750,12 +591,9 @@ def generar_razones_match(perfil1, perfil2):
         razones.append(f"Misma ubicación: {perfil1['Ubicación normalizada']}")
     
     # Comparar áreas de acción normalizadas
-    if ("Areas de acción normalizadas" in perfil1 and "Areas de acción normalizadas" in perfil2 and
-        isinstance(perfil1["Areas de acción normalizadas"], list) and 
-        isinstance(perfil2["Areas de acción normalizadas"], list)):
-        areas_comunes = set(perfil1["Areas de acción normalizadas"]) & set(perfil2["Areas de acción normalizadas"])
-        if areas_comunes:
-            razones.append(f"Áreas de acción en común: {', '.join(areas_comunes)}")
+    areas_comunes = etiquetas_comunes(perfil1, perfil2, "Areas de acción normalizadas", multietiquetas)
+    if areas_comunes:
+        razones.append(f"Áreas de acción en común: {', '.join(areas_comunes)}")
     
     # Comparar superpoder
     if (pd.notna(perfil1.get("Superpoder")) and 
@@ -774,262 +612,301 @@ def generar_razones_match(perfil1, perfil2):
     
     return ", ".join(razones)
 
-df = cargar_datos()
+if RUTA_ALMACEN.exists():
+    huella = huella_actual()
+    directorio = cargar_directorio_compartido(huella)
+    df = directorio.df
+else:
+    st.error(f"No se encontró el archivo '{RUTA_ALMACEN}'")
+    df = pd.DataFrame()
 
 if df.empty:
     st.error("No se pudieron cargar los datos. Verifica que el archivo 'directorio.csv.csv' esté en el directorio correcto.")
     st.stop()
 
+# Matrices multi-etiqueta: consultas vectorizadas en lugar de recorrer listas
+multietiquetas = cargar_multietiquetas(huella)
+matriz_industrias = multietiquetas.get("Industrias normalizadas")
+matriz_areas = multietiquetas.get("Areas de acción normalizadas")
+
+# Conteos por faceta de Analytics e Insights: bincount sobre las filas de cada vista
+agregados = cargar_agregados(huella)
+cohortes = cargar_cohortes(huella)
+
+# Índice de bitmaps por faceta para resolver los filtros del sidebar
+motor_filtros = cargar_motor_filtros(huella)
+
+# Índice invertido de trigramas para "Buscar por rol actual"
+indice_roles = cargar_indice_roles(huella)
+
+# Índice BM25 para la búsqueda global en los perfiles
+indice_busqueda = cargar_indice_busqueda(huella)
+
+# TF-IDF del matchmaking, ajustado una vez sobre todo el directorio
+indice_tfidf = cargar_indice_similitud(huella)
+similitud_numerica = cargar_similitud_numerica(huella)
+tabla_matches = cargar_tabla_matches(huella)
+indice_ivf = cargar_indice_vecinos(huella)
+
 # --- Header Principal ---
-total_generaciones = len(df["Generación"].unique()) if "Generación" in df.columns else 0
+total_generaciones = agregados.distintos("Generación", nulos=True) if "Generación" in agregados else 0
 create_header(len(df), total_generaciones)
 
-# --- Sidebar: Filtros del directorio ---
-st.sidebar.title("🔍 Filtros del directorio")
-st.sidebar.markdown("---")
+# --- Filtros del directorio ---
+# Facetas del sidebar: columna -> clave del widget
+CLAVES_FILTROS = {
+    "Generación": "filtro_generacion",
+    "Industrias normalizadas": "filtro_industria",
+    "Categoría rol": "filtro_categoria_rol",
+    "Ubicación normalizada": "filtro_ubicacion",
+    "Areas de acción normalizadas": "filtro_area_accion",
+    "Superpoder": "filtro_superpoder",
+    "Área de estudio:": "filtro_area_estudio",
+    "¿Motivación para unirte?": "filtro_motivacion",
+    "¿Quiere ser mentor?": "filtro_mentoria",
+    "¿Dar charlas o talleres?": "filtro_charlas",
+    "¿Empresa?": "filtro_empresa",
+}
 
-# Filtros básicos
-generacion = st.sidebar.multiselect(
-    "👥 Generación", 
-    sorted(df["Generación"].dropna().unique())
-)
+# Secciones cuyas vistas dependen de los filtros y se vuelven a ejecutar enteras al cambiarlos
+SECCIONES_CON_FILTROS = ["🔗 Matchmaking", "📊 Analytics", "🎯 Insights"]
 
-# Filtro de industria usando columna normalizada (multi-etiqueta)
-if "Industrias normalizadas" in df.columns:
-    # Extraer todas las industrias únicas de las listas
-    todas_industrias = set()
-    for lista_ind in df["Industrias normalizadas"].dropna():
-        if isinstance(lista_ind, list):
-            todas_industrias.update(lista_ind)
-    industria = st.sidebar.multiselect(
-        "🏭 Industria", 
-        sorted(todas_industrias)
-    )
-else:
-    industria = []
+def seleccion_actual(clave):
+    """Selección vigente de un filtro (el widget puede recrearse al cambiar sus conteos)"""
+    return st.session_state.get(clave, st.session_state.get(f"_{clave}", []))
+
+def resolver_filtros():
+    """
+    Resolver los filtros vigentes (los valores de sus widgets) a posiciones de fila.
 
-# Filtro de categoría de rol
-if "Categoría rol" in df.columns:
-    categoria_rol = st.sidebar.multiselect(
-        "👔 Categoría de Rol",
-        sorted(df["Categoría rol"].dropna().unique())
+    Es el estado de filtrado que comparten el panel del sidebar y las vistas:
+    se guarda en `st.session_state["filtros_vigentes"]`, así que una vista que
+    se vuelve a ejecutar sola (un fragmento) lee los filtros de ese momento.
+    Si los widgets y la versión de datos no cambiaron desde la última vez
+    (el panel, en una ejecución completa, tras la resolución de arriba) se
+    reutiliza ese resultado: con SQLite cada resolución es una consulta.
+
+    Returns:
+        dict con "selecciones", "rango_experiencia", "restricciones" (para
+        el motor de filtros) y "posiciones" (array ordenado de filas)
+    """
+    rol = st.session_state.get("filtro_rol", "")
+    erratas = st.session_state.get("filtro_rol_erratas", False)
+    rango = st.session_state.get("filtro_experiencia")
+    valores_exp = motor_filtros.opciones("Años experiencia num")
+    if rango is not None and valores_exp and rango[0] <= valores_exp[0] and rango[1] >= valores_exp[-1]:
+        rango = None  # el slider en su rango completo no filtra, igual que antes de crearlo
+    filtros = {
+        "huella": huella,
+        # OR dentro de cada faceta, AND entre facetas
+        "selecciones": {columna: seleccion_actual(clave) for columna, clave in CLAVES_FILTROS.items()},
+        # Años de experiencia (incluye perfiles sin datos; sin tocar el slider no filtra)
+        "rango_experiencia": rango,
+        "rol": (rol, erratas),
+    }
+    vigentes = st.session_state.get("filtros_vigentes")
+    if vigentes is not None and all(vigentes.get(clave) == valor for clave, valor in filtros.items()):
+        return vigentes
+
+    # Texto en el rol actual
+    filtros["restricciones"] = [indice_roles.buscar(rol, erratas)] if rol else []
+    filtros["posiciones"] = motor_filtros.resolver(
+        filtros["selecciones"], filtros["rango_experiencia"], filtros["restricciones"]
     )
-else:
-    categoria_rol = []
+    st.session_state["filtros_vigentes"] = filtros
+    return filtros
+
+@st.fragment
+def panel_filtros():
+    """
+    Filtros del sidebar, como fragmento (se llama dentro de `with st.sidebar`).
+
+    Cambiar un filtro solo vuelve a ejecutar este panel: conteos de las
+    opciones, posiciones filtradas y, si cambiaron las filas, las vistas
+    visibles que dependen de ellas. El listado del directorio se repinta en
+    su sitio; Matchmaking, Analytics e Insights piden una ejecución completa
+    (solo la sección visible). Nuevo Miembro no depende de los filtros.
+    """
+    st.title("🔍 Filtros del directorio")
+    st.markdown("---")
 
-# Búsqueda de texto en rol actual
-rol = st.sidebar.text_input("💼 Buscar por rol actual (texto)")
+    posiciones_mostradas = st.session_state["filtros_vigentes"]["posiciones"]
 
-# Filtro de ubicación usando columna normalizada
-if "Ubicación normalizada" in df.columns:
-    ubicacion = st.sidebar.multiselect(
-        "📍 Ubicación",
-        sorted(df["Ubicación normalizada"].dropna().unique())
+    # Conteos de cada opción con los filtros vigentes (una pasada vectorizada por rerun)
+    rol_vigente = st.session_state.get("filtro_rol", "")
+    conteos_facetas = motor_filtros.conteos_facetas(
+        {columna: seleccion_actual(clave) for columna, clave in CLAVES_FILTROS.items()},
+        st.session_state.get("filtro_experiencia"),
+        [indice_roles.buscar(rol_vigente, st.session_state.get("filtro_rol_erratas", False))]
+        if rol_vigente else [],
     )
-else:
-    ubicacion = []
-
-# Filtro de experiencia
-if "Años experiencia num" in df.columns:
-    valores_exp = df["Años experiencia num"].dropna()
-    if len(valores_exp) > 0:
-        exp_min, exp_max = st.sidebar.slider(
-            "📈 Años de experiencia",
-            min_value=int(valores_exp.min()),
-            max_value=int(valores_exp.max()),
-            value=(int(valores_exp.min()), int(valores_exp.max()))
+
+    def multiselect_faceta(etiqueta, columna):
+        """
+        Multiselect del sidebar con el número de miembros que coincidirían junto a cada opción.
+
+        Al cambiar los conteos cambian las etiquetas de las opciones y Streamlit
+        recrea el widget, así que la selección se guarda aparte y se pasa como default.
+        """
+        clave = CLAVES_FILTROS[columna]
+        conteos = conteos_facetas.get(columna, {})
+        seleccion = st.multiselect(
+            etiqueta,
+            motor_filtros.opciones(columna),
+            default=[v for v in seleccion_actual(clave) if v in conteos],
+            format_func=lambda valor: f"{valor} ({conteos.get(valor, 0)})",
+            key=clave
         )
-    else:
-        exp_min, exp_max = 0, 20
-
-# Filtro por área de acción
-if "Areas de acción normalizadas" in df.columns:
-    # Extraer todas las áreas únicas de las listas
-    todas_areas = set()
-    for lista_areas in df["Areas de acción normalizadas"].dropna():
-        if isinstance(lista_areas, list):
-            todas_areas.update(lista_areas)
-    area_accion = st.sidebar.multiselect(
-        "🎯 Área de Acción",
-        sorted(todas_areas)
+        st.session_state[f"_{clave}"] = seleccion
+        return seleccion
+
+    # Filtros básicos
+    multiselect_faceta("👥 Generación", "Generación")
+
+    # Filtro de industria usando columna normalizada (multi-etiqueta)
+    if "Industrias normalizadas" in df.columns:
+        multiselect_faceta("🏭 Industria", "Industrias normalizadas")
+
+    # Filtro de categoría de rol
+    if "Categoría rol" in df.columns:
+        multiselect_faceta("👔 Categoría de Rol", "Categoría rol")
+
+    # Búsqueda de texto en rol actual
+    rol = st.text_input("💼 Buscar por rol actual (texto)", key="filtro_rol")
+    st.checkbox(
+        "Tolerar erratas en el rol",
+        key="filtro_rol_erratas",
+        help="Acepta roles con 1-2 letras distintas (según la longitud del texto buscado)"
     )
-else:
-    area_accion = []
 
-# Filtro por superpoder
-superpoder = st.sidebar.multiselect(
-    "⚡ Superpoder",
-    sorted(df["Superpoder"].dropna().unique()) if "Superpoder" in df.columns else []
-)
+    # Filtro de ubicación usando columna normalizada
+    if "Ubicación normalizada" in df.columns:
+        multiselect_faceta("📍 Ubicación", "Ubicación normalizada")
 
-# Filtro por área de estudio
-area_estudio = st.sidebar.multiselect(
-    "🎓 Área de estudio",
-    sorted(df["Área de estudio:"].dropna().unique()) if "Área de estudio:" in df.columns else []
-)
+    # Filtro de experiencia
+    if "Años experiencia num" in df.columns:
+        valores_exp = motor_filtros.opciones("Años experiencia num")
+        if len(valores_exp) > 0:
+            st.slider(
+                "📈 Años de experiencia",
+                min_value=int(valores_exp[0]),
+                max_value=int(valores_exp[-1]),
+                value=(int(valores_exp[0]), int(valores_exp[-1])),
+                key="filtro_experiencia"
+            )
 
-# Filtro por motivación
-motivacion = st.sidebar.multiselect(
-    "💭 Motivación",
-    sorted(df["¿Motivación para unirte?"].dropna().unique()) if "¿Motivación para unirte?" in df.columns else []
-)
+    # Filtro por área de acción
+    if "Areas de acción normalizadas" in df.columns:
+        multiselect_faceta("🎯 Área de Acción", "Areas de acción normalizadas")
 
-# Filtro por disponibilidad de mentoría
-quiere_mentor = st.sidebar.multiselect(
-    "🎓 Disponible para Mentoría",
-    sorted(df["¿Quiere ser mentor?"].dropna().unique()) if "¿Quiere ser mentor?" in df.columns else []
-)
+    # Filtro por superpoder
+    multiselect_faceta("⚡ Superpoder", "Superpoder")
 
-# Filtro por disponibilidad para dar charlas
-dar_charlas = st.sidebar.multiselect(
-    "🎤 Disponible para Charlas",
-    sorted(df["¿Dar charlas o talleres?"].dropna().unique()) if "¿Dar charlas o talleres?" in df.columns else []
-)
+    # Filtro por área de estudio
+    multiselect_faceta("🎓 Área de estudio", "Área de estudio:")
 
-# Filtro por empresa
-if "¿Empresa?" in df.columns:
-    empresas_disponibles = sorted(df["¿Empresa?"].dropna().unique())
-    if len(empresas_disponibles) > 0:
-        empresa = st.sidebar.multiselect(
-            "🏢 Empresa",
-            empresas_disponibles
-        )
-    else:
-        empresa = []
-else:
-    empresa = []
-
-# --- Aplicar filtros ---
-filtro = df.copy()
-
-# Filtro por generación
-if generacion:
-    filtro = filtro[filtro["Generación"].isin(generacion)]
-
-# Filtro por industria (multi-etiqueta)
-if industria:
-    def tiene_industria(lista_industrias):
-        if not isinstance(lista_industrias, list):
-            return False
-        return any(ind in industria for ind in lista_industrias)
-    filtro = filtro[filtro["Industrias normalizadas"].apply(tiene_industria)]
-
-# Filtro por categoría de rol
-if categoria_rol:
-    filtro = filtro[filtro["Categoría rol"].isin(categoria_rol)]
-
-# Filtro por texto en rol actual
-if rol:
-    filtro = filtro[filtro["¿Rol actual?"].str.contains(rol, case=False, na=False)]
-
-# Filtro por ubicación normalizada
-if ubicacion:
-    filtro = filtro[filtro["Ubicación normalizada"].isin(ubicacion)]
-
-# Filtro por años de experiencia (solo si tiene datos)
-if "Años experiencia num" in df.columns and 'exp_min' in locals():
-    # Incluir tanto los que están en el rango como los que no tienen datos (NaN)
-    filtro = filtro[
-        (filtro["Años experiencia num"].isna()) | 
-        ((filtro["Años experiencia num"] >= exp_min) & (filtro["Años experiencia num"] <= exp_max))
-    ]
-
-# Filtro por área de acción (multi-etiqueta)
-if area_accion:
-    def tiene_area(lista_areas):
-        if not isinstance(lista_areas, list):
-            return False
-        return any(area in area_accion for area in lista_areas)
-    filtro = filtro[filtro["Areas de acción normalizadas"].apply(tiene_area)]
-
-# Filtro por superpoder
-if superpoder:
-    filtro = filtro[filtro["Superpoder"].isin(superpoder)]
-
-# Filtro por área de estudio
-if area_estudio:
-    filtro = filtro[filtro["Área de estudio:"].isin(area_estudio)]
-
-# Filtro por motivación
-if motivacion:
-    filtro = filtro[filtro["¿Motivación para unirte?"].isin(motivacion)]
-
-# Filtro por disponibilidad de mentoría
-if quiere_mentor:
-    filtro = filtro[filtro["¿Quiere ser mentor?"].isin(quiere_mentor)]
-
-# Filtro por disponibilidad para dar charlas
-if dar_charlas:
-    filtro = filtro[filtro["¿Dar charlas o talleres?"].isin(dar_charlas)]
-
-# Filtro por empresa
-if empresa:
-    filtro = filtro[filtro["¿Empresa?"].isin(empresa)]
-
-# --- Información de filtrado en sidebar ---
-st.sidebar.markdown("---")
-st.sidebar.markdown("### 📊 Estado del Filtrado")
-st.sidebar.info(f"**Mostrando:** {len(filtro)} de {len(df)} celerados")
-
-if len(filtro) < len(df):
-    perdidos = len(df) - len(filtro)
-    st.sidebar.warning(f"⚠️ {perdidos} perfiles ocultos por filtros activos")
-    
-    # Mostrar qué filtros están activos
-    filtros_activos = []
-    if generacion:
-        filtros_activos.append(f"Generación: {len(generacion)}")
-    if industria:
-        filtros_activos.append(f"Industria: {len(industria)}")
-    if categoria_rol:
-        filtros_activos.append(f"Categoría rol: {len(categoria_rol)}")
-    if rol:
-        filtros_activos.append(f"Búsqueda rol: '{rol}'")
-    if ubicacion:
-        filtros_activos.append(f"Ubicación: {len(ubicacion)}")
-    if area_accion:
-        filtros_activos.append(f"Área acción: {len(area_accion)}")
-    if superpoder:
-        filtros_activos.append(f"Superpoder: {len(superpoder)}")
-    if area_estudio:
-        filtros_activos.append(f"Área estudio: {len(area_estudio)}")
-    if motivacion:
-        filtros_activos.append(f"Motivación: {len(motivacion)}")
-    if quiere_mentor:
-        filtros_activos.append(f"Disponible mentoría: {len(quiere_mentor)}")
-    if dar_charlas:
-        filtros_activos.append(f"Disponible charlas: {len(dar_charlas)}")
-    if empresa:
-        filtros_activos.append(f"Empresa: {len(empresa)}")
-    
-    if filtros_activos:
-        st.sidebar.caption("**Filtros activos:**")
-        for filtro_activo in filtros_activos:
-            st.sidebar.caption(f"• {filtro_activo}")
-        
-        # Solo mostrar botón si hay filtros activos
-        if st.sidebar.button("🔄 Limpiar todos los filtros", key="btn_limpiar_filtros"):
+    # Filtro por motivación
+    multiselect_faceta("💭 Motivación", "¿Motivación para unirte?")
+
+    # Filtro por disponibilidad de mentoría
+    multiselect_faceta("🎓 Disponible para Mentoría", "¿Quiere ser mentor?")
+
+    # Filtro por disponibilidad para dar charlas
+    multiselect_faceta("🎤 Disponible para Charlas", "¿Dar charlas o talleres?")
+
+    # Filtro por empresa
+    if len(motor_filtros.opciones("¿Empresa?")) > 0:
+        multiselect_faceta("🏢 Empresa", "¿Empresa?")
+
+    # --- Aplicar filtros ---
+    filtros = resolver_filtros()
+    selecciones = filtros["selecciones"]
+    n_filtrados = len(filtros["posiciones"])
+
+    # --- Información de filtrado ---
+    st.markdown("---")
+    st.markdown("### 📊 Estado del Filtrado")
+    st.info(f"**Mostrando:** {n_filtrados} de {len(df)} celerados")
+
+    if n_filtrados < len(df):
+        perdidos = len(df) - n_filtrados
+        st.warning(f"⚠️ {perdidos} perfiles ocultos por filtros activos")
+        
+        # Mostrar qué filtros están activos
+        filtros_activos = []
+        if selecciones["Generación"]:
+            filtros_activos.append(f"Generación: {len(selecciones['Generación'])}")
+        if selecciones["Industrias normalizadas"]:
+            filtros_activos.append(f"Industria: {len(selecciones['Industrias normalizadas'])}")
+        if selecciones["Categoría rol"]:
+            filtros_activos.append(f"Categoría rol: {len(selecciones['Categoría rol'])}")
+        if rol:
+            filtros_activos.append(f"Búsqueda rol: '{rol}'")
+        if selecciones["Ubicación normalizada"]:
+            filtros_activos.append(f"Ubicación: {len(selecciones['Ubicación normalizada'])}")
+        if selecciones["Areas de acción normalizadas"]:
+            filtros_activos.append(f"Área acción: {len(selecciones['Areas de acción normalizadas'])}")
+        if selecciones["Superpoder"]:
+            filtros_activos.append(f"Superpoder: {len(selecciones['Superpoder'])}")
+        if selecciones["Área de estudio:"]:
+            filtros_activos.append(f"Área estudio: {len(selecciones['Área de estudio:'])}")
+        if selecciones["¿Motivación para unirte?"]:
+            filtros_activos.append(f"Motivación: {len(selecciones['¿Motivación para unirte?'])}")
+        if selecciones["¿Quiere ser mentor?"]:
+            filtros_activos.append(f"Disponible mentoría: {len(selecciones['¿Quiere ser mentor?'])}")
+        if selecciones["¿Dar charlas o talleres?"]:
+            filtros_activos.append(f"Disponible charlas: {len(selecciones['¿Dar charlas o talleres?'])}")
+        if selecciones["¿Empresa?"]:
+            filtros_activos.append(f"Empresa: {len(selecciones['¿Empresa?'])}")
+        
+        if filtros_activos:
+            st.caption("**Filtros activos:**")
+            for filtro_activo in filtros_activos:
+                st.caption(f"• {filtro_activo}")
+            
+            # Solo mostrar botón si hay filtros activos
+            if st.button("🔄 Limpiar todos los filtros", key="btn_limpiar_filtros"):
+                for clave in list(CLAVES_FILTROS.values()) + ["filtro_rol", "filtro_rol_erratas", "filtro_experiencia"]:
+                    st.session_state.pop(clave, None)
+                    st.session_state.pop(f"_{clave}", None)
+                st.rerun()
+
+    # Vistas que dependen de las filas filtradas: solo las visibles
+    if not np.array_equal(filtros["posiciones"], posiciones_mostradas):
+        if seccion == "📒 Directorio":
+            pintar_filtrado_directorio()
+        elif seccion in SECCIONES_CON_FILTROS:
             st.rerun()
 
-# --- Tabs principales ---
-tab1, tab2, tab3, tab4, tab5 = st.tabs(["📒 Directorio", "🔗 Matchmaking", "📊 Analytics", "🎯 Insights", "➕ Nuevo Miembro"])
+filtros_vigentes = resolver_filtros()
+posiciones_filtro = filtros_vigentes["posiciones"]
+# Por sesión solo las posiciones: sin filtros `filtro` es el propio directorio compartido
+filtro = directorio.vista(posiciones_filtro)
+
+# --- Secciones principales ---
+# Solo se ejecuta la sección elegida (st.tabs ejecuta todas en cada rerun) y cada
+# una es un fragmento: sus propios widgets solo vuelven a ejecutar esa sección
+SECCIONES = ["📒 Directorio", "🔗 Matchmaking", "📊 Analytics", "🎯 Insights", "➕ Nuevo Miembro"]
+seccion = st.radio("Sección", SECCIONES, horizontal=True, key="seccion", label_visibility="collapsed")
 
-with tab1:
+# DataFrames que materializa la sección activa (para la memoria de la sesión del pie)
+vistas_sesion = {}
+
+@st.fragment
+def seccion_directorio():
     # --- Mostrar directorio filtrado ---
     st.markdown("## 📒 Directorio de Celerados")
     st.markdown("Explora y conecta con los miembros de la comunidad Celera")
     st.markdown("")
     
     # Contador de perfiles con datos completos vs parciales
-    perfiles_con_industria = len(df[df["Industrias normalizadas"].apply(lambda x: isinstance(x, list) and len(x) > 0)])
+    tiene_industria = matriz_industrias.num_etiquetas() > 0
+    perfiles_con_industria = int(tiene_industria.sum())
     perfiles_con_rol = len(df[df["Categoría rol"].notna()])
     perfiles_con_ubicacion = len(df[df["Ubicación normalizada"].notna()])
     
     # Un perfil es "completo" si tiene al menos industria O rol
-    perfiles_completos = len(df[
-        (df["Industrias normalizadas"].apply(lambda x: isinstance(x, list) and len(x) > 0)) |
-        (df["Categoría rol"].notna())
-    ])
+    perfiles_completos = int((tiene_industria | df["Categoría rol"].notna().to_numpy()).sum())
     perfiles_solo_contacto = len(df) - perfiles_completos
     
     col_info1, col_info2, col_info3, col_info4 = st.columns(4)
@@ -1039,60 +916,123 @@ with tab1:
         st.metric("✅ Con Datos", perfiles_completos, f"{perfiles_completos/len(df)*100:.0f}%")
     with col_info3:
         st.metric("📝 Solo Contacto", perfiles_solo_contacto)
-    with col_info4:
-        st.metric("🔍 Filtrados", len(filtro), delta=f"{len(filtro)-len(df):+d}")
-    
-    if len(filtro) < len(df):
-        st.info(f"ℹ️ Aplicando filtros del sidebar. Ver **{len(filtro)}** de {len(df)} celerados.")
+    # Lo que depende de los filtros se pinta en huecos que el panel del sidebar repinta
+    huecos_directorio["filtrados"] = col_info4.empty()
+    huecos_directorio["aviso"] = st.empty()
     
     st.divider()
     
-    # Preparar datos para mostrar con columnas normalizadas
-    df_mostrar = filtro.copy()
+    # --- Búsqueda global en las respuestas de texto libre ---
+    st.text_input(
+        "🔎 Buscar en los perfiles",
+        placeholder="Ej.: energía renovable, divulgación científica, inteligencia artificial...",
+        help="Busca en quién eres, superpoder, especialización, temas, conexiones e impacto (respeta los filtros del sidebar)",
+        key="busqueda_global"
+    )
+    huecos_directorio["listado"] = st.empty()
+    pintar_filtrado_directorio()
+
+# Huecos de la sección Directorio para las vistas que dependen de los filtros
+huecos_directorio = {}
+
+def pintar_filtrado_directorio():
+    """
+    Pintar en `huecos_directorio` las vistas del directorio que dependen de los filtros.
+
+    Lo llaman la sección Directorio y el panel de filtros al cambiar las filas
+    filtradas, sin volver a ejecutar la sección: conteo de filtrados,
+    resultados de la búsqueda global y listado. Solo pinta elementos (no
+    widgets), que un fragmento puede escribir en huecos de fuera de él.
+    """
+    filtros = st.session_state["filtros_vigentes"]
+    posiciones = filtros["posiciones"]
+    huecos_directorio["filtrados"].metric("🔍 Filtrados", len(posiciones), delta=f"{len(posiciones)-len(df):+d}")
     
-    # Convertir listas a strings para visualización
-    if "Industrias normalizadas" in df_mostrar.columns:
-        df_mostrar["Industrias"] = df_mostrar["Industrias normalizadas"].apply(
-            lambda x: ", ".join(x) if isinstance(x, list) and x else "N/A"
+    if len(posiciones) < len(df):
+        huecos_directorio["aviso"].info(
+            f"ℹ️ Aplicando filtros del sidebar. Ver **{len(posiciones)}** de {len(df)} celerados."
         )
+    else:
+        huecos_directorio["aviso"].empty()
     
-    # Columnas a mostrar
-    columnas_mostrar = ["Nombre y apellido", "Correo electrónico1"]
-    
-    if "Industrias" in df_mostrar.columns:
-        columnas_mostrar.append("Industrias")
-    elif "Industria trabaja" in df_mostrar.columns:
-        columnas_mostrar.append("Industria trabaja")
-    
-    if "Categoría rol" in df_mostrar.columns:
-        columnas_mostrar.append("Categoría rol")
-    
-    columnas_mostrar.append("¿Rol actual?")
-    
-    if "Ubicación normalizada" in df_mostrar.columns:
-        columnas_mostrar.append("Ubicación normalizada")
-    elif "Ubicación actual (ciudad/pais)" in df_mostrar.columns:
-        columnas_mostrar.append("Ubicación actual (ciudad/pais)")
-    
-    if "¿Años de experiencia?" in df_mostrar.columns:
-        columnas_mostrar.append("¿Años de experiencia?")
-    
-    if "Superpoder" in df_mostrar.columns:
-        columnas_mostrar.append("Superpoder")
-    
-    st.dataframe(
-        df_mostrar[columnas_mostrar], 
-        width='stretch',
-        hide_index=True
-    )
+    with huecos_directorio["listado"].container():
+        consulta = st.session_state.get("busqueda_global", "")
+        if consulta:
+            posiciones_busqueda, puntuaciones_busqueda = indice_busqueda.buscar(
+                consulta, k=10, filas=posiciones
+            )
+            if len(posiciones_busqueda) == 0:
+                st.warning("⚠️ Ningún perfil coincide con la búsqueda.")
+            else:
+                st.caption(f"{len(posiciones_busqueda)} resultados más relevantes (BM25)")
+                for posicion, puntuacion in zip(posiciones_busqueda, puntuaciones_busqueda):
+                    perfil = df.iloc[posicion]
+                    campo, texto_fragmento = mejor_fragmento(perfil, consulta)
+                    rol_perfil = perfil.get("¿Rol actual?")
+                    if pd.notna(rol_perfil) and len(rol_perfil) > 80:
+                        rol_perfil = rol_perfil[:80] + "…"
+                    rol_perfil = f" · {rol_perfil}" if pd.notna(rol_perfil) else ""
+                    st.markdown(f"**{perfil['Nombre y apellido']}**{rol_perfil} · puntuación {puntuacion:.1f}")
+                    if texto_fragmento:
+                        st.caption(f"{campo.strip('¿?:')}: {texto_fragmento}")
+            st.divider()
+        
+        # Preparar datos para mostrar con columnas normalizadas
+        if ALMACEN_SQLITE:
+            # Solo las columnas del listado, consultadas en SQLite con los mismos filtros
+            df_mostrar = motor_filtros.listado(
+                filtros["selecciones"], filtros["rango_experiencia"], filtros["restricciones"]
+            )
+        else:
+            # Solo las columnas del listado (y sus fuentes) de las filas filtradas
+            df_mostrar = directorio.vista(posiciones, COLUMNAS_LISTADO + COLUMNAS_FUENTE_LISTADO)
+            
+            # Convertir listas a strings para visualización
+            if "Industrias normalizadas" in df_mostrar.columns:
+                df_mostrar["Industrias"] = df_mostrar["Industrias normalizadas"].apply(
+                    lambda x: ", ".join(x) if isinstance(x, list) and x else "N/A"
+                )
+        
+        # Columnas a mostrar
+        columnas_mostrar = ["Nombre y apellido", "Correo electrónico1"]
+        
+        if "Industrias" in df_mostrar.columns:
+            columnas_mostrar.append("Industrias")
+        elif "Industria trabaja" in df_mostrar.columns:
+            columnas_mostrar.append("Industria trabaja")
+        
+        if "Categoría rol" in df_mostrar.columns:
+            columnas_mostrar.append("Categoría rol")
+        
+        columnas_mostrar.append("¿Rol actual?")
+        
+        if "Ubicación normalizada" in df_mostrar.columns:
+            columnas_mostrar.append("Ubicación normalizada")
+        elif "Ubicación actual (ciudad/pais)" in df_mostrar.columns:
+            columnas_mostrar.append("Ubicación actual (ciudad/pais)")
+        
+        if "¿Años de experiencia?" in df_mostrar.columns:
+            columnas_mostrar.append("¿Años de experiencia?")
+        
+        if "Superpoder" in df_mostrar.columns:
+            columnas_mostrar.append("Superpoder")
+        
+        vistas_sesion["listado"] = df_mostrar
+        st.dataframe(
+            df_mostrar[columnas_mostrar], 
+            width='stretch',
+            hide_index=True
+        )
 
-with tab2:
+@st.fragment
+def seccion_matchmaking():
     st.markdown("## 🔗 Matchmaking Inteligente")
     st.markdown("Encuentra las conexiones más relevantes basadas en intereses y perfiles profesionales")
     st.markdown("")
     
     # Filtrar solo perfiles válidos para matchmaking
-    perfiles_matchmaking = filtrar_perfiles_validos_matchmaking(filtro)
+    perfiles_matchmaking = filtrar_perfiles_validos_matchmaking(filtro, matriz_industrias)
+    vistas_sesion["perfiles_matchmaking"] = perfiles_matchmaking
     perfiles_excluidos_match = len(filtro) - len(perfiles_matchmaking)
     
     # Mostrar información sobre perfiles elegibles
@@ -1122,9 +1062,36 @@ with tab2:
             help="Solo se muestran perfiles con datos completos para matchmaking"
         )
         
+        modo_texto = st.radio(
+            "🧠 Representación del texto",
+            options=["TF-IDF", "Embeddings LSA"],
+            horizontal=True,
+            key="modo_matchmaking",
+            help="TF-IDF compara términos exactos; los embeddings LSA agrupan términos relacionados (sinónimos)"
+        )
+        
+        sondas = SONDAS_POR_DEFECTO
+        if indice_ivf is not None and modo_texto == "TF-IDF":
+            sondas = st.select_slider(
+                "⚙️ Precisión de la búsqueda aproximada",
+                options=[1, 2, 4, 8, 16, 32],
+                value=SONDAS_POR_DEFECTO,
+                help="Grupos de perfiles similares que se recorren: más grupos = más precisión y más latencia"
+            )
+        
         if st.button("🔍 Encontrar matches", type="primary", key="btn_encontrar_matches"):
             with st.spinner("Analizando perfiles y buscando matches..."):
-                matches = encontrar_matches(perfiles_matchmaking, perfil_seleccionado)
+                if modo_texto == "Embeddings LSA":
+                    # La tabla precalculada y el índice IVF son del espacio TF-IDF
+                    matches = encontrar_matches(
+                        perfiles_matchmaking, perfil_seleccionado, multietiquetas,
+                        cargar_indice_embeddings(huella), similitud_numerica
+                    )
+                else:
+                    matches = encontrar_matches(
+                        perfiles_matchmaking, perfil_seleccionado, multietiquetas,
+                        indice_tfidf, similitud_numerica, tabla_matches, indice_ivf, sondas
+                    )
                 
                 if len(matches) == 0:
                     st.warning("⚠️ No se encontraron matches. Intenta con menos filtros o un perfil diferente.")
@@ -1191,7 +1158,8 @@ with tab2:
         st.warning("⚠️ No hay perfiles elegibles para matchmaking con los filtros actuales.")
         st.info("💡 **Sugerencia:** Quita algunos filtros del sidebar para ver más perfiles, o verifica que los perfiles tengan datos de industria y rol completos.")
 
-with tab3:
+@st.fragment
+def seccion_analytics():
     st.markdown("## 📊 Analytics de la Comunidad")
     st.markdown("Visualiza tendencias, distribuciones y estadísticas de la comunidad Celera")
     st.markdown("")
@@ -1208,10 +1176,11 @@ with tab3:
     with col_toggle2:
         usar_todos = st.checkbox("Ver todos los datos", value=False, help="Ignorar filtros y mostrar estadísticas de toda la comunidad")
     
-    # Decidir qué dataset usar
-    datos_analytics = df if usar_todos else filtro
+    # Decidir qué filas agregar (los conteos salen de la capa de agregados)
+    filas_analytics = None if usar_todos else posiciones_filtro
+    total_analytics = len(df) if usar_todos else len(filtro)
     
-    if len(datos_analytics) == 0:
+    if total_analytics == 0:
         st.warning("⚠️ No hay datos para mostrar. Ajusta los filtros del sidebar.")
     else:
         # KPIs principales
@@ -1219,28 +1188,24 @@ with tab3:
         kpi1, kpi2, kpi3, kpi4, kpi5 = st.columns(5)
         
         with kpi1:
-            st.metric("👥 Perfiles", len(datos_analytics), f"{len(datos_analytics)/len(df)*100:.0f}% del total")
+            st.metric("👥 Perfiles", total_analytics, f"{total_analytics/len(df)*100:.0f}% del total")
         
         with kpi2:
-            generaciones_unicas = len(datos_analytics["Generación"].unique()) if "Generación" in datos_analytics.columns else 0
+            generaciones_unicas = agregados.distintos("Generación", filas_analytics, nulos=True) if "Generación" in agregados else 0
             st.metric("🎓 Generaciones", generaciones_unicas)
         
         with kpi3:
-            if "Industrias normalizadas" in datos_analytics.columns:
-                industrias_set = set()
-                for lista in datos_analytics["Industrias normalizadas"].dropna():
-                    if isinstance(lista, list):
-                        industrias_set.update(lista)
-                st.metric("🏭 Industrias", len(industrias_set))
+            if "Industrias normalizadas" in agregados:
+                st.metric("🏭 Industrias", agregados.distintos("Industrias normalizadas", filas_analytics))
             else:
                 st.metric("🏭 Industrias", 0)
         
         with kpi4:
-            ubicaciones_unicas = len(datos_analytics["Ubicación normalizada"].unique()) if "Ubicación normalizada" in datos_analytics.columns else 0
+            ubicaciones_unicas = agregados.distintos("Ubicación normalizada", filas_analytics, nulos=True) if "Ubicación normalizada" in agregados else 0
             st.metric("📍 Ubicaciones", ubicaciones_unicas)
         
         with kpi5:
-            roles_unicos = len(datos_analytics["Categoría rol"].unique()) if "Categoría rol" in datos_analytics.columns else 0
+            roles_unicos = agregados.distintos("Categoría rol", filas_analytics, nulos=True) if "Categoría rol" in agregados else 0
             st.metric("💼 Tipos de Rol", roles_unicos)
         
         st.divider()
@@ -1253,15 +1218,12 @@ with tab3:
             
             with col1:
                 # Industrias con colores
-                if "Industrias normalizadas" in datos_analytics.columns:
+                if "Industrias normalizadas" in agregados:
                     st.markdown("#### 🏭 Industrias Principales")
-                    industrias_exploded = []
-                    for lista_ind in datos_analytics["Industrias normalizadas"].dropna():
-                        if isinstance(lista_ind, list):
-                            industrias_exploded.extend(lista_ind)
+                    industrias_conteos = agregados.conteos("Industrias normalizadas", filas_analytics)
                     
-                    if industrias_exploded:
-                        industria_counts = pd.Series(industrias_exploded).value_counts().head(8).reset_index()
+                    if len(industrias_conteos) > 0:
+                        industria_counts = industrias_conteos.head(8).reset_index()
                         industria_counts.columns = ["Industria", "Cantidad"]
                         fig_industria = px.bar(
                             industria_counts,
@@ -1282,9 +1244,9 @@ with tab3:
             
             with col2:
                 # Categorías de rol con colores
-                if "Categoría rol" in datos_analytics.columns:
+                if "Categoría rol" in agregados:
                     st.markdown("#### 💼 Categorías de Rol")
-                    rol_counts = datos_analytics["Categoría rol"].value_counts().head(8).reset_index()
+                    rol_counts = agregados.conteos("Categoría rol", filas_analytics).head(8).reset_index()
                     rol_counts.columns = ["Categoría", "Cantidad"]
                     fig_roles = px.bar(
                         rol_counts,
@@ -1304,15 +1266,12 @@ with tab3:
                     st.plotly_chart(fig_roles, width='stretch')
             
             # Áreas de acción (full width)
-            if "Areas de acción normalizadas" in datos_analytics.columns:
+            if "Areas de acción normalizadas" in agregados:
                 st.markdown("#### 🎯 Áreas de Acción")
-                areas_exploded = []
-                for lista_areas in datos_analytics["Areas de acción normalizadas"].dropna():
-                    if isinstance(lista_areas, list):
-                        areas_exploded.extend(lista_areas)
+                areas_conteos = agregados.conteos("Areas de acción normalizadas", filas_analytics)
                 
-                if areas_exploded:
-                    areas_counts = pd.Series(areas_exploded).value_counts().head(10).reset_index()
+                if len(areas_conteos) > 0:
+                    areas_counts = areas_conteos.head(10).reset_index()
                     areas_counts.columns = ["Área", "Cantidad"]
                     fig_areas = px.bar(
                         areas_counts,
@@ -1335,9 +1294,9 @@ with tab3:
             
             with col1:
                 # Mapa de ubicaciones
-                if "Ubicación normalizada" in datos_analytics.columns:
+                if "Ubicación normalizada" in agregados:
                     st.markdown("#### 📍 Top Ubicaciones")
-                    ubicacion_counts = datos_analytics["Ubicación normalizada"].value_counts().head(12).reset_index()
+                    ubicacion_counts = agregados.conteos("Ubicación normalizada", filas_analytics).head(12).reset_index()
                     ubicacion_counts.columns = ["Ubicación", "Cantidad"]
                     
                     fig_ubicacion = px.bar(
@@ -1359,30 +1318,40 @@ with tab3:
             
             with col2:
                 # Distribución por generación (pie chart)
-                if "Generación" in datos_analytics.columns:
+                if "Generación" in agregados:
                     st.markdown("#### 🎓 Generaciones")
-                    fig_gen = px.pie(
-                        datos_analytics,
-                        names="Generación",
-                        hole=0.4,
-                        color_discrete_sequence=px.colors.qualitative.Set3
-                    )
-                    fig_gen.update_layout(
-                        height=500,
-                        margin=dict(l=0, r=0, t=30, b=0)
-                    )
-                    st.plotly_chart(fig_gen, width='stretch')
+                    # Sin ordenar por conteo: el pie asigna los colores en el orden de aparición
+                    gen_counts = agregados.conteos("Generación", filas_analytics, ordenar=False).reset_index()
+                    if len(gen_counts) > 0:
+                        fig_gen = px.pie(
+                            gen_counts,
+                            names="Generación",
+                            values="count",
+                            hole=0.4,
+                            color_discrete_sequence=px.colors.qualitative.Set3
+                        )
+                        fig_gen.update_layout(
+                            height=500,
+                            margin=dict(l=0, r=0, t=30, b=0)
+                        )
+                        st.plotly_chart(fig_gen, width='stretch')
+                    else:
+                        st.info("No hay datos de generación disponibles")
         
         with analytics_tab3:
             col1, col2 = st.columns(2)
             
             with col1:
                 # Años de experiencia
-                if "Años experiencia num" in datos_analytics.columns:
+                experiencia = agregados.experiencia(filas_analytics)
+                if experiencia is not None:
                     st.markdown("#### 📈 Años de Experiencia")
+                    # Un punto por valor de años con su número de perfiles (no uno por perfil)
                     fig_exp = px.histogram(
-                        datos_analytics,
+                        experiencia["conteos"].reset_index(),
                         x="Años experiencia num",
+                        y="count",
+                        histfunc="sum",
                         nbins=10,
                         color_discrete_sequence=["#636EFA"],
                         labels={"Años experiencia num": "Años de Experiencia"}
@@ -1390,20 +1359,22 @@ with tab3:
                     fig_exp.update_layout(
                         showlegend=False,
                         height=350,
-                        bargap=0.1
+                        bargap=0.1,
+                        yaxis_title="count"
                     )
+                    fig_exp.update_traces(hovertemplate="Años de Experiencia=%{x}<br>count=%{y}<extra></extra>")
                     st.plotly_chart(fig_exp, width='stretch')
                     
                     # Estadísticas de experiencia
-                    exp_media = datos_analytics["Años experiencia num"].mean()
-                    exp_mediana = datos_analytics["Años experiencia num"].median()
+                    exp_media = experiencia["media"]
+                    exp_mediana = experiencia["mediana"]
                     st.info(f"📊 Media: **{exp_media:.1f} años** | Mediana: **{exp_mediana:.1f} años**")
             
             with col2:
                 # Top superpoderes
-                if "Superpoder" in datos_analytics.columns:
+                if "Superpoder" in agregados:
                     st.markdown("#### ⚡ Top 10 Superpoderes")
-                    superpoderes_counts = datos_analytics["Superpoder"].value_counts().head(10).reset_index()
+                    superpoderes_counts = agregados.conteos("Superpoder", filas_analytics).head(10).reset_index()
                     superpoderes_counts.columns = ["Superpoder", "Cantidad"]
                     
                     # Truncar nombres largos para mejor visualización
@@ -1433,11 +1404,11 @@ with tab3:
         
         with additional_col1:
             # Análisis de empresas
-            if "¿Empresa?" in datos_analytics.columns:
+            if "¿Empresa?" in agregados:
                 st.markdown("#### 🏢 Top Empleadores")
-                empresas = datos_analytics["¿Empresa?"].dropna()
+                empresas = agregados.conteos("¿Empresa?", filas_analytics)
                 if len(empresas) > 0:
-                    empresas_top = empresas.value_counts().head(10)
+                    empresas_top = empresas.head(10)
                     
                     fig_empresas = px.bar(
                         x=empresas_top.values,
@@ -1461,11 +1432,11 @@ with tab3:
         
         with additional_col2:
             # Análisis de universidades
-            if "¿Universidad?" in datos_analytics.columns:
+            if "¿Universidad?" in agregados:
                 st.markdown("#### 🎓 Top Universidades")
-                universidades = datos_analytics["¿Universidad?"].dropna()
+                universidades = agregados.conteos("¿Universidad?", filas_analytics)
                 if len(universidades) > 0:
-                    unis_top = universidades.value_counts().head(10)
+                    unis_top = universidades.head(10)
                     
                     fig_unis = px.bar(
                         x=unis_top.values,
@@ -1487,7 +1458,8 @@ with tab3:
                 else:
                     st.info("No hay datos de universidades disponibles")
 
-with tab4:
+@st.fragment
+def seccion_insights():
     st.markdown("## 🎯 Insights Clave")
     st.markdown("Descubre patrones, perfiles dominantes y datos destacados de la comunidad")
     st.markdown("")
@@ -1500,30 +1472,26 @@ with tab4:
         st.metric("👥 Celerados", total_celerados)
     
     with metric_col2:
-        num_generaciones = len(df["Generación"].unique()) if "Generación" in df.columns else 0
+        num_generaciones = agregados.distintos("Generación", nulos=True) if "Generación" in agregados else 0
         st.metric("🎓 Generaciones", num_generaciones)
     
     with metric_col3:
-        if "Años experiencia num" in df.columns:
-            exp_promedio = df["Años experiencia num"].mean()
+        if agregados.experiencia() is not None:
+            exp_promedio = agregados.experiencia()["media"]
             st.metric("📈 Exp. Media", f"{exp_promedio:.1f} años")
         else:
             st.metric("📈 Exp. Media", "N/A")
     
     with metric_col4:
-        if "Ubicación normalizada" in df.columns:
-            paises_unicos = len(df["Ubicación normalizada"].unique())
+        if "Ubicación normalizada" in agregados:
+            paises_unicos = agregados.distintos("Ubicación normalizada", nulos=True)
             st.metric("🌍 Ubicaciones", paises_unicos)
         else:
             st.metric("🌍 Ubicaciones", "N/A")
     
     with metric_col5:
         if "Areas de acción normalizadas" in df.columns:
-            networking_count = 0
-            for lista_areas in df["Areas de acción normalizadas"].dropna():
-                if isinstance(lista_areas, list):
-                    if any("Networking" in area for area in lista_areas):
-                        networking_count += 1
+            networking_count = int(matriz_areas.contiene_texto("Networking").sum())
             tasa_networking = (networking_count / len(df)) * 100
             st.metric("🤝 Networking", f"{tasa_networking:.0f}%")
         else:
@@ -1532,7 +1500,9 @@ with tab4:
     st.divider()
     
     # Tabs secundarias para organizar el contenido
-    insights_tab1, insights_tab2, insights_tab3 = st.tabs(["🏆 Rankings", "📊 Análisis Detallado", "✨ Datos Curiosos"])
+    insights_tab1, insights_tab2, insights_tab3, insights_tab4, insights_tab5 = st.tabs(
+        ["🏆 Rankings", "📊 Análisis Detallado", "✨ Datos Curiosos", "🔀 Cruces", "📈 Generaciones"]
+    )
     
     with insights_tab1:
         # Columnas para rankings lado a lado
@@ -1540,14 +1510,11 @@ with tab4:
         
         with rank_col1:
             st.markdown("### 🏭 Top Industrias")
-            if "Industrias normalizadas" in df.columns:
-                industrias_exploded = []
-                for lista_ind in df["Industrias normalizadas"].dropna():
-                    if isinstance(lista_ind, list):
-                        industrias_exploded.extend(lista_ind)
+            if "Industrias normalizadas" in agregados:
+                industrias_conteos = agregados.conteos("Industrias normalizadas")
                 
-                if industrias_exploded:
-                    industrias_top = pd.Series(industrias_exploded).value_counts().head(5)
+                if len(industrias_conteos) > 0:
+                    industrias_top = industrias_conteos.head(5)
                     
                     # Crear gráfico compacto
                     fig_ind = px.bar(
@@ -1570,8 +1537,8 @@ with tab4:
         
         with rank_col2:
             st.markdown("### 👔 Top Roles")
-            if "Categoría rol" in df.columns:
-                categorias_top = df["Categoría rol"].value_counts().head(5)
+            if "Categoría rol" in agregados:
+                categorias_top = agregados.conteos("Categoría rol").head(5)
                 
                 # Crear gráfico compacto
                 fig_roles = px.bar(
@@ -1594,8 +1561,8 @@ with tab4:
         
         with rank_col3:
             st.markdown("### 📍 Top Ubicaciones")
-            if "Ubicación normalizada" in df.columns:
-                ubicaciones_top = df["Ubicación normalizada"].value_counts().head(5)
+            if "Ubicación normalizada" in agregados:
+                ubicaciones_top = agregados.conteos("Ubicación normalizada").head(5)
                 
                 # Crear gráfico compacto
                 fig_ub = px.bar(
@@ -1623,23 +1590,21 @@ with tab4:
         
         with insights_col1:
             st.markdown("### 🎯 Perfil Dominante")
-            if "Industrias normalizadas" in df.columns and "Categoría rol" in df.columns:
-                industrias_exploded = []
-                for lista_ind in df["Industrias normalizadas"].dropna():
-                    if isinstance(lista_ind, list) and len(lista_ind) > 0:
-                        industrias_exploded.append(lista_ind[0])
+            if "Industrias normalizadas" in agregados and "Categoría rol" in agregados:
+                # Industria principal (primera de la lista) de cada perfil
+                industrias_principales = matriz_industrias.conteos_primera()
                 
-                if industrias_exploded:
-                    industria_top = pd.Series(industrias_exploded).value_counts().index[0]
-                    rol_top = df["Categoría rol"].value_counts().index[0]
+                if len(industrias_principales) > 0:
+                    industria_top = industrias_principales.index[0]
+                    rol_top = agregados.conteos("Categoría rol").index[0]
                     
                     st.info(f"**{industria_top}** × **{rol_top}**")
                     st.caption("Combinación más común en la comunidad")
         
         with insights_col2:
             st.markdown("### 📊 Distribución de Experiencia")
-            if "¿Años de experiencia?" in df.columns:
-                exp_dist = df["¿Años de experiencia?"].value_counts()
+            if "¿Años de experiencia?" in agregados:
+                exp_dist = agregados.conteos("¿Años de experiencia?")
                 
                 fig_exp = px.pie(
                     values=exp_dist.values,
@@ -1661,34 +1626,23 @@ with tab4:
         with analysis_col1:
             # Análisis por generaciones en expander
             with st.expander("👥 **Análisis por Generación**", expanded=True):
-                if "Generación" in df.columns and "Categoría rol" in df.columns:
-                    gen_data_list = []
-                    for gen in sorted(df["Generación"].dropna().unique()):
-                        gen_df = df[df["Generación"] == gen]
-                        top_rol = gen_df["Categoría rol"].value_counts().head(1)
-                        
-                        if len(top_rol) > 0:
-                            gen_data_list.append({
-                                'Generación': f"G{gen}",
-                                'Total': len(gen_df),
-                                'Rol Principal': top_rol.index[0],
-                                'Cantidad': top_rol.values[0]
-                            })
-                    
-                    if gen_data_list:
-                        gen_summary = pd.DataFrame(gen_data_list)
-                        st.dataframe(gen_summary, use_container_width=True, hide_index=True)
+                if len(cohortes) > 0 and "Categoría rol" in agregados:
+                    # Resumen por cohorte precalculado (una pasada por versión de datos)
+                    gen_summary = pd.DataFrame({
+                        'Generación': [f"G{gen}" for gen in cohortes.index],
+                        'Total': cohortes["Total"].to_numpy(),
+                        'Rol Principal': cohortes["Rol principal"].to_numpy(),
+                        'Cantidad': cohortes["Perfiles rol principal"].to_numpy()
+                    })
+                    st.dataframe(gen_summary, width='stretch', hide_index=True)
             
             # Intereses de la comunidad
             with st.expander("🎯 **Intereses de la Comunidad**", expanded=True):
-                if "Areas de acción normalizadas" in df.columns:
-                    areas_exploded = []
-                    for lista_areas in df["Areas de acción normalizadas"].dropna():
-                        if isinstance(lista_areas, list):
-                            areas_exploded.extend(lista_areas)
+                if "Areas de acción normalizadas" in agregados:
+                    areas_conteos = agregados.conteos("Areas de acción normalizadas")
                     
-                    if areas_exploded:
-                        areas_counts = pd.Series(areas_exploded).value_counts().head(6)
+                    if len(areas_conteos) > 0:
+                        areas_counts = areas_conteos.head(6)
                         
                         fig_areas = px.bar(
                             x=areas_counts.values,
@@ -1709,38 +1663,26 @@ with tab4:
         with analysis_col2:
             # Hubs geográficos por industria
             with st.expander("🌍 **Hubs Geográficos por Industria**", expanded=True):
-                if "Ubicación normalizada" in df.columns and "Industrias normalizadas" in df.columns:
-                    industrias_exploded = []
-                    for lista_ind in df["Industrias normalizadas"].dropna():
-                        if isinstance(lista_ind, list):
-                            industrias_exploded.extend(lista_ind)
+                if "Ubicación normalizada" in agregados and "Industrias normalizadas" in agregados:
+                    # Industria × ubicación en un solo producto disperso: el hub de cada industria
+                    industria_ubicacion = agregados.cruce("Industrias normalizadas", "Ubicación normalizada")
                     
-                    if industrias_exploded:
-                        top_3_industrias = pd.Series(industrias_exploded).value_counts().head(3).index
-                        
-                        hub_data = []
-                        for industria in top_3_industrias:
-                            df_industria = df[df["Industrias normalizadas"].apply(
-                                lambda x: industria in x if isinstance(x, list) else False
-                            )]
-                            
-                            if len(df_industria) > 0 and "Ubicación normalizada" in df_industria.columns:
-                                top_ubicacion = df_industria["Ubicación normalizada"].value_counts().head(1)
-                                if len(top_ubicacion) > 0:
-                                    hub_data.append({
-                                        'Industria': industria,
-                                        'Hub Principal': top_ubicacion.index[0],
-                                        'Celerados': top_ubicacion.values[0]
-                                    })
-                        
-                        if hub_data:
-                            hub_df = pd.DataFrame(hub_data)
-                            st.dataframe(hub_df, use_container_width=True, hide_index=True)
+                    # Las industrias sin ninguna ubicación conocida no tienen hub
+                    maximos = industria_ubicacion.max(axis=1)
+                    industria_ubicacion = industria_ubicacion[maximos > 0]
+                    
+                    if industria_ubicacion.size > 0:
+                        hub_df = pd.DataFrame({
+                            'Industria': industria_ubicacion.index,
+                            'Hub Principal': industria_ubicacion.idxmax(axis=1).values,
+                            'Celerados': maximos[maximos > 0].values
+                        })
+                        st.dataframe(hub_df, width='stretch', hide_index=True)
             
             # Top superpoderes
             with st.expander("⚡ **Top Superpoderes**", expanded=True):
-                if "Superpoder" in df.columns:
-                    superpoderes_top = df["Superpoder"].value_counts().head(5)
+                if "Superpoder" in agregados:
+                    superpoderes_top = agregados.conteos("Superpoder").head(5)
                     
                     fig_super = px.bar(
                         x=superpoderes_top.values,
@@ -1763,8 +1705,8 @@ with tab4:
         
         with curious_col1:
             st.markdown("### ⚡ Superpoderes")
-            if "Superpoder" in df.columns:
-                superpoderes_unicos = df["Superpoder"].value_counts()
+            if "Superpoder" in agregados:
+                superpoderes_unicos = agregados.conteos("Superpoder")
                 unicos = superpoderes_unicos[superpoderes_unicos == 1]
                 
                 st.metric("Superpoderes Únicos", len(unicos))
@@ -1776,25 +1718,26 @@ with tab4:
         
         with curious_col2:
             st.markdown("### 🎓 Academia")
-            if "Área de estudio:" in df.columns:
-                areas_unicas = df["Área de estudio:"].nunique()
-                st.metric("Áreas de Estudio", areas_unicas)
+            if "Área de estudio:" in agregados:
+                areas_estudio = agregados.conteos("Área de estudio:")
+                st.metric("Áreas de Estudio", len(areas_estudio))
                 
-                top_area = df["Área de estudio:"].value_counts().head(1)
+                top_area = areas_estudio.head(1)
                 if len(top_area) > 0:
                     st.caption(f"**Más común:** {top_area.index[0]}")
                     st.caption(f"({top_area.values[0]} personas)")
         
         with curious_col3:
             st.markdown("### 🌐 Global")
-            if "Ubicación normalizada" in df.columns:
-                # Contar países únicos
-                paises = df["Ubicación normalizada"].dropna().str.split(", ").str[-1]
+            if "Ubicación normalizada" in agregados:
+                ubicaciones = agregados.conteos("Ubicación normalizada")
+                # Contar países únicos (sobre las ubicaciones distintas, no sobre las filas)
+                paises = ubicaciones.index.to_series().str.split(", ").str[-1]
                 paises_unicos = paises.nunique()
                 
                 st.metric("Países Representados", paises_unicos)
                 
-                ciudad_top = df["Ubicación normalizada"].value_counts().head(1)
+                ciudad_top = ubicaciones.head(1)
                 if len(ciudad_top) > 0:
                     st.caption(f"**Ciudad líder:** {ciudad_top.index[0]}")
                     st.caption(f"({ciudad_top.values[0]} personas)")
@@ -1807,16 +1750,16 @@ with tab4:
         dato_col1, dato_col2 = st.columns(2)
         
         with dato_col1:
-            if "¿Motivación para unirte?" in df.columns:
+            if "¿Motivación para unirte?" in agregados:
                 with st.expander("💭 **Motivaciones Principales**"):
-                    motivaciones = df["¿Motivación para unirte?"].value_counts().head(5)
+                    motivaciones = agregados.conteos("¿Motivación para unirte?").head(5)
                     for motiv, count in motivaciones.items():
                         st.write(f"**{motiv}:** {count} personas ({count/len(df)*100:.1f}%)")
         
         with dato_col2:
-            if "¿Quiere ser mentor?" in df.columns:
+            if "¿Quiere ser mentor?" in agregados:
                 with st.expander("🎓 **Disposición para Mentoría**"):
-                    mentores = df["¿Quiere ser mentor?"].value_counts()
+                    mentores = agregados.conteos("¿Quiere ser mentor?")
                     for respuesta, count in mentores.items():
                         st.write(f"**{respuesta}:** {count} personas ({count/len(df)*100:.1f}%)")
         
@@ -1827,22 +1770,22 @@ with tab4:
         colab_col1, colab_col2, colab_col3 = st.columns(3)
         
         with colab_col1:
-            if "¿Quiere ser mentor?" in df.columns:
-                mentores = df["¿Quiere ser mentor?"].value_counts()
+            if "¿Quiere ser mentor?" in agregados:
+                mentores = agregados.conteos("¿Quiere ser mentor?")
                 si_mentor = mentores.get("Sí", 0) if "Sí" in mentores else 0
                 st.metric("🎓 Mentores Disponibles", si_mentor, 
                          f"{si_mentor/len(df)*100:.0f}%" if len(df) > 0 else "0%")
         
         with colab_col2:
-            if "¿Dar charlas o talleres?" in df.columns:
-                charlas = df["¿Dar charlas o talleres?"].value_counts()
+            if "¿Dar charlas o talleres?" in agregados:
+                charlas = agregados.conteos("¿Dar charlas o talleres?")
                 si_charlas = charlas.get("Sí", 0) if "Sí" in charlas else 0
                 st.metric("🎤 Speakers Disponibles", si_charlas,
                          f"{si_charlas/len(df)*100:.0f}%" if len(df) > 0 else "0%")
         
         with colab_col3:
-            if "¿Colaborar con universidades o empresas?" in df.columns:
-                colab = df["¿Colaborar con universidades o empresas?"].value_counts()
+            if "¿Colaborar con universidades o empresas?" in agregados:
+                colab = agregados.conteos("¿Colaborar con universidades o empresas?")
                 si_colab = colab.get("Sí", 0) if "Sí" in colab else 0
                 st.metric("🤝 Abiertos a Colaborar", si_colab,
                          f"{si_colab/len(df)*100:.0f}%" if len(df) > 0 else "0%")
@@ -1854,9 +1797,9 @@ with tab4:
         coaching_col1, coaching_col2 = st.columns(2)
         
         with coaching_col1:
-            if "Ha hecho sesión de coaching?" in df.columns:
+            if "Ha hecho sesión de coaching?" in agregados:
                 with st.expander("📊 **Experiencia en Coaching**", expanded=False):
-                    coach_exp = df["Ha hecho sesión de coaching?"].value_counts()
+                    coach_exp = agregados.conteos("Ha hecho sesión de coaching?")
                     if len(coach_exp) > 0:
                         fig_coach = px.pie(
                             values=coach_exp.values, 
@@ -1874,9 +1817,9 @@ with tab4:
                         st.info("No hay datos de experiencia en coaching")
         
         with coaching_col2:
-            if "¿Grupal o individual?" in df.columns:
+            if "¿Grupal o individual?" in agregados:
                 with st.expander("👥 **Preferencia de Formato**", expanded=False):
-                    formato = df["¿Grupal o individual?"].dropna().value_counts()
+                    formato = agregados.conteos("¿Grupal o individual?")
                     if len(formato) > 0:
                         fig_formato = px.bar(
                             x=formato.values,
@@ -1895,12 +1838,144 @@ with tab4:
                         st.plotly_chart(fig_formato, use_container_width=True)
                     else:
                         st.info("No hay datos de preferencia de formato")
+    
+    with insights_tab4:
+        st.markdown("Cuántos celerados combinan cada par de valores (un perfil con varias industrias o áreas cuenta en cada una)")
+        
+        # (título, faceta de las filas, faceta de las columnas, escala de color)
+        cruces = [
+            ("🌍 Industria × Ubicación", "Industrias normalizadas", "Ubicación normalizada", "Oranges"),
+            ("👔 Industria × Categoría de Rol", "Industrias normalizadas", "Categoría rol", "Greens"),
+            ("🎯 Área de Acción × Generación", "Areas de acción normalizadas", "Generación", "Purples"),
+        ]
+        for titulo, columna_filas, columna_columnas, escala in cruces:
+            if columna_filas in agregados and columna_columnas in agregados:
+                st.markdown(f"### {titulo}")
+                tabla_cruce = agregados.cruce(columna_filas, columna_columnas)
+                if columna_columnas == "Generación":
+                    # Generaciones en orden cronológico, no por tamaño
+                    tabla_cruce = tabla_cruce.sort_index(axis=1)
+                    tabla_cruce.columns = [f"G{gen}" for gen in tabla_cruce.columns]
+                
+                if tabla_cruce.size > 0:
+                    fig_cruce = px.imshow(
+                        tabla_cruce,
+                        text_auto=True,
+                        aspect="auto",
+                        color_continuous_scale=escala,
+                        labels=dict(x=columna_columnas, y=columna_filas, color="Celerados")
+                    )
+                    fig_cruce.update_layout(
+                        height=max(250, 40 * len(tabla_cruce) + 120),
+                        margin=dict(l=0, r=0, t=10, b=0),
+                        xaxis_title="",
+                        yaxis_title="",
+                        xaxis_tickangle=-45
+                    )
+                    st.plotly_chart(fig_cruce, width='stretch')
+                else:
+                    st.info("No hay datos suficientes para este cruce")
+    
+    with insights_tab5:
+        if len(cohortes) == 0:
+            st.info("No hay datos de generaciones")
+        else:
+            st.markdown("Comparativa entre generaciones con el resumen precalculado de cada cohorte")
+            
+            # Última generación frente a la anterior
+            ultima = cohortes.iloc[-1]
+            anterior = cohortes.iloc[-2] if len(cohortes) > 1 else None
+            titulo_ultima = f"### 🆕 G{cohortes.index[-1]}"
+            if anterior is not None:
+                titulo_ultima += f" frente a G{cohortes.index[-2]}"
+            st.markdown(titulo_ultima)
+            
+            def delta_cohorte(columna, formato):
+                if anterior is None or pd.isna(ultima[columna]) or pd.isna(anterior[columna]):
+                    return None
+                return formato.format(ultima[columna] - anterior[columna])
+            
+            gen_col1, gen_col2, gen_col3, gen_col4 = st.columns(4)
+            with gen_col1:
+                st.metric("👥 Celerados", int(ultima["Total"]), delta_cohorte("Total", "{:+.0f}"))
+            with gen_col2:
+                exp_ultima = ultima["Experiencia media"]
+                st.metric("📈 Exp. Media", f"{exp_ultima:.1f} años" if pd.notna(exp_ultima) else "N/A",
+                          delta_cohorte("Experiencia media", "{:+.1f} años"))
+            with gen_col3:
+                st.metric("🎓 Mentores", f"{ultima['Mentores'] * 100:.0f}%",
+                          delta_cohorte("Mentores", "{:+.0%}"))
+            with gen_col4:
+                st.metric("📝 Perfil Completo", f"{ultima['Completitud'] * 100:.0f}%",
+                          delta_cohorte("Completitud", "{:+.0%}"))
+            
+            st.divider()
+            
+            # Evolución de una métrica a lo largo de las generaciones
+            metricas_cohorte = {
+                "👥 Celerados": ("Total", 1),
+                "📈 Experiencia media (años)": ("Experiencia media", 1),
+                "🎓 Mentores (%)": ("Mentores", 100),
+                "📝 Completitud del perfil (%)": ("Completitud", 100),
+            }
+            metrica = st.selectbox("Métrica", list(metricas_cohorte), key="metrica_cohortes")
+            columna_metrica, escala_metrica = metricas_cohorte[metrica]
+            evolucion = pd.DataFrame({
+                "Generación": [f"G{gen}" for gen in cohortes.index],
+                metrica: (cohortes[columna_metrica] * escala_metrica).round(1).to_numpy(),
+            })
+            fig_evolucion = px.bar(
+                evolucion,
+                x="Generación",
+                y=metrica,
+                text=metrica,
+                color=metrica,
+                color_continuous_scale="Teal"
+            )
+            fig_evolucion.update_traces(textposition='outside')
+            fig_evolucion.update_layout(
+                showlegend=False,
+                height=350,
+                margin=dict(l=0, r=0, t=10, b=0),
+                xaxis_title=""
+            )
+            st.plotly_chart(fig_evolucion, width='stretch')
+            
+            # Tabla completa con la variación de tamaño frente a la generación anterior
+            tabla_cohortes = pd.DataFrame({
+                "Generación": [f"G{gen}" for gen in cohortes.index],
+                "Celerados": cohortes["Total"].to_numpy(),
+                "Δ vs anterior": cohortes["Total"].diff().astype("Int64").to_numpy(),
+                "Rol principal": cohortes["Rol principal"].to_numpy(),
+                "Industria principal": cohortes["Industria principal"].to_numpy(),
+                "Exp. media (años)": cohortes["Experiencia media"].round(1).to_numpy(),
+                "Mentores (%)": (cohortes["Mentores"] * 100).round(0).to_numpy(),
+                "Completitud (%)": (cohortes["Completitud"] * 100).round(0).to_numpy(),
+            })
+            st.dataframe(tabla_cohortes, width='stretch', hide_index=True)
 
-with tab5:
+@st.fragment
+def seccion_nuevo_miembro():
     st.markdown("## ➕ Agregar Nuevo Miembro")
     st.markdown("Completa el formulario para unirte a la comunidad Celera y aparecer en el directorio")
     st.markdown("")
     
+    # Resultado del último alta (se muestra tras recargar con el nuevo perfil)
+    miembro_guardado = st.session_state.pop("miembro_guardado", None)
+    if miembro_guardado:
+        st.success("✅ ¡Perfil guardado exitosamente!")
+        st.balloons()
+        if miembro_guardado["incremental"]:
+            st.info("⚡ El nuevo perfil ya aparece en el directorio, la búsqueda y el matchmaking")
+        else:
+            st.info("🔄 Directorio reconstruido: el nuevo perfil ya aparece en el directorio")
+        
+        # Mostrar resumen
+        with st.expander("📋 Resumen del perfil guardado"):
+            for etiqueta, valor in miembro_guardado["resumen"].items():
+                if valor:
+                    st.markdown(f"**{etiqueta}:** {valor}")
+    
     with st.form("formulario_nuevo_miembro", clear_on_submit=True):
         st.markdown("### 📋 Información Personal")
         col1, col2 = st.columns(2)
@@ -2251,38 +2326,52 @@ with tab5:
                     "¿Grupal o individual?": tipo_coaching,
                     "Expectativas de coaching": expectativas_coaching,
                     "¿incluirias en tu sesión de coaching perfecta?": sesion_perfecta,
-                    "¿Política de datos?": "Sí" if politica_datos else "No",
+                    "¿Política de datos?": politica_datos,  # Mismo formato que el CSV (True/False)
                     "Area de acción": ", ".join(areas_accion)  # Unir las áreas con comas
                 }
                 
                 try:
-                    # Leer CSV existente
-                    df_existente = pd.read_csv("directorio.csv.csv")
-                    
-                    # Agregar nueva fila
-                    df_nuevo = pd.concat([df_existente, pd.DataFrame([nueva_fila])], ignore_index=True)
-                    
-                    # Guardar CSV actualizado
-                    df_nuevo.to_csv("directorio.csv.csv", index=False)
-                    
-                    st.success("✅ ¡Perfil guardado exitosamente!")
-                    st.balloons()
-                    st.info("🔄 Recarga la página para ver el nuevo perfil en el directorio")
+                    # Añadir solo la fila nueva al almacén (append al CSV con bloqueo y
+                    # diario, o una transacción en SQLite) y, con el mismo bloqueo, a las
+                    # cachés de la versión anterior (snapshot e índices); si no se
+                    # puede, se reconstruyen al recargar
+                    if ALMACEN_SQLITE:
+                        estado_cache, _ = insertar_miembros(
+                            [nueva_fila], RUTA_SQLITE,
+                            al_guardar=[partial(agregar_miembros, cabecera=columnas_crudas(RUTA_SQLITE)),
+                                        invalidar_version_anterior]
+                        )
+                    else:
+                        estado_cache, _ = agregar_filas_csv(
+                            [nueva_fila], RUTA_CSV, al_guardar=[agregar_miembros, invalidar_version_anterior]
+                        )
                     
-                    # Mostrar resumen
-                    with st.expander("📋 Resumen del perfil guardado"):
-                        st.markdown(f"**Nombre:** {nombre}")
-                        st.markdown(f"**Email:** {email}")
-                        st.markdown(f"**Generación:** {generacion}")
-                        st.markdown(f"**Ubicación:** {ubicacion}")
-                        st.markdown(f"**Industrias:** {', '.join(industrias)}")
-                        st.markdown(f"**Rol:** {rol_actual}")
-                        if areas_accion:
-                            st.markdown(f"**Áreas de acción:** {', '.join(areas_accion)}")
+                    st.session_state["miembro_guardado"] = {
+                        "incremental": estado_cache is not None,
+                        "resumen": {
+                            "Nombre": nombre,
+                            "Email": email,
+                            "Generación": generacion,
+                            "Ubicación": ubicacion,
+                            "Industrias": ", ".join(industrias),
+                            "Rol": rol_actual,
+                            "Áreas de acción": ", ".join(areas_accion),
+                        },
+                    }
+                    st.rerun()
                     
                 except Exception as e:
                     st.error(f"❌ Error al guardar los datos: {str(e)}")
-                    st.info("💡 Verifica que el archivo 'directorio.csv.csv' exista y tengas permisos de escritura")
+                    st.info(f"💡 Verifica que el archivo '{RUTA_ALMACEN}' exista y tengas permisos de escritura")
+
+funciones_seccion = [
+    seccion_directorio, seccion_matchmaking, seccion_analytics, seccion_insights, seccion_nuevo_miembro,
+]
+funciones_seccion[SECCIONES.index(seccion)]()
+
+# Panel de filtros al final: sus vistas ya están pintadas en esta ejecución
+with st.sidebar:
+    panel_filtros()
 
 # --- Footer ---
 st.sidebar.markdown("---")
@@ -2294,4 +2383,12 @@ st.sidebar.info(f"""
 """)
 st.sidebar.markdown("---")
 st.sidebar.caption("Desarrollado con ❤️ para la comunidad Celera")
-st.sidebar.caption("Powered by Streamlit") 
\ No newline at end of file
+st.sidebar.caption("Powered by Streamlit")
+# Memoria de esta sesión además del directorio compartido: debe quedar plana al sumar sesiones
+memoria_sesion = directorio.bytes_propios(
+    posiciones_filtro, filtro, *vistas_sesion.values(), *st.session_state.to_dict().values()
+)
+st.sidebar.caption(
+    f"Memoria de la sesión: {memoria_sesion / 1024:,.0f} KB · "
+    f"directorio compartido: {directorio.bytes / 1e6:,.1f} MB"
+) 
\ No newline at end of file
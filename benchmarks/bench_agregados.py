@@ -0,0 +1,83 @@
+# benchmarks/bench_agregados.py
+"""
+Benchmark de la capa de agregados (CuboAgregados) de Analytics e Insights.
+
+Replica el directorio limpio hasta N filas y mide los conteos de todas las
+facetas que pintan Analytics e Insights: como antes, materializando la
+vista filtrada y contando cada columna (`value_counts`/`contar_valores`),
+y con CuboAgregados, que parte de los códigos precalculados y solo hace un
+`np.bincount` por faceta sobre las posiciones del filtro. Mide todo el
+directorio (Insights, conteos ya guardados) y una vista filtrada por
+categoría de rol (Analytics), y comprueba que los conteos coinciden.
+
+Uso:
+    python benchmarks/bench_agregados.py [N_FILAS]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+from agregados import FACETAS_AGREGADAS, CuboAgregados  # noqa: E402
+from comun import mediana_ms  # noqa: E402
+from data import RUTA_CSV, contar_valores, leer_fuente, limpiar_datos, tipar_directorio  # noqa: E402
+from multietiqueta import construir_multietiquetas  # noqa: E402
+
+
+def conteos_antes(df, multietiquetas, posiciones):
+    """Conteos de cada faceta sobre la vista materializada, como se hacían en cada rerun"""
+    vista = df if posiciones is None else df.take(posiciones)
+    conteos = {columna: contar_valores(vista[columna]) for columna in FACETAS_AGREGADAS if columna in vista.columns}
+    for columna, matriz in multietiquetas.items():
+        conteos[columna] = matriz.conteos(vista.index)
+    conteos["Años experiencia num"] = (vista["Años experiencia num"].mean(), vista["Años experiencia num"].median())
+    return conteos
+
+
+def conteos_despues(cubo, posiciones):
+    """Los mismos conteos leídos de la capa de agregados"""
+    conteos = {columna: cubo.conteos(columna, posiciones) for columna in FACETAS_AGREGADAS if columna in cubo}
+    for columna in cubo.matrices:
+        conteos[columna] = cubo.conteos(columna, posiciones)
+    experiencia = cubo.experiencia(posiciones)
+    conteos["Años experiencia num"] = (experiencia["media"], experiencia["mediana"])
+    return conteos
+
+
+def main():
+    n_filas = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    base = limpiar_datos(leer_fuente(RAIZ / RUTA_CSV))
+    repeticiones = -(-n_filas // len(base))
+    df = tipar_directorio(pd.concat([base] * repeticiones, ignore_index=True).head(n_filas))
+    multietiquetas = construir_multietiquetas(df)
+
+    inicio = time.perf_counter()
+    cubo = CuboAgregados(df, multietiquetas)
+    print(f"{n_filas:,} filas, CuboAgregados construido en {time.perf_counter() - inicio:.2f} s "
+          f"(una vez por versión de datos)\n")
+
+    roles = df["Categoría rol"].dropna().unique()[:3].tolist()
+    filtradas = np.flatnonzero(df["Categoría rol"].isin(roles).to_numpy(dtype=bool, na_value=False))
+    for nombre, posiciones in (("todo el directorio", None), (f"filtro ({len(filtradas):,} filas)", filtradas)):
+        antes = conteos_antes(df, multietiquetas, posiciones)
+        despues = conteos_despues(cubo, posiciones)
+        for columna, conteo in antes.items():
+            if isinstance(conteo, pd.Series):
+                assert conteo.index.astype(object).equals(despues[columna].index.astype(object)), columna
+                assert np.array_equal(conteo.to_numpy(), despues[columna].to_numpy()), columna
+            else:
+                assert np.allclose(conteo, despues[columna], equal_nan=True), columna
+        t_antes = mediana_ms(lambda: conteos_antes(df, multietiquetas, posiciones))
+        t_despues = mediana_ms(lambda: conteos_despues(cubo, posiciones))
+        print(f"  {nombre:<24} vista + value_counts {t_antes:9.2f} ms   "
+              f"agregados {t_despues:8.2f} ms   x{t_antes / t_despues:6.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# benchmarks/bench_almacen_sqlite.py
+"""
+Benchmark del almacén SQLite frente al DataFrame en memoria con bitmaps.
+
+Replica el CSV del directorio hasta N filas en un directorio temporal, lo
+migra a SQLite y compara, para selecciones aleatorias del sidebar, lo que
+cuesta en cada rerun el sidebar (conteos por faceta + resolver) y el
+listado del directorio con MotorFiltros sobre el DataFrame y con
+MotorFiltrosSql; comprueba que ambos devuelven las mismas filas. Mide
+también la memoria de cada camino y el alta de un miembro (transacción
+SQLite frente a append al CSV). Antes migra el Excel del repositorio y
+comprueba que el almacén devuelve el mismo directorio limpio.
+
+Uso:
+    python benchmarks/bench_almacen_sqlite.py [N_FILAS]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+from almacen_sqlite import (  # noqa: E402
+    COLUMNAS_LISTADO,
+    RUTA_SQLITE,
+    MotorFiltrosSql,
+    insertar_miembros,
+    leer_directorio,
+    migrar,
+)
+from bench_filtros import selecciones_aleatorias  # noqa: E402
+from bench_incremental import FILA_NUEVA  # noqa: E402
+from data import (  # noqa: E402
+    RUTA_CSV,
+    agregar_filas_csv,
+    cargar_directorio,
+    leer_fuente,
+    limpiar_datos,
+    tipar_directorio,
+)
+from filtros import MotorFiltros  # noqa: E402
+from multietiqueta import construir_multietiquetas  # noqa: E402
+
+RUTA_XLSX = RAIZ / "Directorio Celerados.xlsx"
+
+
+def listado_dataframe(df, posiciones):
+    """Listado del directorio como lo prepara la app sobre el DataFrame"""
+    df_mostrar = df.iloc[posiciones].copy()
+    df_mostrar["Industrias"] = df_mostrar["Industrias normalizadas"].apply(
+        lambda x: ", ".join(x) if isinstance(x, list) and x else "N/A"
+    )
+    return df_mostrar[COLUMNAS_LISTADO]
+
+
+def migrar_excel(destino):
+    """Migrar el Excel del repositorio y comprobar que el almacén devuelve el mismo directorio limpio"""
+    inicio = time.perf_counter()
+    n = migrar(RUTA_XLSX, destino)
+    print(f"{RUTA_XLSX.name}: {n} miembros migrados en {time.perf_counter() - inicio:.2f} s")
+    pd.testing.assert_frame_equal(leer_directorio(destino), tipar_directorio(limpiar_datos(leer_fuente(RUTA_XLSX))))
+
+
+def main():
+    n_filas = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    base = pd.read_csv(RAIZ / RUTA_CSV)
+    repeticiones = -(-n_filas // len(base))
+    crudo = pd.concat([base] * repeticiones, ignore_index=True).head(n_filas)
+
+    with tempfile.TemporaryDirectory() as temporal:
+        os.chdir(temporal)
+        migrar_excel(Path(temporal) / "excel.sqlite")
+        crudo.to_csv(RUTA_CSV, index=False)
+        print(f"{n_filas:,} filas")
+
+        inicio = time.perf_counter()
+        migrar(RUTA_CSV, RUTA_SQLITE)
+        print(f"  migración a SQLite        {time.perf_counter() - inicio:8.2f} s   "
+              f"{RUTA_SQLITE.stat().st_size / 1e6:8.1f} MB en disco")
+
+        df = cargar_directorio()
+        motor = MotorFiltros(df, construir_multietiquetas(df))
+        motor_sql = MotorFiltrosSql(RUTA_SQLITE)
+        print(f"  DataFrame en memoria      {df.memory_usage(deep=True).sum() / 1e6:8.1f} MB")
+
+        rng = np.random.default_rng(0)
+        tiempos = {clave: [] for clave in ("sidebar, DataFrame", "sidebar, SQLite", "listado, DataFrame",
+                                           "listado, SQLite")}
+        for _ in range(50):
+            selecciones, rango = selecciones_aleatorias(rng, motor)
+            for nombre, m in (("DataFrame", motor), ("SQLite", motor_sql)):
+                inicio = time.perf_counter()
+                m.conteos_facetas(selecciones, rango)
+                posiciones = m.resolver(selecciones, rango)
+                tiempos[f"sidebar, {nombre}"].append(time.perf_counter() - inicio)
+
+                inicio = time.perf_counter()
+                if m is motor_sql:
+                    listado = m.listado(selecciones, rango)
+                else:
+                    listado = listado_dataframe(df, posiciones)
+                tiempos[f"listado, {nombre}"].append(time.perf_counter() - inicio)
+                if m is motor:
+                    esperado = posiciones, listado
+            assert np.array_equal(esperado[0], posiciones), "Los resultados no coinciden"
+            assert len(esperado[1]) == len(listado), "Los listados no coinciden"
+
+        for nombre, muestras in tiempos.items():
+            ms = np.array(muestras) * 1000
+            print(f"  {nombre:<24} mediana {np.median(ms):8.1f} ms   p95 {np.percentile(ms, 95):8.1f} ms")
+
+        inicio = time.perf_counter()
+        insertar_miembros([FILA_NUEVA], RUTA_SQLITE)
+        print(f"  alta en SQLite            {(time.perf_counter() - inicio) * 1000:8.1f} ms")
+        inicio = time.perf_counter()
+        agregar_filas_csv([FILA_NUEVA], RUTA_CSV)
+        print(f"  append al CSV             {(time.perf_counter() - inicio) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# benchmarks/bench_busqueda.py
+"""
+Benchmark del índice de trigramas del rol actual frente a `str.contains`.
+
+Replica los roles del directorio hasta N filas (con un sufijo por fila para
+que casi todos los valores sean distintos, el peor caso para el índice),
+construye el IndiceTrigramas y compara cada búsqueda con el recorrido
+completo de la columna.
+
+Uso:
+    python benchmarks/bench_busqueda.py [N_FILAS]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from busqueda import IndiceTrigramas  # noqa: E402
+from data import cargar_directorio  # noqa: E402
+
+# Consultas sin tildes: el índice pliega acentos y str.contains no
+CONSULTAS = ["director", "ceo", "investigador", "manager", "data", "prof", "consult", "product manager"]
+
+
+def main():
+    n_filas = int(sys.argv[1]) if len(sys.argv) > 1 else 300_000
+    roles = cargar_directorio()["¿Rol actual?"]
+    repeticiones = -(-n_filas // len(roles))
+    serie = pd.concat([roles] * repeticiones, ignore_index=True).head(n_filas)
+    serie = serie.where(serie.isna(), serie + " #" + pd.Series(np.arange(n_filas)).astype(str))
+    print(f"{n_filas:,} filas, {serie.nunique():,} roles distintos")
+
+    inicio = time.perf_counter()
+    indice = IndiceTrigramas(serie)
+    print(f"  construcción del índice          {time.perf_counter() - inicio:8.2f} s")
+
+    for consulta in CONSULTAS:
+        inicio = time.perf_counter()
+        posiciones = indice.buscar(consulta)
+        t_indice = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        esperado = np.flatnonzero(serie.str.contains(consulta, case=False, na=False, regex=False).to_numpy())
+        t_scan = time.perf_counter() - inicio
+        assert np.array_equal(posiciones, esperado), f"Los resultados no coinciden para {consulta!r}"
+
+        print(f"  {consulta!r:<18} {len(posiciones):>8,} filas   "
+              f"índice {t_indice * 1000:8.2f} ms   str.contains {t_scan * 1000:8.2f} ms")
+
+    inicio = time.perf_counter()
+    aproximadas = indice.buscar("investigdor", tolerar_erratas=True)
+    print(f"  'investigdor' (erratas) {len(aproximadas):>8,} filas   "
+          f"índice {(time.perf_counter() - inicio) * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+# benchmarks/bench_clasificador.py
+"""
+Benchmark del clasificador de palabras clave frente a la implementación anterior.
+
+Compara normalizar_industrias y categorizar_rol con las versiones originales
+(búsquedas `any(palabra in texto)` fila a fila con Series.apply) sobre el
+directorio replicado hasta N filas, y verifica que los resultados coinciden.
+
+Uso:
+    python benchmarks/bench_clasificador.py [N_FILAS]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from data import RUTA_CSV  # noqa: E402
+from normalizacion import (  # noqa: E402
+    categorizar_rol,
+    clasificador_industrias,
+    clasificador_roles,
+    mapear_valores_unicos,
+    normalizar_industrias,
+)
+
+
+# --- Implementación anterior (referencia) ---
+def normalizar_industrias_legacy(ind):
+    if pd.isna(ind):
+        return []
+
+    # Separar por comas
+    industrias_raw = [i.strip() for i in str(ind).split(',')]
+    industrias_normalizadas = []
+
+    for ind_raw in industrias_raw:
+        ind_lower = ind_raw.lower()
+
+        # Categorizar cada industria
+        if any(palabra in ind_lower for palabra in ['ciencia', 'salud', 'biotech', 'biomedicina', 'médico', 'farmacéutica', 'medicina']):
+            if 'Ciencia y Salud' not in industrias_normalizadas:
+                industrias_normalizadas.append('Ciencia y Salud')
+        elif any(palabra in ind_lower for palabra in ['tecnología', 'tech', 'software', 'producto', 'ai', 'inteligencia artificial', 'digital']):
+            if 'Tecnología y Producto' not in industrias_normalizadas:
+                industrias_normalizadas.append('Tecnología y Producto')
+        elif any(palabra in ind_lower for palabra in ['energía', 'sostenibilidad', 'renovable', 'medio ambiente', 'clima']):
+            if 'Energía y Sostenibilidad' not in industrias_normalizadas:
+                industrias_normalizadas.append('Energía y Sostenibilidad')
+        elif any(palabra in ind_lower for palabra in ['educación', 'educacion', 'academia', 'universidad', 'formación']):
+            if 'Educación' not in industrias_normalizadas:
+                industrias_normalizadas.append('Educación')
+        elif any(palabra in ind_lower for palabra in ['finanzas', 'banca', 'inversión', 'inversion', 'financiero']):
+            if 'Finanzas' not in industrias_normalizadas:
+                industrias_normalizadas.append('Finanzas')
+        elif any(palabra in ind_lower for palabra in ['consultoría', 'consultoria', 'consulting']):
+            if 'Consultoría' not in industrias_normalizadas:
+                industrias_normalizadas.append('Consultoría')
+        elif any(palabra in ind_lower for palabra in ['emprendimiento', 'startup', 'founder']):
+            if 'Emprendimiento' not in industrias_normalizadas:
+                industrias_normalizadas.append('Emprendimiento')
+        elif any(palabra in ind_lower for palabra in ['ingeniería', 'ingenieria', 'engineering']):
+            if 'Ingeniería' not in industrias_normalizadas:
+                industrias_normalizadas.append('Ingeniería')
+        elif any(palabra in ind_lower for palabra in ['asuntos públicos', 'público', 'gobierno', 'administración']):
+            if 'Asuntos Públicos' not in industrias_normalizadas:
+                industrias_normalizadas.append('Asuntos Públicos')
+        elif any(palabra in ind_lower for palabra in ['servicios profesionales', 'servicios']):
+            if 'Servicios Profesionales' not in industrias_normalizadas:
+                industrias_normalizadas.append('Servicios Profesionales')
+        elif 'otro' not in ind_lower and 'corporate' not in ind_lower:
+            # Si no es "Otro" ni "Corporate", mantener como categoría única
+            if ind_raw not in industrias_normalizadas:
+                industrias_normalizadas.append(ind_raw)
+
+    return industrias_normalizadas if industrias_normalizadas else []
+
+
+def categorizar_rol_legacy(rol):
+    if pd.isna(rol):
+        return 'Sin especificar'
+
+    rol_lower = str(rol).lower()
+
+    # Orden de prioridad en la categorización
+    if any(palabra in rol_lower for palabra in ['ceo', 'founder', 'cofundador', 'chief', 'co-founder']):
+        return 'Liderazgo Ejecutivo'
+    elif any(palabra in rol_lower for palabra in ['director', 'head of', 'subdirector']):
+        return 'Liderazgo Ejecutivo'
+    elif any(palabra in rol_lower for palabra in ['médico', 'doctor', 'residente', 'msl', 'cirujano']):
+        return 'Medicina'
+    elif any(palabra in rol_lower for palabra in ['investigador', 'researcher', 'postdoc', 'científico', 'phd']):
+        return 'Investigación'
+    elif any(palabra in rol_lower for palabra in ['profesor', 'docente', 'teacher', 'lecturer']):
+        return 'Docencia'
+    elif any(palabra in rol_lower for palabra in ['manager', 'lead', 'responsable', 'coordinador']):
+        return 'Gestión'
+    elif any(palabra in rol_lower for palabra in ['consultor', 'consultant', 'advisor', 'asesor']):
+        return 'Consultoría'
+    elif any(palabra in rol_lower for palabra in ['engineer', 'ingeniero', 'developer', 'cto', 'architect']):
+        return 'Ingeniería/Desarrollo'
+    elif any(palabra in rol_lower for palabra in ['product', 'producto']):
+        return 'Producto'
+    elif any(palabra in rol_lower for palabra in ['estudiante', 'student']):
+        return 'Estudiante'
+    elif any(palabra in rol_lower for palabra in ['analista', 'analyst', 'data']):
+        return 'Análisis'
+    elif any(palabra in rol_lower for palabra in ['policy', 'política', 'gobierno']):
+        return 'Asuntos Públicos'
+    elif any(palabra in rol_lower for palabra in ['divulgador', 'comunicación']):
+        return 'Divulgación'
+    else:
+        return 'Otro'
+
+
+def medir(nombre, funcion, n_filas):
+    inicio = time.perf_counter()
+    resultado = funcion()
+    segundos = time.perf_counter() - inicio
+    print(f"  {nombre:<38} {segundos * 1000:9.1f} ms  {n_filas / segundos:12,.0f} filas/s")
+    return resultado
+
+
+def main():
+    n_filas = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    base = pd.read_csv(RUTA_CSV).rename(columns=lambda x: x.strip())
+    repeticiones = -(-n_filas // len(base))
+    df = pd.concat([base] * repeticiones, ignore_index=True).head(n_filas)
+
+    for columna, legacy, nueva, nulo, clasificador in [
+        ("Industria trabaja", normalizar_industrias_legacy, normalizar_industrias, [], clasificador_industrias),
+        ("¿Rol actual?", categorizar_rol_legacy, categorizar_rol, "Sin especificar", clasificador_roles),
+    ]:
+        serie = df[columna]
+        print(f"{columna} ({n_filas:,} filas, {serie.nunique():,} valores distintos)")
+        esperado = medir("anterior (apply fila a fila)", lambda: serie.apply(legacy), n_filas)
+        clasificador._prioridades_texto.cache_clear()
+        medir("clasificador (apply, caché fría)", lambda: serie.apply(nueva), n_filas)
+        clasificador._prioridades_texto.cache_clear()
+        obtenido = medir("clasificador + valores únicos", lambda: mapear_valores_unicos(serie, nueva, nulo), n_filas)
+        assert esperado.tolist() == obtenido.tolist(), "Los resultados no coinciden"
+        print()
+
+
+if __name__ == "__main__":
+    main()
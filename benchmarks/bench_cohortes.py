@@ -0,0 +1,83 @@
+# benchmarks/bench_cohortes.py
+"""
+Benchmark del resumen por generación (cohortes.resumen_generaciones).
+
+Replica el directorio limpio hasta N filas, reparte las filas entre G
+generaciones y compara el bucle por generación (filtrar el DataFrame con
+cada generación y contar rol, industria, experiencia, mentores y
+completitud sobre el trozo) con la pasada única de `resumen_generaciones`.
+El bucle crece con generaciones × filas; la pasada única, solo con las
+filas. En la app el resumen se calcula una vez por versión de datos, así
+que la comparativa entre generaciones no paga ninguno de los dos en cada
+rerun. Comprueba que ambos dan los mismos números.
+
+Uso:
+    python benchmarks/bench_cohortes.py [N_FILAS]
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+from agregados import CuboAgregados  # noqa: E402
+from cohortes import completitud_perfiles, resumen_generaciones  # noqa: E402
+from comun import mediana_ms  # noqa: E402
+from data import RUTA_CSV, contar_valores, leer_fuente, limpiar_datos, tipar_directorio  # noqa: E402
+from multietiqueta import construir_multietiquetas  # noqa: E402
+
+GENERACIONES = [10, 50, 200]
+
+
+def resumen_bucle(df, matriz_industrias):
+    """Estadísticas de cada generación filtrando el DataFrame generación a generación"""
+    filas = []
+    for gen in sorted(df["Generación"].dropna().unique()):
+        mascara = (df["Generación"] == gen).to_numpy(dtype=bool, na_value=False)
+        gen_df = df[mascara]
+        roles = contar_valores(gen_df["Categoría rol"])
+        industrias = matriz_industrias.conteos(np.flatnonzero(mascara))
+        filas.append({
+            "Generación": gen,
+            "Total": len(gen_df),
+            "Perfiles rol principal": roles.iloc[0] if len(roles) else 0,
+            "Perfiles industria principal": industrias.iloc[0] if len(industrias) else 0,
+            "Experiencia media": gen_df["Años experiencia num"].mean(),
+            "Mentores": (gen_df["¿Quiere ser mentor?"] == "Sí").mean(),
+            "Completitud": completitud_perfiles(gen_df).mean(),
+        })
+    return pd.DataFrame(filas).set_index("Generación")
+
+
+def main():
+    n_filas = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    base = limpiar_datos(leer_fuente(RAIZ / RUTA_CSV))
+    repeticiones = -(-n_filas // len(base))
+    df = tipar_directorio(pd.concat([base] * repeticiones, ignore_index=True).head(n_filas))
+    rng = np.random.default_rng(0)
+    df["¿Quiere ser mentor?"] = pd.Categorical(rng.choice(["Sí", "No", "Quizás"], n_filas))
+    multietiquetas = construir_multietiquetas(df)
+    print(f"{n_filas:,} filas\n")
+
+    for n_generaciones in GENERACIONES:
+        df["Generación"] = pd.array(rng.integers(1, n_generaciones + 1, n_filas), dtype="Int16")
+        agregados = CuboAgregados(df, multietiquetas)
+
+        bucle = resumen_bucle(df, multietiquetas["Industrias normalizadas"])
+        resumen = resumen_generaciones(df, agregados)
+        for columna in bucle.columns:
+            assert np.allclose(bucle[columna].to_numpy(dtype=float), resumen[columna].to_numpy(dtype=float),
+                               equal_nan=True), columna
+
+        t_bucle = mediana_ms(lambda: resumen_bucle(df, multietiquetas["Industrias normalizadas"]), repeticiones=3)
+        t_pasada = mediana_ms(lambda: resumen_generaciones(df, agregados), repeticiones=3)
+        print(f"  {n_generaciones:4d} generaciones   bucle {t_bucle:9.1f} ms   "
+              f"una pasada {t_pasada:8.1f} ms   x{t_bucle / t_pasada:6.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# benchmarks/bench_cruces.py
+"""
+Benchmark de las tablas cruzadas de CuboAgregados (producto de indicadoras dispersas).
+
+Replica el directorio limpio hasta N filas y compara, para cada cruce de
+la pestaña Insights → Cruces, el bucle por valor (filtrar el DataFrame con
+cada valor de la faceta de las filas y contar la otra columna, como hacían
+los hubs geográficos con las 3 industrias principales) con `cruce`, que
+resuelve la tabla completa con un solo producto Xᵀ·Y. El bucle crece con
+el número de valores de la faceta (superpoder × ubicación tiene ~70 filas);
+el producto, no. Comprueba que cada fila de la tabla coincide con los
+conteos del bucle.
+
+Uso:
+    python benchmarks/bench_cruces.py [N_FILAS]
+"""
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+from agregados import CuboAgregados  # noqa: E402
+from comun import mediana_ms  # noqa: E402
+from data import RUTA_CSV, contar_valores, leer_fuente, limpiar_datos, tipar_directorio  # noqa: E402
+from multietiqueta import construir_multietiquetas  # noqa: E402
+
+CRUCES = [
+    ("Industrias normalizadas", "Ubicación normalizada"),
+    ("Industrias normalizadas", "Categoría rol"),
+    ("Areas de acción normalizadas", "Generación"),
+    ("Superpoder", "Ubicación normalizada"),
+]
+
+
+def cruce_bucle(df, multietiquetas, columna_filas, columna):
+    """Conteos de `columna` para cada valor de `columna_filas`, filtrando el DataFrame valor a valor"""
+    if columna_filas in multietiquetas:
+        matriz = multietiquetas[columna_filas]
+        return {
+            etiqueta: contar_valores(df.loc[matriz.tiene_alguna([etiqueta]), columna])
+            for etiqueta in matriz.conteos().index
+        }
+    return {
+        valor: contar_valores(df.loc[df[columna_filas] == valor, columna])
+        for valor in contar_valores(df[columna_filas]).index
+    }
+
+
+def main():
+    n_filas = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    base = limpiar_datos(leer_fuente(RAIZ / RUTA_CSV))
+    repeticiones = -(-n_filas // len(base))
+    df = tipar_directorio(pd.concat([base] * repeticiones, ignore_index=True).head(n_filas))
+    multietiquetas = construir_multietiquetas(df)
+    cubo = CuboAgregados(df, multietiquetas)
+    print(f"{n_filas:,} filas\n")
+
+    for columna_filas, columna_columnas in CRUCES:
+        tabla = cubo.cruce(columna_filas, columna_columnas)
+        for etiqueta, conteos in cruce_bucle(df, multietiquetas, columna_filas, columna_columnas).items():
+            fila = tabla.loc[etiqueta]
+            fila = fila[fila > 0]
+            assert dict(zip(fila.index, fila.to_numpy())) == dict(zip(conteos.index, conteos.to_numpy())), etiqueta
+
+        t_bucle = mediana_ms(lambda: cruce_bucle(df, multietiquetas, columna_filas, columna_columnas))
+        t_cruce = mediana_ms(lambda: cubo.cruce(columna_filas, columna_columnas))
+        nombre = f"{columna_filas[:22]} × {columna_columnas[:22]}"
+        print(f"  {nombre:<48} {tabla.shape[0]:3d}×{tabla.shape[1]:<3d} bucle {t_bucle:9.2f} ms   "
+              f"Xᵀ·Y {t_cruce:8.2f} ms   x{t_bucle / t_cruce:6.1f}")
+
+
+if __name__ == "__main__":
+    main()
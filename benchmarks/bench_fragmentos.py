@@ -0,0 +1,127 @@
+# benchmarks/bench_fragmentos.py
+"""
+Benchmark del rerun parcial del panel de filtros frente al rerun completo.
+
+AppTest siempre ejecuta el script entero, así que este script sustituye su
+ScriptRunner por uno que conserva los fragmentos entre ejecuciones y puede
+pedir el rerun de un fragmento, como hace el navegador (y que, como el
+servidor, reutiliza el bytecode del script en lugar de compilarlo cada vez).
+
+Replica el CSV del directorio hasta N_FILAS y, con cada sección visible,
+mide la mediana del cambio de generación en el sidebar como rerun completo
+y como rerun del fragmento `panel_filtros` (que repinta el listado del
+directorio en su sitio o pide un rerun completo si la sección visible
+depende de los filtros).
+
+Uso:
+    python benchmarks/bench_fragmentos.py [N_FILAS] [REPETICIONES]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+from streamlit.runtime.fragment import MemoryFragmentStorage  # noqa: E402
+from streamlit.runtime.scriptrunner.script_cache import ScriptCache  # noqa: E402
+from streamlit.runtime.scriptrunner_utils.script_requests import RerunData  # noqa: E402
+from streamlit.testing.v1 import AppTest, app_test  # noqa: E402
+from streamlit.testing.v1.element_tree import parse_tree_from_messages  # noqa: E402
+from streamlit.testing.v1.local_script_runner import LocalScriptRunner, require_widgets_deltas  # noqa: E402
+
+from data import RUTA_CSV  # noqa: E402
+
+SECCIONES = ["📒 Directorio", "🔗 Matchmaking", "📊 Analytics", "🎯 Insights", "➕ Nuevo Miembro"]
+
+
+class EjecutorFragmentos(LocalScriptRunner):
+    """ScriptRunner de AppTest con fragmentos y bytecode compartidos entre ejecuciones"""
+
+    fragmentos = MemoryFragmentStorage()
+    bytecode = ScriptCache()
+    fragmento = None  # id del fragmento a volver a ejecutar (None = script entero)
+    mensajes = []
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._fragment_storage = EjecutorFragmentos.fragmentos
+        self._script_cache = EjecutorFragmentos.bytecode
+
+    def run(self, widget_state=None, query_params=None, timeout=3, page_hash=""):
+        fragmento = EjecutorFragmentos.fragmento
+        self.request_rerun(RerunData(
+            widget_states=widget_state,
+            page_script_hash=page_hash,
+            fragment_id_queue=[fragmento] if fragmento else [],
+            is_fragment_scoped_rerun=fragmento is not None,
+        ))
+        if not self._script_thread:
+            self.start()
+        require_widgets_deltas(self, timeout)
+        EjecutorFragmentos.mensajes = list(self.forward_msgs())
+        return parse_tree_from_messages(self.forward_msgs())
+
+
+def fragmento_de(etiqueta):
+    """Id del fragmento que pintó el widget con esa etiqueta en la última ejecución"""
+    for mensaje in EjecutorFragmentos.mensajes:
+        if mensaje.WhichOneof("type") == "delta":
+            elemento = mensaje.delta.new_element
+            tipo = elemento.WhichOneof("type")
+            if tipo and getattr(getattr(elemento, tipo), "label", None) == etiqueta:
+                return mensaje.delta.fragment_id
+    return None
+
+
+def cambio_generacion(at, repeticiones, fragmento):
+    """Mediana en ms de marcar y desmarcar una generación (rerun completo o del fragmento)"""
+    tiempos = []
+    for i in range(repeticiones):
+        generaciones = next(m for m in at.sidebar.multiselect if "Generación" in m.label)
+        valor = int(generaciones.options[0].split(" ")[0])
+        EjecutorFragmentos.fragmento = fragmento
+        inicio = time.perf_counter()
+        if i % 2:
+            generaciones.unselect(valor).run()
+        else:
+            generaciones.select(valor).run()
+        tiempos.append(time.perf_counter() - inicio)
+        EjecutorFragmentos.fragmento = None
+        if fragmento is not None:
+            # El árbol de un rerun parcial solo trae el fragmento: se vuelve a pintar todo
+            at.run()
+        assert not at.exception, [e.message for e in at.exception]
+    return np.median(tiempos) * 1000
+
+
+def main():
+    n_filas = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    repeticiones = int(sys.argv[2]) if len(sys.argv) > 2 else 6
+    base = pd.read_csv(RAIZ / RUTA_CSV)
+    app_test.LocalScriptRunner = EjecutorFragmentos
+
+    with tempfile.TemporaryDirectory() as temporal:
+        os.chdir(temporal)
+        for inicio in range(0, n_filas, len(base)):
+            base.head(n_filas - inicio).to_csv(RUTA_CSV, index=False, mode="a", header=inicio == 0)
+
+        at = AppTest.from_file(str(RAIZ / "app.py"), default_timeout=600)
+        at.run()
+        print(f"{n_filas:,} filas: cambio de generación en el sidebar\n")
+        print(f"  {'sección':<20} {'completo':>10} {'fragmento':>10}")
+        for seccion in SECCIONES:
+            at.radio(key="seccion").set_value(seccion).run()
+            completo = cambio_generacion(at, repeticiones, None)
+            parcial = cambio_generacion(at, repeticiones, fragmento_de("👥 Generación"))
+            print(f"  {seccion:<20} {completo:8.1f} ms {parcial:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
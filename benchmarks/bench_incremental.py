@@ -0,0 +1,90 @@
+# benchmarks/bench_incremental.py
+"""
+Benchmark del alta incremental de un miembro frente a la reconstrucción completa.
+
+Replica el CSV del directorio hasta N filas en un directorio temporal,
+construye las cachés (snapshot, TF-IDF, LSA, IVF y BM25) y compara el
+alta de una fila (append al CSV con `agregar_filas_csv` + `agregar_miembros`)
+con reescribir el CSV completo y reconstruir todos los índices.
+
+Uso:
+    python benchmarks/bench_incremental.py [N_FILAS]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+from busqueda import cargar_indice_bm25  # noqa: E402
+from data import RUTA_CSV, agregar_filas_csv, cargar_directorio, huella_datos  # noqa: E402
+from incremental import agregar_miembros  # noqa: E402
+from similitud import cargar_indice_lsa, cargar_indice_tfidf  # noqa: E402
+from vecinos_aproximados import cargar_indice_ivf  # noqa: E402
+
+FILA_NUEVA = {
+    "--": "G7",
+    "Nombre y apellido": "G7 - Miembro Nuevo",
+    "Correo electrónico1": "nuevo@example.com",
+    "Ubicación actual (ciudad/pais)": "Madrid, España",
+    "Superpoder": "Divulgación científica",
+    "Industria trabaja": "Energía, Ciencia",
+    "¿Años de experiencia?": "3-5 Años",
+    "¿Rol actual?": "Investigadora en energía solar",
+    "Área de estudio:": "Física",
+    "¿Política de datos?": True,
+    "Area de acción": "Networking, Mentoría",
+}
+
+
+def construir_caches():
+    huella = huella_datos()
+    df = cargar_directorio()
+    indice_tfidf = cargar_indice_tfidf(df, huella)
+    cargar_indice_lsa(indice_tfidf, huella)
+    cargar_indice_ivf(indice_tfidf, huella)
+    cargar_indice_bm25(df, huella)
+    return huella
+
+
+def main():
+    n_filas = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    base = pd.read_csv(RAIZ / RUTA_CSV)
+    repeticiones = -(-n_filas // len(base))
+    crudo = pd.concat([base] * repeticiones, ignore_index=True).head(n_filas)
+
+    with tempfile.TemporaryDirectory() as temporal:
+        os.chdir(temporal)
+        crudo.to_csv(RUTA_CSV, index=False)
+        construir_caches()
+        print(f"{n_filas:,} filas")
+
+        inicio = time.perf_counter()
+        agregar_filas_csv([FILA_NUEVA], RUTA_CSV)
+        print(f"  append al CSV             {(time.perf_counter() - inicio) * 1000:8.1f} ms")
+
+        inicio = time.perf_counter()
+        existente = pd.read_csv(RUTA_CSV)
+        pd.concat([existente, pd.DataFrame([FILA_NUEVA])], ignore_index=True).to_csv(RUTA_CSV, index=False)
+        print(f"  reescritura del CSV       {(time.perf_counter() - inicio) * 1000:8.1f} ms")
+
+        construir_caches()
+        inicio = time.perf_counter()
+        estado, = agregar_filas_csv([FILA_NUEVA], RUTA_CSV, al_guardar=[agregar_miembros])
+        print(f"  alta incremental          {time.perf_counter() - inicio:8.2f} s   {estado}")
+
+        for cache in Path("cache").iterdir():
+            cache.unlink()
+        inicio = time.perf_counter()
+        construir_caches()
+        print(f"  reconstrucción completa   {time.perf_counter() - inicio:8.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# benchmarks/bench_ingesta.py
+"""
+Benchmark de la ingesta por bloques frente a la carga en una sola llamada.
+
+Replica el CSV del directorio hasta N filas en un directorio temporal y
+mide, cada camino en su propio proceso (para que el pico de memoria no se
+mezcle), el tiempo y el pico de RSS de `read_csv` + `limpiar_datos` +
+`guardar_snapshot` frente a `ingerir_por_bloques` con 1 proceso y con
+todos los núcleos. El pico de los procesos del pool (el mayor de ellos)
+se mide aparte.
+
+Uso:
+    python benchmarks/bench_ingesta.py [N_FILAS] [FILAS_POR_BLOQUE]
+"""
+
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+from joblib import Parallel, delayed
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+from data import RUTA_CSV, cargar_snapshot, guardar_snapshot, ingerir_por_bloques, leer_fuente, limpiar_datos  # noqa: E402
+
+
+def pico_proceso():
+    """Pico de RSS del proceso en MB (ru_maxrss está en KB en Linux)"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def ejecutar(camino, filas):
+    """Ejecutar un camino de ingesta en este proceso e imprimir tiempo y pico de memoria"""
+    inicio = time.perf_counter()
+    if camino == "completa":
+        guardar_snapshot(limpiar_datos(leer_fuente(RUTA_CSV)), camino)
+    else:
+        ingerir_por_bloques(RUTA_CSV, camino, filas=filas, n_jobs=1 if camino == "bloques-1" else -1)
+    segundos = time.perf_counter() - inicio
+    propio = pico_proceso()
+    pool = 0.0
+    if camino == "bloques-n":
+        # Los procesos de loky siguen vivos y se reutilizan: se les pregunta su propio pico
+        pool = max(Parallel(n_jobs=-1)(delayed(pico_proceso)() for _ in range(os.cpu_count())))
+    filas_snapshot = len(cargar_snapshot(camino))
+    print(f"  {camino:<12} {segundos:8.2f} s   pico {propio:8.0f} MB   pool {pool:8.0f} MB   {filas_snapshot:,} filas")
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--camino":
+        ejecutar(sys.argv[2], int(sys.argv[3]))
+        return
+
+    n_filas = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    filas = int(sys.argv[2]) if len(sys.argv) > 2 else 50_000
+    base = pd.read_csv(RAIZ / RUTA_CSV)
+
+    with tempfile.TemporaryDirectory() as temporal:
+        os.chdir(temporal)
+        # Se escribe por copias del directorio: el pico de memoria de este proceso
+        # lo heredan los subprocesos en ru_maxrss y debe quedar por debajo del suyo
+        for inicio in range(0, n_filas, len(base)):
+            base.head(n_filas - inicio).to_csv(RUTA_CSV, index=False, mode="a", header=inicio == 0)
+        print(f"{n_filas:,} filas, {Path(RUTA_CSV).stat().st_size / 1e6:.1f} MB de CSV, bloques de {filas:,}")
+        for camino in ("completa", "bloques-1", "bloques-n"):
+            subprocess.run([sys.executable, __file__, "--camino", camino, str(filas)], check=True)
+
+
+if __name__ == "__main__":
+    main()
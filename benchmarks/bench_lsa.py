@@ -0,0 +1,65 @@
+# benchmarks/bench_lsa.py
+"""
+Benchmark de los embeddings LSA densos frente a la matriz TF-IDF dispersa.
+
+Sobre N perfiles sintéticos (ver bench_vecinos_aproximados.py) compara,
+para varias dimensiones: memoria de la representación, latencia de la
+similitud de un perfil con todo el directorio y solapamiento del top-k de
+matches textuales con el del camino TF-IDF actual.
+
+Uso:
+    python benchmarks/bench_lsa.py [N_FILAS] [K]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_vecinos_aproximados import textos_sinteticos  # noqa: E402
+from similitud import IndiceLsa, IndiceTfidf, crear_vectorizador  # noqa: E402
+
+
+def medir(indice, consultas, k):
+    """Latencia media (ms) y top-k de cada consulta"""
+    tops, inicio = [], time.perf_counter()
+    for fila in consultas:
+        similitudes = indice.similitudes(fila)
+        similitudes[indice.index.get_loc(fila)] = -np.inf
+        tops.append(np.argpartition(-similitudes, k)[:k])
+    return (time.perf_counter() - inicio) * 1000 / len(consultas), tops
+
+
+def main():
+    n_filas = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    k = int(sys.argv[2]) if len(sys.argv) > 2 else 15
+
+    vectorizador = crear_vectorizador()
+    matriz = vectorizador.fit_transform(textos_sinteticos(n_filas))
+    indice_tfidf = IndiceTfidf(matriz, [0, matriz.shape[1]], ["texto"], vectorizador.get_feature_names_out(),
+                               vectorizador.idf_, pd.RangeIndex(n_filas), pesos={"texto": 1})
+    consultas = np.random.default_rng(0).choice(n_filas, size=200, replace=False)
+
+    memoria = indice_tfidf.matriz.data.nbytes + indice_tfidf.matriz.indices.nbytes + indice_tfidf.matriz.indptr.nbytes
+    ms, tops_tfidf = medir(indice_tfidf, consultas, k)
+    print(f"{n_filas:,} perfiles sintéticos, {matriz.shape[1]} términos")
+    print(f"  {'modo':<12}  {'memoria':>9}  {'construcción':>12}  {'ms/consulta':>11}  {'solape top-' + str(k):>14}")
+    print(f"  {'TF-IDF':<12}  {memoria / 1e6:>7.1f}MB  {'':>12}  {ms:>11.2f}  {1:>14.3f}")
+
+    for dimensiones in (64, 128, 256):
+        inicio = time.perf_counter()
+        indice_lsa = IndiceLsa.construir(indice_tfidf, dimensiones)
+        t_construccion = time.perf_counter() - inicio
+
+        ms, tops_lsa = medir(indice_lsa, consultas, k)
+        solape = np.mean([len(np.intersect1d(a, b)) / k for a, b in zip(tops_tfidf, tops_lsa)])
+        print(f"  {'LSA ' + str(dimensiones):<12}  {indice_lsa.vectores.nbytes / 1e6:>7.1f}MB  "
+              f"{t_construccion:>10.1f} s  {ms:>11.2f}  {solape:>14.3f}")
+
+
+if __name__ == "__main__":
+    main()
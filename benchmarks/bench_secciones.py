@@ -0,0 +1,86 @@
+# benchmarks/bench_secciones.py
+"""
+Benchmark de la latencia de rerun al cambiar un filtro del sidebar, por sección.
+
+Replica el CSV del directorio hasta N_FILAS en un directorio temporal y,
+con AppTest, elige cada sección de la app y mide la mediana del rerun
+completo al marcar y desmarcar una generación en el sidebar. Solo se
+ejecuta la sección visible (con st.tabs cada rerun las ejecutaba todas).
+Como el servidor, se reutiliza el bytecode del script entre reruns (AppTest
+lo compila en cada uno).
+
+Uso:
+    python benchmarks/bench_secciones.py [N_FILAS] [REPETICIONES]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+from streamlit.runtime.scriptrunner.script_cache import ScriptCache  # noqa: E402
+from streamlit.testing.v1 import AppTest, app_test  # noqa: E402
+from streamlit.testing.v1.local_script_runner import LocalScriptRunner  # noqa: E402
+
+from data import RUTA_CSV  # noqa: E402
+
+SECCIONES = ["📒 Directorio", "🔗 Matchmaking", "📊 Analytics", "🎯 Insights", "➕ Nuevo Miembro"]
+
+
+class EjecutorConCache(LocalScriptRunner):
+    """ScriptRunner de AppTest que reutiliza el bytecode del script entre ejecuciones"""
+
+    bytecode = ScriptCache()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._script_cache = EjecutorConCache.bytecode
+
+
+def rerun_filtro(at, repeticiones):
+    """Mediana en ms del rerun al cambiar la selección de generación del sidebar"""
+    tiempos = []
+    for i in range(repeticiones):
+        generaciones = next(m for m in at.sidebar.multiselect if "Generación" in m.label)
+        # Las opciones de AppTest llevan el conteo en la etiqueta ("1 (9)"): se marca el valor
+        valor = int(generaciones.options[0].split(" ")[0])
+        inicio = time.perf_counter()
+        if i % 2:
+            generaciones.unselect(valor).run()
+        else:
+            generaciones.select(valor).run()
+        tiempos.append(time.perf_counter() - inicio)
+        assert not at.exception, [e.message for e in at.exception]
+    return np.median(tiempos) * 1000
+
+
+def main():
+    n_filas = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    repeticiones = int(sys.argv[2]) if len(sys.argv) > 2 else 6
+    base = pd.read_csv(RAIZ / RUTA_CSV)
+    app_test.LocalScriptRunner = EjecutorConCache
+
+    with tempfile.TemporaryDirectory() as temporal:
+        os.chdir(temporal)
+        for inicio in range(0, n_filas, len(base)):
+            base.head(n_filas - inicio).to_csv(RUTA_CSV, index=False, mode="a", header=inicio == 0)
+
+        at = AppTest.from_file(str(RAIZ / "app.py"), default_timeout=600)
+        inicio = time.perf_counter()
+        at.run()
+        print(f"{n_filas:,} filas, primera carga (cachés e índices) en {time.perf_counter() - inicio:.1f} s\n")
+
+        for seccion in SECCIONES:
+            at.radio(key="seccion").set_value(seccion).run()
+            print(f"  {seccion:<20} {rerun_filtro(at, repeticiones):9.1f} ms por rerun")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# benchmarks/bench_sesiones.py
+"""
+Benchmark de la memoria por sesión con el directorio compartido.
+
+Replica el CSV del directorio hasta N_FILAS en un directorio temporal y
+abre N sesiones de la app con AppTest en el mismo proceso (comparten las
+cachés de `st.cache_resource`, como las sesiones de un servidor), cada una
+con una selección distinta de generación, y las mantiene vivas. Tras cada
+sesión imprime el RSS del proceso y la "Memoria de la sesión" que muestra
+el sidebar: el crecimiento por sesión debe quedar plano y muy por debajo
+del directorio. Como referencia, mide lo que costaba la copia del
+directorio que `st.cache_data` entregaba en cada rerun. El RSS incluye lo
+que AppTest guarda de cada sesión (el árbol de elementos y los gráficos).
+
+Uso:
+    python benchmarks/bench_sesiones.py [N_SESIONES] [N_FILAS]
+"""
+
+import os
+import pickle
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+import pandas as pd  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from data import RUTA_CSV, cargar_directorio  # noqa: E402
+
+
+def rss_mb():
+    """RSS actual del proceso en MB (Linux)"""
+    with open("/proc/self/status") as estado:
+        for linea in estado:
+            if linea.startswith("VmRSS:"):
+                return int(linea.split()[1]) / 1024
+    return 0.0
+
+
+def memoria_sidebar(at):
+    """Texto de la memoria de la sesión mostrado en el sidebar"""
+    for caption in at.sidebar.caption:
+        if caption.value.startswith("Memoria de la sesión"):
+            return caption.value
+    return "-"
+
+
+def main():
+    n_sesiones = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    n_filas = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+    base = pd.read_csv(RAIZ / RUTA_CSV)
+
+    with tempfile.TemporaryDirectory() as temporal:
+        os.chdir(temporal)
+        for inicio in range(0, n_filas, len(base)):
+            base.head(n_filas - inicio).to_csv(RUTA_CSV, index=False, mode="a", header=inicio == 0)
+        medir_sesiones(n_sesiones)
+
+
+def medir_sesiones(n_sesiones):
+    """Abrir las sesiones en el directorio actual e imprimir la memoria tras cada una"""
+    df = cargar_directorio(RUTA_CSV)
+    inicio = time.perf_counter()
+    copia = pickle.loads(pickle.dumps(df))
+    segundos = time.perf_counter() - inicio
+    print(f"{len(df):,} filas. Copia de st.cache_data por rerun: {copia.memory_usage(deep=True).sum() / 1e6:.1f} MB, "
+          f"{segundos * 1000:.1f} ms")
+    del copia
+
+    sesiones = []
+    rss_inicial = None
+    for i in range(n_sesiones):
+        at = AppTest.from_file(str(RAIZ / "app.py"), default_timeout=300)
+        at.run()
+        if i:
+            generaciones = next(m for m in at.sidebar.multiselect if "Generación" in m.label)
+            generaciones.select(generaciones.options[i % len(generaciones.options)]).run()
+        assert not at.exception, [e.message for e in at.exception]
+        sesiones.append(at)
+        rss = rss_mb()
+        if rss_inicial is None:
+            # La primera sesión carga el directorio y los índices compartidos
+            rss_inicial = rss
+        crecimiento = (rss - rss_inicial) / i if i else 0.0
+        print(f"  {i + 1:3d} sesiones   RSS {rss:8.1f} MB   +{crecimiento:6.2f} MB/sesión   {memoria_sidebar(at)}")
+
+
+if __name__ == "__main__":
+    main()
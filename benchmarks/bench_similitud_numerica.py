@@ -0,0 +1,85 @@
+# benchmarks/bench_similitud_numerica.py
+"""
+Benchmark de la similitud numérica vectorizada frente al bucle por filas.
+
+Compara SimilitudNumerica con la implementación original de
+encontrar_matches (una llamada a `calcular_similitud_numerica` por
+candidato con `df.iloc[i]`) sobre el directorio replicado hasta N filas, y
+verifica que los resultados coinciden.
+
+Uso:
+    python benchmarks/bench_similitud_numerica.py [N_FILAS]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from data import cargar_directorio  # noqa: E402
+from similitud import SimilitudNumerica  # noqa: E402
+
+
+# --- Implementación anterior (referencia) ---
+def calcular_similitud_numerica_legacy(perfil1, perfil2):
+    score = 0.0
+    features_count = 0
+
+    if pd.notna(perfil1.get("Años experiencia num")) and pd.notna(perfil2.get("Años experiencia num")):
+        diff = abs(perfil1["Años experiencia num"] - perfil2["Años experiencia num"])
+        score += 1 - (min(diff, 15) / 15)
+        features_count += 1
+
+    if pd.notna(perfil1.get("Generación")) and pd.notna(perfil2.get("Generación")):
+        try:
+            diff_gen = abs(int(perfil1["Generación"]) - int(perfil2["Generación"]))
+            if diff_gen == 0:
+                score += 1.0
+            elif diff_gen == 1:
+                score += 0.7
+            elif diff_gen == 2:
+                score += 0.4
+            else:
+                score += 0.1
+            features_count += 1
+        except:
+            pass
+
+    return score / features_count if features_count > 0 else 0.0
+
+
+def main():
+    n_filas = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    base = cargar_directorio()
+    repeticiones = -(-n_filas // len(base))
+    df = pd.concat([base] * repeticiones, ignore_index=True).head(n_filas)
+    print(f"{n_filas:,} filas")
+
+    inicio = time.perf_counter()
+    similitud = SimilitudNumerica(df)
+    print(f"  construcción de los arrays       {time.perf_counter() - inicio:8.4f} s")
+
+    for referencia in [0, 7, 42]:
+        inicio = time.perf_counter()
+        vectorizada = similitud.similitudes(df.index[referencia], df.index)
+        t_vector = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        perfil_ref = df.iloc[referencia]
+        esperada = np.array([
+            calcular_similitud_numerica_legacy(perfil_ref, df.iloc[i]) for i in range(len(df))
+        ])
+        t_bucle = time.perf_counter() - inicio
+        assert np.allclose(vectorizada, esperada), "Los resultados no coinciden"
+
+        print(f"  perfil {referencia:<4} vectorizada {t_vector * 1000:8.3f} ms   "
+              f"bucle {t_bucle * 1000:10.1f} ms   "
+              f"({t_vector / n_filas * 1e9:.1f} µs por cada mil candidatos)")
+
+
+if __name__ == "__main__":
+    main()
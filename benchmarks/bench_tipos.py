@@ -0,0 +1,75 @@
+# benchmarks/bench_tipos.py
+"""
+Benchmark de los tipos del directorio (category, string de Arrow, Int16) frente a object.
+
+Replica el directorio limpio hasta N filas y compara la columna de objetos
+que devuelve limpiar_datos con la de `tipar_directorio`: informe de
+memoria por columna (`memory_usage(deep=True)`) y tiempo de los filtros
+`isin`, `value_counts` y `pd.factorize` (la construcción de MotorFiltros)
+sobre las facetas.
+
+Uso:
+    python benchmarks/bench_tipos.py [N_FILAS]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+from comun import mediana_ms  # noqa: E402
+from data import RUTA_CSV, contar_valores, leer_fuente, limpiar_datos, tipar_directorio  # noqa: E402
+
+COLUMNAS_TIEMPOS = ["Generación", "Categoría rol", "Superpoder", "Ubicación normalizada", "¿Años de experiencia?"]
+
+
+def informe_memoria(antes, despues):
+    """Memoria por columna (MB) antes y después de tipar, de mayor a menor ahorro"""
+    informe = pd.DataFrame({
+        "tipo antes": antes.dtypes.astype(str),
+        "tipo después": despues.dtypes.astype(str),
+        "MB antes": antes.memory_usage(deep=True, index=False) / 1e6,
+        "MB después": despues.memory_usage(deep=True, index=False) / 1e6,
+    })
+    informe["ahorro"] = informe["MB antes"] - informe["MB después"]
+    informe = informe.sort_values("ahorro", ascending=False)
+    informe.loc["TOTAL"] = ["", "", informe["MB antes"].sum(), informe["MB después"].sum(), informe["ahorro"].sum()]
+    return informe
+
+
+def main():
+    n_filas = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    base = limpiar_datos(leer_fuente(RAIZ / RUTA_CSV))
+    repeticiones = -(-n_filas // len(base))
+    antes = pd.concat([base] * repeticiones, ignore_index=True).head(n_filas)
+    inicio = time.perf_counter()
+    despues = tipar_directorio(antes.copy())
+    print(f"{n_filas:,} filas, tipar_directorio en {time.perf_counter() - inicio:.2f} s\n")
+
+    with pd.option_context("display.width", 160, "display.max_colwidth", 40, "display.float_format", "{:.1f}".format):
+        print(informe_memoria(antes, despues).to_string())
+
+    print()
+    for columna in COLUMNAS_TIEMPOS:
+        valores = base[columna].dropna().unique()[:3].tolist()
+        if columna == "Generación":
+            # En el directorio tipado la generación es un número
+            valores_tipados = [int(v) for v in valores]
+        else:
+            valores_tipados = valores
+        for nombre, funcion_antes, funcion_despues in (
+            ("isin", lambda: antes[columna].isin(valores), lambda: despues[columna].isin(valores_tipados)),
+            ("value_counts", lambda: antes[columna].value_counts(), lambda: contar_valores(despues[columna])),
+            ("factorize", lambda: pd.factorize(antes[columna]), lambda: pd.factorize(despues[columna])),
+        ):
+            t_antes, t_despues = mediana_ms(funcion_antes), mediana_ms(funcion_despues)
+            print(f"  {columna[:24]:<24} {nombre:<13} object {t_antes:8.2f} ms   "
+                  f"{str(despues[columna].dtype):<9} {t_despues:8.2f} ms   x{t_antes / t_despues:5.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# benchmarks/bench_vecinos_aproximados.py
+"""
+Benchmark del índice IVF de vecinos aproximados a escala de varias comunidades.
+
+Genera N perfiles sintéticos mezclando las features enriquecidas de dos
+perfiles reales (70% de las palabras de uno y 30% del otro), ajusta el
+TF-IDF del matchmaking, construye el IndiceIVF e imprime el informe de
+recall@k y latencia frente al recorrido exacto.
+
+Uso:
+    python benchmarks/bench_vecinos_aproximados.py [N_FILAS] [K]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from comun import crear_features_enriquecidas  # noqa: E402
+from data import cargar_directorio  # noqa: E402
+from similitud import crear_vectorizador  # noqa: E402
+from vecinos_aproximados import IndiceIVF, imprimir_informe, informe_recall  # noqa: E402
+
+
+def textos_sinteticos(n_filas, semilla=0):
+    palabras = [texto.split() for texto in cargar_directorio().apply(crear_features_enriquecidas, axis=1)]
+    rng = np.random.default_rng(semilla)
+    textos = []
+    for a, b in rng.integers(0, len(palabras), size=(n_filas, 2)):
+        mezcla = [p for p in palabras[a] if rng.random() < 0.7] + [p for p in palabras[b] if rng.random() < 0.3]
+        textos.append(" ".join(mezcla))
+    return textos
+
+
+def main():
+    n_filas = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    k = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    matriz = crear_vectorizador().fit_transform(textos_sinteticos(n_filas)).tocsr()
+    print(f"{n_filas:,} perfiles sintéticos, {matriz.shape[1]} términos")
+
+    inicio = time.perf_counter()
+    indice = IndiceIVF.construir(matriz)
+    print(f"  construcción del índice ({indice.num_listas} listas)  {time.perf_counter() - inicio:8.2f} s")
+
+    imprimir_informe(informe_recall(indice, matriz, k, sondas=(1, 2, 4, 8, 16, 32)), k)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# benchmarks/comun.py
+"""Utilidades compartidas por los benchmarks (no es un benchmark ejecutable)"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+
+def mediana_ms(funcion, repeticiones=7):
+    """Mediana en milisegundos de `repeticiones` llamadas a `funcion()`"""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return np.median(tiempos) * 1000
+
+
+def crear_features_enriquecidas(row):
+    """
+    Crear representación textual enriquecida con pesos semánticos.
+
+    Construcción anterior a IndiceTfidf: aplica los pesos repitiendo el
+    texto de cada campo en un único string.
+    """
+    features = []
+
+    # NIVEL 1: Características CORE (peso x4) - Más importantes
+    if "Industrias normalizadas" in row and isinstance(row["Industrias normalizadas"], list):
+        for _ in range(4):
+            features.extend(row["Industrias normalizadas"])
+
+    if pd.notna(row.get("Categoría rol")):
+        categoria = str(row["Categoría rol"])
+        features.extend([categoria] * 4)
+
+    # NIVEL 2: Características IMPORTANTES (peso x3)
+    if "Areas de acción normalizadas" in row and isinstance(row["Areas de acción normalizadas"], list):
+        for _ in range(3):
+            features.extend(row["Areas de acción normalizadas"])
+
+    # NIVEL 3: Características SECUNDARIAS (peso x2)
+    if pd.notna(row.get("Ubicación normalizada")):
+        ubicacion = str(row["Ubicación normalizada"])
+        features.extend([ubicacion] * 2)
+
+    if pd.notna(row.get("Área de estudio:")):
+        area = str(row["Área de estudio:"])
+        features.extend([area] * 2)
+
+    # NIVEL 4: Características CONTEXTUALES (peso x2)
+    if pd.notna(row.get("¿Rol actual?")):
+        features.extend([str(row["¿Rol actual?"])] * 2)
+
+    if pd.notna(row.get("Superpoder")):
+        features.extend([str(row["Superpoder"])] * 2)
+
+    if pd.notna(row.get("¿Motivación para unirte?")):
+        features.extend([str(row["¿Motivación para unirte?"])] * 2)
+
+    # NIVEL 5: Características ADICIONALES (peso x2) - Conexiones y expertise
+    if pd.notna(row.get("¿Qué conexiones buscas?")):
+        features.extend([str(row["¿Qué conexiones buscas?"])] * 2)
+
+    if pd.notna(row.get("¿Área mas valor aportaría?")):
+        features.extend([str(row["¿Área mas valor aportaría?"])] * 2)
+
+    if pd.notna(row.get("Áreas de especialización o interés:")):
+        features.extend([str(row["Áreas de especialización o interés:"])] * 2)
+
+    # NIVEL 6: Características COMPLEMENTARIAS (peso x1)
+    if pd.notna(row.get("¿Temas podría abordar?")):
+        features.append(str(row["¿Temas podría abordar?"]))
+
+    if pd.notna(row.get("¿Empresa?")):
+        features.append(str(row["¿Empresa?"]))
+
+    if pd.notna(row.get("¿Universidad?")):
+        features.append(str(row["¿Universidad?"]))
+
+    # NIVEL 7: Meta-características (generación como contexto)
+    if pd.notna(row.get("Generación")):
+        features.append(f"Gen{row['Generación']}")
+
+    return " ".join(str(f) for f in features if f)
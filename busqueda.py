@@ -0,0 +1,480 @@
+# busqueda.py
+"""Índices de búsqueda de texto libre del directorio"""
+
+import functools
+import re
+import unicodedata
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from data import guardar_arrays, ruta_indice
+
+# Máximo de erratas toleradas en una búsqueda aproximada
+MAX_ERRATAS = 2
+
+_VACIO = np.empty(0, dtype=np.int32)
+_RE_PALABRA = re.compile(r"\w+")
+# Marcas diacríticas combinables que quedan al descomponer (NFKD) las letras acentuadas
+_RE_DIACRITICOS = re.compile("[\u0300-\u036f]")
+
+
+def plegar(texto):
+    """Pasar a minúsculas y quitar tildes y diacríticos ("Médica" -> "medica")"""
+    return _RE_DIACRITICOS.sub("", unicodedata.normalize("NFKD", str(texto).casefold()))
+
+
+def trigramas(texto):
+    """Conjunto de subcadenas de 3 caracteres del texto"""
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+def distancia_subcadena(patron, texto):
+    """
+    Mínima distancia de edición entre el patrón y cualquier subcadena del texto.
+
+    Programación dinámica de Sellers: como la Levenshtein clásica, pero
+    empezar y terminar en cualquier posición del texto no cuesta nada.
+    """
+    anterior = [0] * (len(texto) + 1)
+    for i, c in enumerate(patron, 1):
+        actual = [i]
+        for j, t in enumerate(texto, 1):
+            actual.append(min(anterior[j - 1] + (c != t), anterior[j] + 1, actual[j - 1] + 1))
+        anterior = actual
+    return min(anterior)
+
+
+def erratas_permitidas(termino):
+    """
+    Erratas que se toleran según la longitud del término buscado.
+
+    Por el lema de los q-gramas, una subcadena a distancia k del término
+    comparte al menos len - 2 - 3k trigramas con ella: solo se admite k si
+    ese mínimo es positivo, así el filtrado por trigramas sigue siendo útil.
+    """
+    return max(0, min(MAX_ERRATAS, (len(termino) - 3) // 3))
+
+
+class IndiceTrigramas:
+    """
+    Índice invertido de trigramas sobre una columna de texto, construido una vez.
+
+    El texto se pliega (minúsculas, sin tildes) y se indexa por valor
+    distinto: cada trigrama apunta a la lista ordenada de valores que lo
+    contienen. Una búsqueda por subcadena intersecta las listas de los
+    trigramas de la consulta y solo verifica esos candidatos, en lugar de
+    recorrer toda la columna con `str.contains`. La búsqueda con erratas
+    usa un segundo índice sobre el vocabulario de palabras.
+    """
+
+    def __init__(self, serie):
+        self.n = len(serie)
+        codigos, valores = pd.factorize(serie, use_na_sentinel=True)
+        self.textos = [plegar(v) for v in valores]
+
+        # Filas de cada valor distinto: posiciones agrupadas por código
+        orden = np.argsort(codigos, kind="stable")
+        self._filas = orden.astype(np.int32)
+        self._limites = np.searchsorted(codigos[orden], np.arange(len(valores) + 1))
+
+        postings = {}
+        for i, texto in enumerate(self.textos):
+            for trigrama in trigramas(texto):
+                postings.setdefault(trigrama, []).append(i)
+        self._postings = {t: np.asarray(p, dtype=np.int32) for t, p in postings.items()}
+
+        # Vocabulario de palabras para la búsqueda con erratas: se repiten mucho
+        # más que los textos completos, así que se compara contra pocas cadenas
+        valores_palabra = {}
+        for i, texto in enumerate(self.textos):
+            for palabra in set(_RE_PALABRA.findall(texto)):
+                valores_palabra.setdefault(palabra, []).append(i)
+        self.palabras = list(valores_palabra)
+        self._valores_palabra = [np.asarray(v, dtype=np.int32) for v in valores_palabra.values()]
+        postings_palabras = {}
+        for i, palabra in enumerate(self.palabras):
+            for trigrama in trigramas(palabra):
+                postings_palabras.setdefault(trigrama, []).append(i)
+        self._postings_palabras = {t: np.asarray(p, dtype=np.int32) for t, p in postings_palabras.items()}
+
+    def _filas_de(self, valores):
+        """Posiciones ordenadas de las filas que tienen alguno de los valores"""
+        if len(valores) == 0:
+            return _VACIO
+        trozos = [self._filas[self._limites[v]:self._limites[v + 1]] for v in valores]
+        return np.sort(np.concatenate(trozos))
+
+    def valores_exactos(self, consulta):
+        """Valores distintos cuyo texto plegado contiene la consulta plegada"""
+        grams = trigramas(consulta)
+        if not grams:
+            # Consultas de 1-2 caracteres: se recorre el vocabulario, no las filas
+            candidatos = range(len(self.textos))
+        else:
+            listas = sorted((self._postings.get(g, _VACIO) for g in grams), key=len)
+            candidatos = listas[0]
+            for lista in listas[1:]:
+                if len(candidatos) == 0:
+                    break
+                candidatos = np.intersect1d(candidatos, lista, assume_unique=True)
+        # Compartir todos los trigramas no garantiza que aparezcan seguidos: verificar
+        return [v for v in candidatos if consulta in self.textos[v]]
+
+    def palabras_aproximadas(self, termino, max_erratas):
+        """Palabras del vocabulario con alguna subcadena a distancia <= max_erratas del término"""
+        minimo = len(termino) - 2 - 3 * max_erratas
+        if minimo <= 0:
+            candidatos = range(len(self.palabras))
+        else:
+            listas = [self._postings_palabras[g] for g in trigramas(termino)
+                      if g in self._postings_palabras]
+            if not listas:
+                return []
+            compartidos = np.bincount(np.concatenate(listas), minlength=len(self.palabras))
+            candidatos = np.flatnonzero(compartidos >= minimo)
+        return [p for p in candidatos
+                if distancia_subcadena(termino, self.palabras[p]) <= max_erratas]
+
+    def valores_aproximados(self, consulta):
+        """
+        Valores distintos que contienen cada término de la consulta, con erratas.
+
+        Cada término se compara con el vocabulario de palabras (filtrado por
+        trigramas compartidos) y los valores de sus palabras se intersectan
+        entre términos.
+        """
+        resultado = None
+        for termino in _RE_PALABRA.findall(consulta):
+            max_erratas = erratas_permitidas(termino)
+            if max_erratas:
+                palabras = self.palabras_aproximadas(termino, max_erratas)
+                listas = [self._valores_palabra[p] for p in palabras]
+                valores = np.unique(np.concatenate(listas)) if listas else _VACIO
+            else:
+                valores = np.asarray(self.valores_exactos(termino), dtype=np.int32)
+            resultado = valores if resultado is None else np.intersect1d(resultado, valores, assume_unique=True)
+            if len(resultado) == 0:
+                break
+        return [] if resultado is None else resultado
+
+    def buscar(self, texto, tolerar_erratas=False):
+        """
+        Filas cuyo texto contiene la consulta, sin distinguir mayúsculas ni tildes.
+
+        Args:
+            texto: Consulta libre (subcadena o prefijo)
+            tolerar_erratas: Aceptar también coincidencias aproximadas: cada
+                palabra de la consulta admite `erratas_permitidas(palabra)`
+                errores de edición dentro de una palabra del texto
+
+        Returns:
+            Array ordenado de posiciones de fila (int32)
+        """
+        consulta = plegar(texto)
+        if tolerar_erratas and any(erratas_permitidas(t) for t in _RE_PALABRA.findall(consulta)):
+            valores = self.valores_aproximados(consulta)
+        else:
+            valores = self.valores_exactos(consulta)
+        return self._filas_de(valores)
+
+
+# --- Búsqueda global BM25 sobre las respuestas de texto libre ---
+
+# Versión del formato y de la tokenización del índice: incrementar al cambiarlos
+VERSION_INDICE_BM25 = 2
+
+# Campos indexados y su peso en la puntuación (BM25F)
+CAMPOS_BM25 = {
+    "Nombre y apellido": 3.0,
+    "¿Rol actual?": 1.5,
+    "¿Empresa?": 1.5,
+    "Superpoder": 2.0,
+    "Áreas de especialización o interés:": 2.0,
+    "¿Temas podría abordar?": 1.5,
+    "¿Quién eres?": 1.0,
+    "¿Qué conexiones buscas?": 1.0,
+    "¿Cómo te gustaría impactar o cambiar el mundo?": 1.0,
+}
+
+# Parámetros clásicos de BM25
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Palabras vacías (ya plegadas, sin tildes); los perfiles mezclan español e inglés
+PALABRAS_VACIAS = frozenset("""
+a al algo algun alguna algunas alguno algunos ante antes asi aun bajo bien cada
+como con contra cual cuando de del desde donde dos el ella ellas ellos en entre
+era eres es esa esas ese eso esos esta estan estar estas este esto estos fue ha
+hace hacer hacia han hasta hay la las le les lo los mas me mi mis mucho muy nada
+ni no nos nuestra nuestro o os otra otro para pero poco por porque que quien se
+ser si sin sobre soy su sus tambien te tener tengo ti tiene todo todos tu tus un
+una uno unos y ya yo
+and are as at be by for from in is it of on or that the this to with
+""".split())
+
+
+@functools.lru_cache(maxsize=65536)
+def raiz_ligera(palabra):
+    """
+    Stemming ligero para español: quita el plural y la vocal de género.
+
+    "investigadoras", "investigador" e "investigadores" comparten raíz
+    ("investigador"), igual que "ciencia" y "ciencias".
+    """
+    if len(palabra) > 3 and palabra.endswith("s"):
+        palabra = palabra[:-1]
+    if len(palabra) > 3 and palabra[-1] in "aeo":
+        palabra = palabra[:-1]
+    return palabra
+
+
+def tokenizar(texto):
+    """Términos de búsqueda de un texto: plegado, sin palabras vacías y con raíz ligera"""
+    return [raiz_ligera(palabra) for palabra in _RE_PALABRA.findall(plegar(texto))
+            if len(palabra) > 1 and palabra not in PALABRAS_VACIAS]
+
+
+def fragmento(texto, terminos, contexto=12):
+    """
+    Fragmento del texto alrededor de la primera coincidencia, con los términos en negrita.
+
+    Args:
+        texto: Texto original del campo
+        terminos: Conjunto de términos de la consulta (tokenizados)
+        contexto: Número de palabras que se muestran a cada lado
+
+    Returns:
+        Texto en Markdown o None si ningún término aparece
+    """
+    palabras = str(texto).split()
+    coincide = [bool(set(tokenizar(p)) & terminos) for p in palabras]
+    if not any(coincide):
+        return None
+    centro = coincide.index(True)
+    inicio, fin = max(0, centro - contexto), min(len(palabras), centro + contexto + 1)
+    trozo = " ".join(f"**{p}**" if c else p for p, c in zip(palabras[inicio:fin], coincide[inicio:fin]))
+    return ("…" if inicio > 0 else "") + trozo + ("…" if fin < len(palabras) else "")
+
+
+def mejor_fragmento(perfil, consulta, campos=None):
+    """
+    Campo del perfil que mejor explica un resultado y su fragmento.
+
+    Se elige el campo con más términos distintos de la consulta, desempatando
+    por su peso en CAMPOS_BM25.
+
+    Returns:
+        (campo, fragmento) o (None, None) si ningún campo coincide
+    """
+    terminos = set(tokenizar(consulta))
+    mejor, mejor_clave = (None, None), (0, 0)
+    for campo, peso in (campos or CAMPOS_BM25).items():
+        texto = perfil.get(campo)
+        if texto is None or pd.isna(texto):
+            continue
+        encontrados = len(terminos & set(tokenizar(texto)))
+        if encontrados and (encontrados, peso) > mejor_clave:
+            mejor, mejor_clave = (campo, fragmento(texto, terminos)), (encontrados, peso)
+    return mejor
+
+
+class IndiceBM25:
+    """
+    Índice invertido con ranking BM25F sobre varios campos de texto libre.
+
+    Cada campo aporta su frecuencia de término normalizada por su longitud
+    (con su propio promedio) y multiplicada por su peso; la suma se satura
+    con k1 y se multiplica por el IDF. Como nada de eso depende de la
+    consulta, el índice guarda directamente el impacto de cada término en
+    cada perfil (matriz CSC perfiles × términos): una búsqueda es sumar las
+    columnas de los términos de la consulta.
+
+    Los perfiles nuevos se añaden con `agregar` usando las longitudes
+    medias de la construcción; los impactos de los demás perfiles no se
+    recalculan hasta la siguiente reconstrucción.
+    """
+
+    def __init__(self, impactos, vocabulario, campos, medias=None, filas_construccion=None):
+        self.impactos = impactos.tocsc()
+        self.vocabulario = list(vocabulario)
+        self.termino = {t: i for i, t in enumerate(self.vocabulario)}
+        self.campos = dict(campos)
+        # Longitud media de cada campo y perfiles al construir (para añadir perfiles)
+        self.medias = np.ones(len(self.campos), dtype=np.float32) if medias is None else np.asarray(medias)
+        self.filas_construccion = len(self) if filas_construccion is None else int(filas_construccion)
+
+    def __len__(self):
+        return self.impactos.shape[0]
+
+    @classmethod
+    def construir(cls, df, campos=None):
+        """Tokenizar los campos presentes del DataFrame y calcular los impactos BM25F"""
+        campos = {c: w for c, w in (campos or CAMPOS_BM25).items() if c in df.columns}
+        n = len(df)
+        vocabulario = {}
+        por_campo = []
+        for campo, peso in campos.items():
+            filas, columnas, cuentas = [], [], []
+            longitudes = np.zeros(n, dtype=np.float32)
+            for fila, texto in enumerate(df[campo]):
+                if pd.isna(texto):
+                    continue
+                tokens = tokenizar(texto)
+                longitudes[fila] = len(tokens)
+                for termino, cuenta in Counter(tokens).items():
+                    filas.append(fila)
+                    columnas.append(vocabulario.setdefault(termino, len(vocabulario)))
+                    cuentas.append(cuenta)
+            por_campo.append((peso, longitudes, filas, columnas, cuentas))
+
+        # Frecuencias ponderadas y normalizadas por longitud, sumadas entre campos
+        tf = sparse.csr_matrix((n, len(vocabulario)), dtype=np.float32)
+        medias = []
+        for peso, longitudes, filas, columnas, cuentas in por_campo:
+            media = longitudes[longitudes > 0].mean() if (longitudes > 0).any() else 1.0
+            medias.append(media)
+            normalizacion = peso / (1 - BM25_B + BM25_B * longitudes / media)
+            tf_campo = sparse.csr_matrix(
+                (np.asarray(cuentas, dtype=np.float32), (filas, columnas)),
+                shape=(n, len(vocabulario)),
+            )
+            tf = tf + sparse.diags(normalizacion.astype(np.float32)) @ tf_campo
+
+        tf = tf.tocsc()
+        docs_con_termino = np.diff(tf.indptr)
+        idf = np.log(1 + (n - docs_con_termino + 0.5) / (docs_con_termino + 0.5)).astype(np.float32)
+        columnas = np.repeat(np.arange(len(vocabulario)), docs_con_termino)
+        tf.data = idf[columnas] * tf.data * (BM25_K1 + 1) / (BM25_K1 + tf.data)
+        return cls(tf, vocabulario, campos, np.asarray(medias, dtype=np.float32))
+
+    @property
+    def deriva(self):
+        """Perfiles añadidos desde la construcción, relativos a los que había"""
+        return (len(self) - self.filas_construccion) / max(self.filas_construccion, 1)
+
+    def agregar(self, df_nuevas):
+        """
+        Índice con perfiles nuevos al final, sin recalcular los impactos existentes.
+
+        Los términos nuevos se añaden al vocabulario; el IDF de los términos
+        de cada perfil nuevo se calcula con el número de perfiles actual.
+        """
+        vocabulario = dict(self.termino)
+        docs_con_termino = list(np.diff(self.impactos.indptr))
+        n = len(self)
+        filas, columnas, valores = [], [], []
+        for fila, (_, perfil) in enumerate(df_nuevas.iterrows()):
+            tf = Counter()
+            for (campo, peso), media in zip(self.campos.items(), self.medias):
+                texto = perfil.get(campo)
+                if texto is None or pd.isna(texto):
+                    continue
+                tokens = tokenizar(texto)
+                normalizacion = peso / (1 - BM25_B + BM25_B * len(tokens) / media)
+                for termino, cuenta in Counter(tokens).items():
+                    tf[termino] += cuenta * normalizacion
+            n += 1
+            for termino, frecuencia in tf.items():
+                columna = vocabulario.setdefault(termino, len(vocabulario))
+                if columna == len(docs_con_termino):
+                    docs_con_termino.append(0)
+                docs_con_termino[columna] += 1
+                idf = np.log(1 + (n - docs_con_termino[columna] + 0.5) / (docs_con_termino[columna] + 0.5))
+                filas.append(fila)
+                columnas.append(columna)
+                valores.append(idf * frecuencia * (BM25_K1 + 1) / (BM25_K1 + frecuencia))
+
+        impactos = self.impactos.copy()
+        impactos.resize((len(self), len(vocabulario)))
+        nuevos = sparse.csc_matrix(
+            (np.asarray(valores, dtype=np.float32), (filas, columnas)),
+            shape=(len(df_nuevas), len(vocabulario)),
+        )
+        return IndiceBM25(sparse.vstack([impactos, nuevos], format="csc"), vocabulario, self.campos,
+                          self.medias, self.filas_construccion)
+
+    def puntuaciones(self, consulta):
+        """Puntuación BM25F de todos los perfiles para la consulta (0 si no coincide)"""
+        columnas = [self.termino[t] for t in set(tokenizar(consulta)) if t in self.termino]
+        if not columnas:
+            return np.zeros(len(self), dtype=np.float32)
+        return np.asarray(self.impactos[:, columnas].sum(axis=1), dtype=np.float32).ravel()
+
+    def buscar(self, consulta, k=10, filas=None):
+        """
+        Los k perfiles mejor puntuados para la consulta.
+
+        Args:
+            consulta: Texto libre
+            k: Número máximo de resultados
+            filas: Posiciones a las que restringir la búsqueda (None = todas)
+
+        Returns:
+            (posiciones, puntuaciones) ordenadas de mayor a menor puntuación
+        """
+        puntuaciones = self.puntuaciones(consulta)
+        candidatos = np.flatnonzero(puntuaciones > 0)
+        if filas is not None:
+            candidatos = np.intersect1d(candidatos, filas, assume_unique=True)
+        if len(candidatos) > k:
+            candidatos = candidatos[np.argpartition(-puntuaciones[candidatos], k - 1)[:k]]
+        candidatos = candidatos[np.argsort(-puntuaciones[candidatos], kind="stable")]
+        return candidatos, puntuaciones[candidatos]
+
+    # --- Persistencia junto al snapshot de datos ---
+
+    def guardar(self, ruta):
+        """Guardar el índice en un .npz sin comprimir (escritura atómica)"""
+        guardar_arrays(
+            ruta,
+            version=np.int32(VERSION_INDICE_BM25),
+            data=self.impactos.data,
+            indices=self.impactos.indices,
+            indptr=self.impactos.indptr,
+            forma=np.asarray(self.impactos.shape),
+            vocabulario=np.asarray(self.vocabulario, dtype=str),
+            campos=np.asarray(list(self.campos), dtype=str),
+            pesos=np.asarray(list(self.campos.values()), dtype=np.float32),
+            medias=self.medias,
+            filas_construccion=np.int64(self.filas_construccion),
+        )
+
+    @classmethod
+    def cargar(cls, ruta):
+        """Cargar un índice guardado; None si no existe o es de otra versión"""
+        ruta = Path(ruta)
+        if not ruta.exists():
+            return None
+        with np.load(ruta) as datos:
+            if int(datos["version"]) != VERSION_INDICE_BM25:
+                return None
+            impactos = sparse.csc_matrix(
+                (datos["data"], datos["indices"], datos["indptr"]), shape=tuple(datos["forma"])
+            )
+            campos = dict(zip(datos["campos"].tolist(), datos["pesos"].tolist()))
+            return cls(impactos, datos["vocabulario"].tolist(), campos, datos["medias"],
+                       int(datos["filas_construccion"]))
+
+
+def cargar_indice_bm25(df, huella):
+    """
+    Índice BM25 del directorio, leído de la caché en disco si existe para esta huella.
+
+    Si hay que construirlo se guarda junto al snapshot de datos.
+    """
+    ruta = ruta_indice("bm25", huella)
+    indice = IndiceBM25.cargar(ruta)
+    if indice is not None and len(indice) == len(df):
+        return indice
+
+    indice = IndiceBM25.construir(df)
+    try:
+        indice.guardar(ruta)
+    except OSError:
+        # La caché es una optimización: si no se puede escribir, seguimos sin ella
+        pass
+    return indice
@@ -0,0 +1,123 @@
+# cohortes.py
+"""Resumen por cohortes (generaciones) de la comunidad"""
+
+import numpy as np
+import pandas as pd
+
+COLUMNA_GENERACION = "Generación"
+
+# Respuestas del perfil que cuentan para la completitud (las del alta de miembros)
+CAMPOS_PERFIL = [
+    "Ubicación actual (ciudad/pais)",
+    "Linkedin",
+    "¿Quién eres?",
+    "¿Qué buscas en Celera?",
+    "Superpoder",
+    "¿Motivación para unirte?",
+    "¿Universidad?",
+    "Área de estudio:",
+    "¿Empresa?",
+    "Industria trabaja",
+    "¿Rol actual?",
+    "¿Años de experiencia?",
+]
+
+
+def _respondidas(serie):
+    """Máscara de las filas con respuesta (ni nula ni texto en blanco)"""
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        # Se mira cada categoría una vez; el código -1 (nulo) cae en el False final
+        validas = [str(categoria).strip() != "" for categoria in serie.cat.categories]
+        return np.append(np.asarray(validas, dtype=bool), False)[serie.cat.codes.to_numpy()]
+    if pd.api.types.is_string_dtype(serie.dtype) and serie.dtype != object:
+        return serie.notna().to_numpy() & serie.str.strip().ne("").to_numpy(dtype=bool, na_value=False)
+    return np.fromiter((pd.notna(valor) and str(valor).strip() != "" for valor in serie), dtype=bool, count=len(serie))
+
+
+def completitud_perfiles(df):
+    """
+    Fracción de CAMPOS_PERFIL respondidos en cada perfil.
+
+    Una respuesta cuenta si no es nula ni texto en blanco.
+
+    Returns:
+        np.ndarray de floats entre 0 y 1 (NaN si no hay ningún campo)
+    """
+    campos = [columna for columna in CAMPOS_PERFIL if columna in df.columns]
+    if not campos:
+        return np.full(len(df), np.nan)
+    rellenos = np.zeros(len(df))
+    for columna in campos:
+        rellenos += _respondidas(df[columna])
+    return rellenos / len(campos)
+
+
+def _principal(cruce, generaciones):
+    """Valor más frecuente de cada generación en una tabla cruzada y su número de perfiles"""
+    tabla = pd.DataFrame(
+        cruce.to_numpy(), index=pd.Index(cruce.index.tolist(), dtype=generaciones.dtype), columns=cruce.columns
+    ).reindex(generaciones, fill_value=0)
+    if tabla.shape[1] == 0:
+        return pd.Series(np.nan, index=generaciones, dtype=object), pd.Series(0, index=generaciones)
+    maximos = tabla.max(axis=1)
+    return tabla.idxmax(axis=1).where(maximos > 0), maximos
+
+
+def resumen_generaciones(df, agregados):
+    """
+    Estadísticas de cada generación en una sola pasada de `groupby`.
+
+    El tamaño, la experiencia media, la proporción de mentores y la
+    completitud de los perfiles salen de una agregación por generación; el
+    rol y la industria principales, de las tablas cruzadas de la capa de
+    agregados (un producto disperso cada una). La app lo calcula una vez
+    por versión de datos, así que la comparativa entre generaciones no
+    vuelve a recorrer el directorio.
+
+    Args:
+        df: Directorio limpio
+        agregados: CuboAgregados del mismo directorio
+
+    Returns:
+        pd.DataFrame indexado por generación (ascendente) con "Total",
+        "Rol principal", "Perfiles rol principal", "Industria principal",
+        "Perfiles industria principal", "Experiencia media", "Mentores"
+        (fracción que quiere ser mentor) y "Completitud" (fracción media de
+        CAMPOS_PERFIL respondidos)
+    """
+    if COLUMNA_GENERACION not in df.columns:
+        return pd.DataFrame()
+
+    columnas = df.columns
+    filas = pd.DataFrame({
+        COLUMNA_GENERACION: df[COLUMNA_GENERACION].array,
+        "Experiencia media": df["Años experiencia num"].to_numpy(dtype=float, na_value=np.nan)
+        if "Años experiencia num" in columnas else np.nan,
+        "Mentores": df["¿Quiere ser mentor?"].eq("Sí").to_numpy(dtype=bool, na_value=False)
+        if "¿Quiere ser mentor?" in columnas else False,
+        "Completitud": completitud_perfiles(df),
+    })
+    resumen = filas.groupby(COLUMNA_GENERACION, sort=True).agg(
+        Total=("Completitud", "size"),
+        **{
+            "Experiencia media": ("Experiencia media", "mean"),
+            "Mentores": ("Mentores", "mean"),
+            "Completitud": ("Completitud", "mean"),
+        },
+    )
+
+    for nombre, nombre_perfiles, columna in (
+        ("Rol principal", "Perfiles rol principal", "Categoría rol"),
+        ("Industria principal", "Perfiles industria principal", "Industrias normalizadas"),
+    ):
+        if columna in agregados:
+            principal, perfiles = _principal(agregados.cruce(COLUMNA_GENERACION, columna), resumen.index)
+        else:
+            principal, perfiles = pd.Series(np.nan, index=resumen.index, dtype=object), pd.Series(0, index=resumen.index)
+        resumen[nombre] = principal
+        resumen[nombre_perfiles] = perfiles.astype(np.int64)
+
+    return resumen[[
+        "Total", "Rol principal", "Perfiles rol principal", "Industria principal",
+        "Perfiles industria principal", "Experiencia media", "Mentores", "Completitud",
+    ]]
@@ -0,0 +1,703 @@
+# data.py
+"""Carga, limpieza y caché en disco del directorio de Celera"""
+
+import hashlib
+import importlib.util
+import io
+import os
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+from joblib import Parallel, delayed
+
+from normalizacion import (
+    categorizar_rol,
+    mapear_valores_unicos,
+    normalizar_industrias,
+    normalizar_ubicaciones,
+)
+
+RUTA_CSV = Path("directorio.csv.csv")
+DIRECTORIO_CACHE = Path("cache")
+
+# Incrementar cada vez que cambie una regla de limpiar_datos (normalizaciones,
+# categorías, mapeos...). Invalida todos los snapshots guardados en disco.
+VERSION_REGLAS = 1
+
+# Columnas derivadas que contienen listas (Arrow las guarda como list<string>)
+COLUMNAS_LISTA = ["Industrias normalizadas", "Areas de acción normalizadas"]
+
+# Texto libre del directorio cargado: string de Arrow con NaN como nulo (el `str` de
+# pandas 3), así los nulos, las comparaciones y `.str` se comportan como con object
+TIPO_TEXTO = pd.StringDtype("pyarrow", na_value=np.nan)
+
+# Tipos del directorio cargado (ver tipar_directorio): las respuestas con pocos
+# valores distintos como category y la generación como entero pequeño. El resto
+# de columnas de texto pasan a TIPO_TEXTO.
+TIPOS_COLUMNAS = {
+    "--": "category",
+    "Lugar de nacimiento (pais)": "category",
+    "Generación": "Int16",
+    "Superpoder": "category",
+    "¿Motivación para unirte?": "category",
+    "¿Rango académico?": "category",
+    "¿Años de experiencia?": "category",
+    "¿Quiere ser mentor?": "category",
+    "¿Dar charlas o talleres?": "category",
+    "¿Colaborar con universidades o empresas?": "category",
+    "¿Qué conexiones buscas?": "category",
+    "¿Grupal o individual?": "category",
+    "Ubicación normalizada": "category",
+    "Categoría rol": "category",
+}
+
+# Filas por bloque en la ingesta por bloques (acota la memoria de cada proceso)
+FILAS_POR_BLOQUE = 50_000
+
+# Fuentes más pequeñas se limpian en el propio proceso: arrancar el pool cuesta más
+BYTES_MINIMOS_PARALELO = 32 << 20
+
+# Textos que read_csv convierte en booleanos
+VALORES_BOOLEANOS = {"True": True, "TRUE": True, "true": True, "False": False, "FALSE": False, "false": False}
+
+_huellas_fuente = {}
+
+
+def huella_fuente(path):
+    """
+    Hash SHA-256 del contenido del archivo fuente.
+
+    Se memoriza por (mtime, tamaño) para no releer el archivo en cada rerun.
+    """
+    path = Path(path)
+    stat = path.stat()
+    clave = (str(path.resolve()), stat.st_mtime_ns, stat.st_size)
+    if clave not in _huellas_fuente:
+        sha = hashlib.sha256()
+        with open(path, "rb") as f:
+            for bloque in iter(lambda: f.read(1 << 20), b""):
+                sha.update(bloque)
+        _huellas_fuente[clave] = sha.hexdigest()
+    return _huellas_fuente[clave]
+
+
+def huella_datos(path=RUTA_CSV):
+    """Versión de los datos limpios: contenido de la fuente + versión de las reglas"""
+    return f"{huella_fuente(path)[:16]}-r{VERSION_REGLAS}"
+
+
+def ruta_snapshot(huella):
+    return DIRECTORIO_CACHE / f"directorio-{huella}.arrow"
+
+
+def guardar_snapshot(df, huella):
+    """
+    Guardar el DataFrame limpio como archivo Arrow IPC sin comprimir.
+
+    Sin compresión el archivo se puede memory-mapear directamente al cargarlo.
+    La escritura es atómica (archivo temporal + rename) y borra snapshots
+    antiguos de otras versiones.
+    """
+    tabla = pa.Table.from_pandas(df, preserve_index=False)
+    escribir_snapshot(tabla.schema, [tabla], huella)
+
+
+def escribir_snapshot(esquema, tablas, huella):
+    """
+    Escribir un snapshot tabla a tabla (todas con el mismo esquema).
+
+    Las tablas pueden venir de un generador: cada una se escribe como
+    record batches en cuanto llega, sin reunir el directorio en memoria.
+    """
+    DIRECTORIO_CACHE.mkdir(parents=True, exist_ok=True)
+    metadata = {**(esquema.metadata or {}), b"celera_huella": huella.encode()}
+    esquema = esquema.with_metadata(metadata)
+    destino = ruta_snapshot(huella)
+    temporal = destino.with_suffix(".tmp")
+    with pa.OSFile(str(temporal), "wb") as sink:
+        with ipc.new_file(sink, esquema) as writer:
+            for tabla in tablas:
+                writer.write_table(tabla.replace_schema_metadata(metadata))
+    os.replace(temporal, destino)
+
+    for antiguo in DIRECTORIO_CACHE.glob("directorio-*.arrow"):
+        if antiguo != destino:
+            antiguo.unlink(missing_ok=True)
+
+
+def ruta_indice(prefijo, huella):
+    """Ruta de un índice derivado de los datos, guardado junto al snapshot"""
+    return DIRECTORIO_CACHE / f"{prefijo}-{huella}.npz"
+
+
+def guardar_arrays(ruta, **arrays):
+    """
+    Guardar arrays de numpy en un .npz sin comprimir.
+
+    Igual que el snapshot: escritura atómica y borrado de los archivos de
+    otras versiones con el mismo prefijo (`<prefijo>-<huella>.npz`).
+    """
+    ruta = Path(ruta)
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    temporal = ruta.with_suffix(".tmp")
+    with open(temporal, "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(temporal, ruta)
+
+    prefijo = ruta.name.split("-", 1)[0]
+    for antiguo in ruta.parent.glob(f"{prefijo}-*.npz"):
+        if antiguo != ruta:
+            antiguo.unlink(missing_ok=True)
+
+
+def cargar_snapshot(huella):
+    """
+    Cargar un snapshot válido memory-mapeado.
+
+    Returns:
+        DataFrame o None si no existe snapshot para esa huella
+    """
+    path = ruta_snapshot(huella)
+    if not path.exists():
+        return None
+
+    with pa.memory_map(str(path), "r") as source:
+        tabla = ipc.open_file(source).read_all()
+
+    metadata = tabla.schema.metadata or {}
+    if metadata.get(b"celera_huella") != huella.encode():
+        return None
+
+    # El texto se queda en buffers de Arrow (sin un objeto de Python por valor)
+    df = tabla.to_pandas(types_mapper={pa.string(): TIPO_TEXTO, pa.large_string(): TIPO_TEXTO}.get)
+    for col in df.columns:
+        if col in COLUMNAS_LISTA:
+            # Arrow devuelve las listas como arrays de numpy: restaurar listas de Python
+            df[col] = [list(x) if x is not None else [] for x in df[col]]
+        elif df[col].dtype == object:
+            # Arrow devuelve None para los nulos de texto: mantener NaN como el CSV
+            df[col] = df[col].fillna(np.nan)
+    return tipar_directorio(df)
+
+
+def tipar_directorio(df):
+    """
+    Convertir el directorio limpio a los tipos de TIPOS_COLUMNAS (modifica `df`).
+
+    Las columnas de texto (solo strings) que no están en TIPOS_COLUMNAS
+    pasan a TIPO_TEXTO; las booleanas, numéricas y de listas no cambian.
+    Es idempotente y da los mismos tipos venga el DataFrame de
+    limpiar_datos, del snapshot o de SQLite.
+
+    Returns:
+        El mismo DataFrame
+    """
+    for columna in df.columns:
+        serie, tipo = df[columna], TIPOS_COLUMNAS.get(columna)
+        if tipo == "category":
+            # Categorías de objetos en orden de aparición: value_counts desempata igual
+            # que sobre la columna de objetos (y `.str` devuelve objetos, no texto)
+            codigos, categorias = pd.factorize(serie)
+            df[columna] = pd.Categorical.from_codes(codigos, categorias.astype(object))
+        elif tipo is not None:
+            df[columna] = pd.to_numeric(serie, errors="coerce").astype(tipo)
+        elif (
+            columna not in COLUMNAS_LISTA
+            and serie.dtype == object
+            and pd.api.types.infer_dtype(serie, skipna=True) in ("string", "empty")
+        ):
+            df[columna] = serie.astype(TIPO_TEXTO)
+    return df
+
+
+def contar_valores(serie):
+    """
+    `value_counts` de una columna, también categórica, sin valores con cero filas.
+
+    Cuenta los códigos de `pd.factorize` (en orden de aparición en `serie`):
+    en un subconjunto filtrado no salen las categorías que no tiene y los
+    empates quedan en el mismo orden que con una columna de objetos.
+    """
+    codigos, valores = pd.factorize(serie)
+    conteos = np.bincount(codigos[codigos >= 0], minlength=len(valores))
+    return pd.Series(
+        conteos, index=pd.Index(np.asarray(valores, dtype=object), name=serie.name), name="count"
+    ).sort_values(ascending=False)
+
+
+@contextmanager
+def bloqueo_archivo(path):
+    """Bloqueo exclusivo (advisory) entre procesos y sesiones sobre `<path>.lock`"""
+    with open(f"{path}.lock", "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def ruta_diario(path):
+    return Path(f"{path}.diario")
+
+
+def recuperar_diario(path):
+    """
+    Rehacer un alta interrumpida (llamar con el bloqueo tomado).
+
+    El diario guarda el tamaño del CSV antes del alta y los bytes añadidos:
+    se trunca el CSV a ese tamaño y se vuelven a añadir, así que da igual
+    en qué punto se interrumpió la escritura.
+    """
+    diario = ruta_diario(path)
+    if not diario.exists():
+        return
+    tamano, datos = diario.read_bytes().split(b"\n", 1)
+    with open(path, "r+b") as f:
+        f.truncate(int(tamano))
+        f.seek(0, os.SEEK_END)
+        f.write(datos)
+        f.flush()
+        os.fsync(f.fileno())
+    diario.unlink()
+
+
+def agregar_filas_csv(filas, path=RUTA_CSV, al_guardar=()):
+    """
+    Añadir filas al final del CSV fuente sin reescribirlo.
+
+    Con el bloqueo del archivo tomado: serializa solo las filas nuevas (con
+    las columnas de la cabecera), las escribe primero en un diario (archivo
+    temporal + rename) y después las añade al CSV con fsync; si el proceso
+    se interrumpe, la siguiente escritura o lectura rehace el alta desde el
+    diario. Las funciones de `al_guardar` se llaman dentro del bloqueo con
+    (filas, huella_anterior, huella_nueva), para invalidar o actualizar solo
+    las cachés afectadas.
+
+    Returns:
+        Lista con el resultado de cada función de `al_guardar`
+    """
+    path = Path(path)
+    with bloqueo_archivo(path):
+        recuperar_diario(path)
+        huella_anterior = huella_datos(path)
+
+        cabecera = pd.read_csv(path, nrows=0).columns
+        texto = pd.DataFrame(filas).reindex(columns=cabecera).to_csv(header=False, index=False, lineterminator="\n")
+        tamano = path.stat().st_size
+        with open(path, "rb") as f:
+            f.seek(max(tamano - 1, 0))
+            if tamano and f.read(1) != b"\n":
+                texto = "\n" + texto
+        datos = texto.encode("utf-8")
+
+        diario = ruta_diario(path)
+        temporal = diario.with_suffix(".tmp")
+        with open(temporal, "wb") as f:
+            f.write(b"%d\n" % tamano + datos)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporal, diario)
+
+        with open(path, "ab") as f:
+            f.write(datos)
+            f.flush()
+            os.fsync(f.fileno())
+        diario.unlink()
+
+        huella_nueva = huella_datos(path)
+        return [funcion(filas, huella_anterior, huella_nueva) for funcion in al_guardar]
+
+
+def cargar_directorio(path=RUTA_CSV):
+    """
+    Cargar el directorio limpio, usando el snapshot en disco si sigue siendo válido.
+
+    Solo se relee el CSV y se ejecuta limpiar_datos cuando cambia el contenido
+    de la fuente o VERSION_REGLAS.
+    """
+    if ruta_diario(path).exists():
+        with bloqueo_archivo(path):
+            recuperar_diario(path)
+    huella = huella_datos(path)
+    df = cargar_snapshot(huella)
+    if df is not None:
+        return df
+
+    try:
+        ingerir_por_bloques(path, huella)
+    except (OSError, pa.ArrowException):
+        # La caché es una optimización: si no se puede escribir, seguimos sin ella
+        pass
+    df = cargar_snapshot(huella)
+    if df is not None:
+        return df
+
+    # Sin snapshot (fuente vacía o caché no escribible): leer y limpiar todo en memoria
+    return tipar_directorio(limpiar_datos(leer_fuente(path)))
+
+
+def leer_fuente(path):
+    """Leer el CSV o el Excel del directorio completo con los nombres de columna limpios"""
+    path = Path(path)
+    if path.suffix.lower() in (".xlsx", ".xlsm", ".xls"):
+        crudo = pd.read_excel(path)  # requiere openpyxl (xlrd para .xls)
+    else:
+        crudo = pd.read_csv(path)
+    return crudo.rename(columns=lambda x: x.strip() if isinstance(x, str) else x)
+
+
+# --- Ingesta por bloques ---
+
+# Librería que lee cada formato de Excel (openpyxl está en requirements.txt)
+LECTORES_EXCEL = {".xlsx": "openpyxl", ".xlsm": "openpyxl", ".xls": "xlrd"}
+
+
+def comprobar_lector(path):
+    """Fallar antes de leer la fuente si falta la librería de su formato (en vez de a mitad de la ingesta)"""
+    libreria = LECTORES_EXCEL.get(Path(path).suffix.lower())
+    if libreria and importlib.util.find_spec(libreria) is None:
+        raise ImportError(f"Leer {Path(path).name} requiere {libreria}: pip install {libreria}")
+
+
+def leer_bloques(path, filas=FILAS_POR_BLOQUE):
+    """
+    Leer la fuente (CSV o Excel) por bloques de `filas` filas, con los valores como texto.
+
+    Los tipos no se deciden por bloque (un bloque sin decimales saldría
+    entero y otro float): ver `tipos_bloque` y `aplicar_tipos`.
+    """
+    path = Path(path)
+    if path.suffix.lower() in (".xlsx", ".xlsm"):
+        yield from _leer_bloques_excel(path, filas)
+        return
+    if path.suffix.lower() == ".xls":
+        # El formato antiguo no se puede leer en streaming: se lee entero y se trocea
+        crudo = leer_fuente(path).astype(object)
+        crudo = crudo.where(crudo.isna(), crudo.astype(str))
+        for inicio in range(0, len(crudo), filas):
+            yield crudo.iloc[inicio:inicio + filas].reset_index(drop=True)
+        return
+    for bloque in pd.read_csv(path, dtype=str, chunksize=filas):
+        yield bloque.rename(columns=lambda x: x.strip() if isinstance(x, str) else x)
+
+
+def _leer_bloques_excel(path, filas):
+    """Primera hoja del Excel en modo solo lectura (openpyxl no carga el libro entero)"""
+    from openpyxl import load_workbook  # solo al leer un Excel: la app con CSV no lo importa
+
+    libro = load_workbook(path, read_only=True, data_only=True)
+    try:
+        filas_hoja = libro.worksheets[0].iter_rows(values_only=True)
+        cabecera = [
+            str(nombre).strip() if nombre is not None else f"Unnamed: {i}"
+            for i, nombre in enumerate(next(filas_hoja, ()))
+        ]
+        lote = []
+        for fila in filas_hoja:
+            if all(valor is None for valor in fila):
+                continue
+            fila = (list(fila) + [None] * len(cabecera))[:len(cabecera)]
+            lote.append([None if valor is None else str(valor) for valor in fila])
+            if len(lote) == filas:
+                yield pd.DataFrame(lote, columns=cabecera, dtype=object)
+                lote = []
+        if lote:
+            yield pd.DataFrame(lote, columns=cabecera, dtype=object)
+    finally:
+        libro.close()
+
+
+def tipos_bloque(bloque):
+    """
+    Qué tipos admite cada columna de un bloque de texto.
+
+    Returns:
+        dict columna -> (hay valores, hay nulos, booleana, entera, numérica)
+    """
+    tipos = {}
+    for columna, valores in bloque.items():
+        presentes = valores.dropna().astype(str)
+        try:
+            # Falla en el primer valor no numérico: las columnas de texto no se recorren enteras
+            numeros = pd.to_numeric(presentes)
+            numerica, entera = True, pd.api.types.is_integer_dtype(numeros)
+        except (ValueError, TypeError):
+            numerica = entera = False
+        tipos[columna] = (
+            len(presentes) > 0,
+            len(presentes) < len(valores),
+            bool(presentes.isin(VALORES_BOOLEANOS).all()),
+            entera,
+            numerica,
+        )
+    return tipos
+
+
+def combinar_tipos(tipos_bloques):
+    """
+    Tipo de cada columna en toda la fuente, como lo inferiría read_csv leyéndola entera.
+
+    Returns:
+        dict columna -> "real" | "entero" | "booleano" | "booleano_nulos" | "texto"
+    """
+    combinados = {}
+    for tipos in tipos_bloques:
+        for columna, banderas in tipos.items():
+            anteriores = combinados.get(columna, (False, False, True, True, True))
+            combinados[columna] = tuple(
+                a or b if i < 2 else a and b for i, (a, b) in enumerate(zip(anteriores, banderas))
+            )
+
+    resultado = {}
+    for columna, (valores, nulos, booleana, entera, numerica) in combinados.items():
+        if not valores:
+            resultado[columna] = "real"  # columna vacía: read_csv la lee como float
+        elif booleana:
+            resultado[columna] = "booleano_nulos" if nulos else "booleano"
+        elif entera and not nulos:
+            resultado[columna] = "entero"
+        elif numerica:
+            resultado[columna] = "real"
+        else:
+            resultado[columna] = "texto"
+    return resultado
+
+
+def aplicar_tipos(bloque, tipos):
+    """Convertir un bloque de texto a los tipos de `combinar_tipos`"""
+    for columna, tipo in tipos.items():
+        if tipo == "real":
+            bloque[columna] = pd.to_numeric(bloque[columna]).astype(float)
+        elif tipo == "entero":
+            bloque[columna] = pd.to_numeric(bloque[columna]).astype(np.int64)
+        elif tipo.startswith("booleano"):
+            booleanos = bloque[columna].map(VALORES_BOOLEANOS)
+            bloque[columna] = booleanos.astype(object) if tipo == "booleano_nulos" else booleanos.astype(bool)
+    return bloque
+
+
+def esquema_snapshot(df, tipos):
+    """
+    Esquema Arrow del snapshot a partir del primer bloque limpio.
+
+    No se infiere solo de los valores del bloque, que puede no tener
+    ninguno en una columna: las columnas de texto de la fuente y las de
+    objetos derivadas son string, las booleanas bool y las listas
+    list<string>.
+    """
+    campos = []
+    for campo in pa.Schema.from_pandas(df, preserve_index=False):
+        tipo, tipo_fuente = campo.type, tipos.get(campo.name, "")
+        if campo.name in COLUMNAS_LISTA:
+            tipo = pa.list_(pa.string())
+        elif tipo_fuente.startswith("booleano"):
+            tipo = pa.bool_()
+        elif tipo_fuente == "texto" or df[campo.name].dtype == object:
+            tipo = pa.string()
+        campos.append(pa.field(campo.name, tipo))
+    return pa.schema(campos)
+
+
+def limpiar_bloque(bloque, tipos, esquema):
+    """Limpiar un bloque de la fuente y convertirlo en una tabla Arrow del snapshot"""
+    return pa.Table.from_pandas(limpiar_datos(aplicar_tipos(bloque, tipos)), schema=esquema, preserve_index=False)
+
+
+def ingerir_por_bloques(path, huella, filas=FILAS_POR_BLOQUE, n_jobs=None):
+    """
+    Limpiar la fuente por bloques en paralelo y escribir el snapshot bloque a bloque.
+
+    Dos pasadas en streaming sobre la fuente, ambas con los bloques
+    repartidos entre un pool de procesos de joblib: la primera decide el
+    tipo de cada columna en todo el archivo (`combinar_tipos`), la segunda
+    ejecuta limpiar_datos en cada bloque ya con esos tipos. Las tablas
+    Arrow resultantes se escriben en el snapshot en orden según llegan.
+    Solo hay unos pocos
+    bloques en vuelo a la vez, así que la memoria de la ingesta no crece
+    con el tamaño del directorio. El resultado es el mismo que
+    `limpiar_datos(pd.read_csv(path))`.
+
+    Args:
+        path: CSV o Excel del directorio
+        huella: Versión de los datos con la que se guarda el snapshot
+        filas: Filas por bloque
+        n_jobs: Procesos de joblib (None = todos los núcleos si la fuente
+            supera BYTES_MINIMOS_PARALELO, si no 1)
+
+    Returns:
+        Número de filas ingeridas (0 si la fuente no tiene filas: no se escribe snapshot)
+    """
+    path = Path(path)
+    comprobar_lector(path)
+    if n_jobs is None:
+        n_jobs = -1 if path.stat().st_size >= BYTES_MINIMOS_PARALELO else 1
+
+    with Parallel(n_jobs=n_jobs, return_as="generator", pre_dispatch="2*n_jobs") as paralelo:
+        tipos = combinar_tipos(paralelo(delayed(tipos_bloque)(bloque) for bloque in leer_bloques(path, filas)))
+
+        bloques = leer_bloques(path, filas)
+        primero = next(bloques, None)
+        if primero is None or primero.empty:
+            return 0
+        df_primero = limpiar_datos(aplicar_tipos(primero, tipos))
+        esquema = esquema_snapshot(df_primero, tipos)
+        n = len(df_primero)
+
+        def tablas():
+            nonlocal n
+            yield pa.Table.from_pandas(df_primero, schema=esquema, preserve_index=False)
+            for tabla in paralelo(delayed(limpiar_bloque)(bloque, tipos, esquema) for bloque in bloques):
+                n += tabla.num_rows
+                yield tabla
+
+        escribir_snapshot(esquema, tablas(), huella)
+    return n
+
+
+def parsear_filas(filas, cabecera):
+    """
+    Convertir respuestas crudas en un DataFrame como si se leyeran del CSV.
+
+    Las filas se reordenan según `cabecera` (columnas del CSV fuente, en su
+    orden) y se serializan y vuelven a leer como texto, para que
+    limpiar_datos vea exactamente los mismos valores que al leer el archivo.
+    """
+    texto_csv = pd.DataFrame(filas).reindex(columns=cabecera).to_csv(index=False)
+    crudas = pd.read_csv(io.StringIO(texto_csv), dtype=str)
+    return crudas.rename(columns=lambda x: x.strip() if isinstance(x, str) else x)
+
+
+def limpiar_filas_nuevas(filas, df_limpio, path=RUTA_CSV, cabecera=None):
+    """
+    Limpiar solo filas nuevas con las reglas de limpiar_datos.
+
+    Las filas se parsean como si vinieran del CSV (mismas columnas y en el
+    mismo orden que su cabecera) y cada columna se convierte al tipo que
+    tiene en `df_limpio`, para poder concatenarlas al directorio ya limpio
+    (las de TIPOS_COLUMNAS y las de texto ya las convierte tipar_directorio).
+
+    Args:
+        filas: Lista de dicts con las respuestas crudas del formulario
+        df_limpio: Directorio limpio al que se van a añadir
+        path: CSV fuente (ya con las filas nuevas escritas)
+        cabecera: Columnas de la fuente, si no es el CSV (p. ej. el almacén SQLite)
+
+    Returns:
+        DataFrame limpio con las filas nuevas, o None si no encajan en las
+        columnas o tipos del directorio (hay que limpiar todo de nuevo)
+    """
+    if cabecera is None:
+        cabecera = pd.read_csv(path, nrows=0).columns
+    nuevas = tipar_directorio(limpiar_datos(parsear_filas(filas, cabecera)))
+    if list(nuevas.columns) != list(df_limpio.columns):
+        return None
+
+    for col in nuevas.columns:
+        anterior, valores = df_limpio[col], nuevas[col]
+        if isinstance(anterior.dtype, pd.CategoricalDtype):
+            # Las categorías del directorio y detrás las nuevas: concat sigue siendo categórica
+            categorias = anterior.cat.categories
+            nuevas[col] = valores.cat.set_categories(
+                categorias.append(valores.cat.categories.difference(categorias, sort=False))
+            )
+            continue
+        if col in TIPOS_COLUMNAS or anterior.dtype == TIPO_TEXTO:
+            continue
+        if anterior.isna().all():
+            # Columna vacía hasta ahora: el tipo lo deciden los valores nuevos, como al leer el CSV
+            numericos = pd.to_numeric(valores, errors="coerce")
+            if numericos.notna().sum() == valores.notna().sum():
+                nuevas[col] = numericos.astype(float)
+            continue
+        if anterior.dtype == object:
+            if anterior.dropna().map(type).eq(bool).all():
+                # Columna booleana en el CSV (True/False)
+                booleanos = valores.astype(str).str.lower().map({"true": True, "false": False})
+                if (booleanos.isna() & valores.notna()).any():
+                    return None
+                nuevas[col] = booleanos.astype(object)
+            continue
+        try:
+            numericos = pd.to_numeric(valores, errors="coerce") if anterior.dtype.kind in "iuf" else valores
+            if (numericos.isna() & valores.notna()).any():
+                return None
+            nuevas[col] = numericos.astype(anterior.dtype)
+        except (TypeError, ValueError):
+            return None
+    return nuevas
+
+
+def limpiar_datos(df):
+    """Limpiar y procesar los datos del CSV"""
+    # Limpiar nombres de columnas
+    df.columns = df.columns.str.strip()
+
+    # Limpiar valores nulos (sin que una columna de texto sin valores pase a float)
+    objetos = df.columns[df.dtypes == object]
+    df = df.replace(['', 'nan', 'NaN', 'N/A'], np.nan)
+    df[objetos] = df[objetos].astype(object)
+
+    # Extraer generación de la primera columna
+    df['Generación'] = df.iloc[:, 0].str.extract(r'G(\d+)')[0]
+
+    # Limpiar nombres (quitar prefijos G1, G2, etc.)
+    df['Nombre y apellido'] = df['Nombre y apellido'].str.replace(r'^G\d+\s*-\s*', '', regex=True)
+
+    # Procesar años de experiencia
+    if '¿Años de experiencia?' in df.columns:
+        df['Años experiencia num'] = df['¿Años de experiencia?'].map({
+            '0-2 Años': 1,
+            '3-5 Años': 4,
+            '6-10 Años': 8,
+            'Más de 10 años': 15
+        })
+
+    # ===== FASE 1: NORMALIZACIONES =====
+
+    # 1. NORMALIZAR UBICACIONES (una evaluación por ubicación distinta)
+    if 'Ubicación actual (ciudad/pais)' in df.columns:
+        df['Ubicación normalizada'] = normalizar_ubicaciones(df['Ubicación actual (ciudad/pais)'])
+
+    # 2. NORMALIZAR INDUSTRIAS (manejo de múltiples valores)
+    if 'Industria trabaja' in df.columns:
+        df['Industrias normalizadas'] = mapear_valores_unicos(
+            df['Industria trabaja'], normalizar_industrias, valor_nulo=[]
+        )
+
+    # 3. CATEGORIZAR ROLES
+    if '¿Rol actual?' in df.columns:
+        df['Categoría rol'] = mapear_valores_unicos(
+            df['¿Rol actual?'], categorizar_rol, valor_nulo='Sin especificar'
+        )
+
+    # 4. PROCESAR ÁREA DE ACCIÓN (múltiples valores)
+    def procesar_areas_accion(area):
+        if pd.isna(area):
+            return []
+
+        # Separar por comas y limpiar
+        areas = [a.strip() for a in str(area).split(',')]
+        return [a for a in areas if a]  # Filtrar vacíos
+
+    if 'Area de acción' in df.columns:
+        df['Areas de acción normalizadas'] = df['Area de acción'].apply(procesar_areas_accion)
+
+    return df
@@ -0,0 +1,105 @@
+# directorio_compartido.py
+"""Directorio de solo lectura compartido entre sesiones y vistas por sesión"""
+
+import sys
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+
+def _buffers(serie):
+    """Direcciones de memoria de los datos de una columna (para saber si dos la comparten)"""
+    valores = serie.array
+    if isinstance(valores, pd.Categorical):
+        return {valores.codes.__array_interface__["data"][0]}
+    if isinstance(serie.dtype, np.dtype):
+        return {serie.to_numpy().__array_interface__["data"][0]}
+    # Extensiones (string de Arrow, Int16): los buffers de su array de Arrow
+    arrow = pa.array(valores)
+    trozos = arrow.chunks if isinstance(arrow, pa.ChunkedArray) else [arrow]
+    return {buffer.address for trozo in trozos for buffer in trozo.buffers() if buffer is not None and buffer.size}
+
+
+class DirectorioCompartido:
+    """
+    Directorio limpio compartido por todas las sesiones de la app.
+
+    La app lo sirve con `st.cache_resource`: un solo objeto por versión de
+    datos y proceso, sin la copia por rerun de `st.cache_data`. Es de solo
+    lectura: nadie modifica `df` y, con copy-on-write activado, lo que se
+    derive de él (proyecciones de columnas, la propia `vista`) no puede
+    cambiarlo aunque se le añadan columnas. Cada sesión guarda solo sus
+    posiciones de fila y las columnas que necesita, y materializa con
+    `vista` únicamente ese recorte. `bytes` es la memoria del directorio,
+    que se paga una vez por proceso.
+    """
+
+    def __init__(self, df):
+        self.df = df
+        self.bytes = int(df.memory_usage(deep=True).sum())
+        self._buffers = {columna: _buffers(serie) for columna, serie in df.items()}
+
+    def __len__(self):
+        return len(self.df)
+
+    def vista(self, posiciones=None, columnas=None):
+        """
+        Filas y columnas del directorio que necesita una sesión.
+
+        Sin recorte de filas no se copia nada: se devuelve el propio
+        directorio o, con `columnas`, una proyección que comparte sus datos.
+
+        Args:
+            posiciones: Array ordenado de posiciones de fila (None = todas)
+            columnas: Columnas a incluir, en este orden (None = todas); las
+                que no existan en el directorio se omiten
+
+        Returns:
+            DataFrame de solo lectura salvo por las columnas que se le añadan
+        """
+        df = self.df
+        if columnas is not None:
+            df = df[[columna for columna in columnas if columna in df.columns]]
+        if posiciones is None or len(posiciones) == len(self.df):
+            return df
+        return df.take(posiciones)
+
+    def bytes_propios(self, *objetos):
+        """
+        Memoria de `objetos` que no comparten con el directorio.
+
+        Es la memoria por sesión: las columnas de un DataFrame o Series que
+        apuntan a los datos del directorio no cuentan; el resto se mide con
+        `memory_usage(deep=True)`, los arrays con `nbytes` y cualquier otro
+        objeto con `sys.getsizeof`. Un mismo objeto pasado dos veces cuenta
+        una vez.
+
+        Returns:
+            Bytes (int)
+        """
+        total = 0
+        vistos = set()
+        for objeto in objetos:
+            if id(objeto) in vistos:
+                continue
+            vistos.add(id(objeto))
+            if isinstance(objeto, pd.Series):
+                objeto = objeto.to_frame()
+            if isinstance(objeto, pd.DataFrame):
+                if objeto is not self.df:
+                    total += self._bytes_frame(objeto)
+            elif isinstance(objeto, np.ndarray):
+                total += objeto.nbytes
+            else:
+                total += sys.getsizeof(objeto)
+        return total
+
+    def _bytes_frame(self, df):
+        total = int(df.index.memory_usage(deep=True)) if df.index is not self.df.index else 0
+        for columna, serie in df.items():
+            compartidos = self._buffers.get(columna)
+            if compartidos and _buffers(serie) & compartidos:
+                continue
+            total += int(serie.memory_usage(deep=True, index=False))
+        return total
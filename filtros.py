@@ -0,0 +1,302 @@
+# filtros.py
+"""Motor de filtros del sidebar basado en índices de bitmaps por faceta"""
+
+import numpy as np
+import pandas as pd
+
+# Facetas de valor único del sidebar (columna del DataFrame)
+FACETAS = [
+    "Generación",
+    "Categoría rol",
+    "Ubicación normalizada",
+    "Superpoder",
+    "Área de estudio:",
+    "¿Motivación para unirte?",
+    "¿Quiere ser mentor?",
+    "¿Dar charlas o talleres?",
+    "¿Empresa?",
+]
+
+# Facetas multi-etiqueta (se indexan desde su MatrizMultietiqueta)
+FACETAS_MULTIETIQUETA = [
+    "Industrias normalizadas",
+    "Areas de acción normalizadas",
+]
+
+COLUMNA_EXPERIENCIA = "Años experiencia num"
+
+# Un valor con menos de n/64 filas se guarda como lista de posiciones (int32):
+# ocupa menos que un bitmap denso de n bits (estilo roaring bitmaps)
+DENSIDAD_MINIMA_BITMAP = 1 / 64
+
+
+def empaquetar(mascara):
+    """Convertir una máscara booleana en un bitmap de palabras uint64"""
+    bytes_ = np.packbits(mascara, bitorder="little")
+    relleno = (-len(bytes_)) % 8
+    if relleno:
+        bytes_ = np.concatenate([bytes_, np.zeros(relleno, dtype=np.uint8)])
+    return bytes_.view(np.uint64)
+
+
+def desempaquetar(bitmap, n):
+    """Convertir un bitmap uint64 en una máscara booleana de n filas"""
+    return np.unpackbits(bitmap.view(np.uint8), bitorder="little", count=n).view(bool)
+
+
+def es_bitmap(contenedor):
+    return contenedor.dtype == np.uint64
+
+
+def _contiene(bitmap, posiciones):
+    """Máscara: qué posiciones tienen su bit activo en el bitmap"""
+    palabras = bitmap[posiciones >> 6]
+    return ((palabras >> (posiciones & 63).astype(np.uint64)) & np.uint64(1)).astype(bool)
+
+
+def _activar(bitmap, posiciones):
+    """Activar en el bitmap (in-place) los bits de las posiciones dadas"""
+    np.bitwise_or.at(bitmap, posiciones >> 6,
+                     np.left_shift(np.uint64(1), (posiciones & 63).astype(np.uint64)))
+
+
+def union(contenedores, n):
+    """OR de varios contenedores (bitmaps densos o listas de posiciones ordenadas)"""
+    densos = [c for c in contenedores if es_bitmap(c)]
+    dispersos = [c for c in contenedores if not es_bitmap(c)]
+    total_disperso = sum(len(c) for c in dispersos)
+
+    if not densos:
+        if len(dispersos) == 1:
+            return dispersos[0]
+        if total_disperso < n * DENSIDAD_MINIMA_BITMAP:
+            posiciones = np.sort(np.concatenate(dispersos))
+            return posiciones[np.r_[True, posiciones[1:] != posiciones[:-1]]]
+        mascara = np.zeros(n, dtype=bool)
+        for posiciones in dispersos:
+            mascara[posiciones] = True
+        return empaquetar(mascara)
+
+    resultado = densos[0].copy()
+    for bitmap in densos[1:]:
+        resultado |= bitmap
+    if total_disperso > n * DENSIDAD_MINIMA_BITMAP:
+        # Muchas posiciones sueltas: más barato pasar por una máscara que por ufunc.at
+        mascara = np.zeros(n, dtype=bool)
+        for posiciones in dispersos:
+            mascara[posiciones] = True
+        resultado |= empaquetar(mascara)
+    else:
+        for posiciones in dispersos:
+            _activar(resultado, posiciones)
+    return resultado
+
+
+def interseccion(a, b):
+    """AND de dos contenedores; el resultado es disperso si alguno lo es"""
+    if es_bitmap(a) and es_bitmap(b):
+        return a & b
+    if es_bitmap(a):
+        a, b = b, a
+    if es_bitmap(b):
+        return a[_contiene(b, a)]
+    return np.intersect1d(a, b, assume_unique=True)
+
+
+class MotorFiltros:
+    """
+    Índice de bitmaps por valor de faceta, construido una vez por versión de datos.
+
+    Cada valor de cada faceta guarda el conjunto de filas que lo tienen, como
+    bitmap denso (uint64) o como lista ordenada de posiciones si es poco
+    frecuente. Cualquier combinación de selecciones del sidebar se resuelve
+    con OR dentro de cada faceta y AND entre facetas, sin copiar el DataFrame.
+    """
+
+    def __init__(self, df, multietiquetas=None):
+        self.n = len(df)
+        self.index = df.index
+        self.umbral_denso = max(1, int(self.n * DENSIDAD_MINIMA_BITMAP))
+        self.contenedores = {}
+        # Códigos enteros por fila de cada faceta de valor único (para los conteos)
+        self._codigos = {}
+        self._matrices = {}
+
+        for columna in FACETAS:
+            if columna in df.columns:
+                self.contenedores[columna] = self._indexar_columna(df[columna])
+
+        for columna, matriz in (multietiquetas or {}).items():
+            if columna in FACETAS_MULTIETIQUETA:
+                self._matrices[columna] = matriz
+                self.contenedores[columna] = {
+                    etiqueta: self._contenedor(matriz.filas_etiqueta(etiqueta))
+                    for etiqueta in matriz.etiquetas
+                }
+
+        # La experiencia se filtra por rango: un contenedor por valor numérico,
+        # más el de los perfiles sin dato (que el filtro siempre incluye)
+        if COLUMNA_EXPERIENCIA in df.columns:
+            experiencia = df[COLUMNA_EXPERIENCIA]
+            self.contenedores[COLUMNA_EXPERIENCIA] = self._indexar_columna(experiencia)
+            self._sin_experiencia = self._contenedor(
+                np.flatnonzero(experiencia.isna().to_numpy()).astype(np.int32)
+            )
+
+        # Listas de opciones del sidebar (también los valores del slider de experiencia), ordenadas una sola vez
+        self._opciones = {
+            columna: sorted(indice) for columna, indice in self.contenedores.items()
+        }
+
+    def _contenedor(self, posiciones):
+        if len(posiciones) >= self.umbral_denso:
+            mascara = np.zeros(self.n, dtype=bool)
+            mascara[posiciones] = True
+            return empaquetar(mascara)
+        return np.asarray(posiciones, dtype=np.int32)
+
+    def _indexar_columna(self, serie):
+        codigos, valores = pd.factorize(serie, use_na_sentinel=True)
+        valores = valores.tolist()  # valores de Python (no escalares de numpy) para el sidebar
+        self._codigos[serie.name] = (codigos.astype(np.int32), valores)
+        orden = np.argsort(codigos, kind="stable")
+        limites = np.searchsorted(codigos[orden], np.arange(len(valores) + 1))
+        return {
+            valor: self._contenedor(orden[limites[i]:limites[i + 1]].astype(np.int32))
+            for i, valor in enumerate(valores)
+        }
+
+    def opciones(self, columna):
+        """Valores disponibles de una faceta, ordenados"""
+        return self._opciones.get(columna, [])
+
+    def _bitmap(self, contenedor):
+        if es_bitmap(contenedor):
+            return contenedor
+        mascara = np.zeros(self.n, dtype=bool)
+        mascara[contenedor] = True
+        return empaquetar(mascara)
+
+    def contenedor_faceta(self, columna, valores):
+        """OR de los contenedores de los valores seleccionados de una faceta"""
+        indice = self.contenedores.get(columna, {})
+        seleccion = [indice[v] for v in valores if v in indice]
+        if not seleccion:
+            return np.empty(0, dtype=np.int32)
+        return union(seleccion, self.n)
+
+    def contenedor_experiencia(self, exp_min, exp_max):
+        """Filas con experiencia en [exp_min, exp_max] o sin dato de experiencia"""
+        indice = self.contenedores[COLUMNA_EXPERIENCIA]
+        if all(exp_min <= v <= exp_max for v in indice):
+            return None  # el rango cubre todos los valores: no filtra
+        seleccion = [c for v, c in indice.items() if exp_min <= v <= exp_max]
+        return union(seleccion + [self._sin_experiencia], self.n)
+
+    def contenedores_activos(self, selecciones, rango_experiencia=None):
+        """
+        Contenedor de filas de cada faceta con selección activa.
+
+        Returns:
+            dict columna -> contenedor (OR de los valores elegidos)
+        """
+        activos = {
+            columna: self.contenedor_faceta(columna, valores)
+            for columna, valores in selecciones.items()
+            if valores and columna in self.contenedores
+        }
+        if rango_experiencia is not None and COLUMNA_EXPERIENCIA in self.contenedores:
+            experiencia = self.contenedor_experiencia(*rango_experiencia)
+            if experiencia is not None:
+                activos[COLUMNA_EXPERIENCIA] = experiencia
+        return activos
+
+    def contenedor_resultado(self, selecciones, rango_experiencia=None, restricciones=()):
+        """
+        AND de los contenedores activos: las filas que cumplen todos los filtros.
+
+        Returns:
+            Bitmap o lista de posiciones, o None si no hay ningún filtro activo
+        """
+        activos = list(self.contenedores_activos(selecciones, rango_experiencia).values())
+        activos += list(restricciones)
+
+        if not activos:
+            return None
+
+        # Empezar por el más pequeño para que las intersecciones sean baratas
+        activos.sort(key=lambda c: len(c) if not es_bitmap(c) else self.n)
+        resultado = activos[0]
+        for contenedor in activos[1:]:
+            resultado = interseccion(resultado, contenedor)
+        return resultado
+
+    def resolver(self, selecciones, rango_experiencia=None, restricciones=()):
+        """
+        Resolver las selecciones del sidebar a posiciones de fila.
+
+        Args:
+            selecciones: dict columna -> lista de valores elegidos (vacía = sin filtro)
+            rango_experiencia: (mínimo, máximo) o None
+            restricciones: Contenedores adicionales que también deben cumplirse
+                (por ejemplo, las filas que coinciden con la búsqueda de texto)
+
+        Returns:
+            Array ordenado de posiciones de las filas que cumplen todos los filtros
+        """
+        resultado = self.contenedor_resultado(selecciones, rango_experiencia, restricciones)
+        if resultado is None:
+            return np.arange(self.n)
+        if es_bitmap(resultado):
+            return np.flatnonzero(desempaquetar(resultado, self.n))
+        return resultado.astype(np.intp)
+
+    def conteos_facetas(self, selecciones, rango_experiencia=None, restricciones=()):
+        """
+        Conteos por opción de cada faceta, como en una búsqueda facetada clásica.
+
+        El conteo de una opción es el número de miembros que quedarían si se
+        añadiera esa opción, aplicando el resto de filtros activos pero no los
+        de su propia faceta. Todo se calcula con AND de bitmaps y un
+        `np.bincount` por faceta.
+
+        Returns:
+            dict columna -> dict valor -> número de miembros
+        """
+        activos = {
+            columna: self._bitmap(contenedor)
+            for columna, contenedor in self.contenedores_activos(selecciones, rango_experiencia).items()
+        }
+        comunes = [self._bitmap(c) for c in restricciones]
+
+        def mascara_sin(excluida):
+            bitmaps = comunes + [b for columna, b in activos.items() if columna != excluida]
+            if not bitmaps:
+                return None
+            resultado = bitmaps[0].copy()
+            for bitmap in bitmaps[1:]:
+                resultado &= bitmap
+            return desempaquetar(resultado, self.n)
+
+        # Las facetas sin selección comparten la misma máscara (todos los filtros)
+        mascara_todos = mascara_sin(None)
+
+        conteos = {}
+        for columna in self.contenedores:
+            if columna == COLUMNA_EXPERIENCIA:
+                continue
+            mascara = mascara_sin(columna) if columna in activos else mascara_todos
+
+            if columna in self._matrices:
+                matriz = self._matrices[columna]
+                filas = None if mascara is None else np.flatnonzero(mascara)
+                # Las etiquetas sin filas también van, con 0 (como las facetas de valor único)
+                conteos[columna] = dict.fromkeys(self._opciones[columna], 0)
+                conteos[columna].update(matriz.conteos(filas).to_dict())
+            else:
+                codigos, valores = self._codigos[columna]
+                if mascara is not None:
+                    codigos = codigos[mascara]
+                cuentas = np.bincount(codigos + 1, minlength=len(valores) + 1)[1:]
+                conteos[columna] = dict(zip(valores, cuentas.tolist()))
+        return conteos
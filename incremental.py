@@ -0,0 +1,95 @@
+# incremental.py
+"""Alta incremental de miembros: añadir perfiles nuevos a las cachés sin reconstruirlas"""
+
+import pandas as pd
+import pyarrow as pa
+
+from busqueda import IndiceBM25
+from data import (
+    RUTA_CSV,
+    cargar_snapshot,
+    guardar_snapshot,
+    limpiar_filas_nuevas,
+    ruta_indice,
+)
+from similitud import IndiceLsa, IndiceTfidf, ruta_indice_lsa
+from vecinos_aproximados import IndiceIVF, ruta_indice_ivf
+
+# Texto nuevo fuera del vocabulario TF-IDF (relativo al del ajuste) que fuerza reajustarlo
+UMBRAL_DERIVA_TFIDF = 0.05
+
+# Perfiles añadidos (relativos a los de la construcción) que fuerzan reconstruir el BM25
+UMBRAL_DERIVA_BM25 = 0.10
+
+
+def agregar_miembros(filas, huella_anterior, huella, path=RUTA_CSV, cabecera=None):
+    """
+    Añadir filas ya escritas en el CSV a la caché de la versión anterior.
+
+    Tiene la firma de los callbacks de `agregar_filas_csv` (y de
+    `almacen_sqlite.insertar_miembros`) y debe llamarse con su bloqueo
+    tomado, para que ningún otro alta cambie los datos entre medias.
+
+    Limpia solo las filas nuevas, las añade al snapshot y a los índices
+    guardados (TF-IDF, LSA, IVF y BM25) y lo guarda todo con la huella
+    nueva del CSV: al recargar, la app encuentra las cachés listas. Un
+    índice sin caché anterior, o cuya deriva supera su umbral, no se guarda
+    y se reconstruye completo al cargarlo. La tabla de matches precalculada
+    no se actualiza (hay que volver a ejecutar tabla_matches.py).
+
+    Args:
+        filas: Lista de dicts con las respuestas crudas de los miembros nuevos
+        huella_anterior: Huella de los datos antes de escribir las filas
+        huella: Huella de los datos con las filas ya escritas
+        path: CSV fuente
+        cabecera: Columnas de la fuente si no es el CSV (almacén SQLite)
+
+    Returns:
+        Dict {nombre de la caché: "incremental" | "reconstruir"}; None si
+        las filas no se pudieron añadir al snapshot (se limpiará todo el CSV)
+    """
+    df_anterior = cargar_snapshot(huella_anterior)
+    if df_anterior is None:
+        return None
+    nuevas = limpiar_filas_nuevas(filas, df_anterior, path, cabecera)
+    if nuevas is None:
+        return None
+
+    df = pd.concat([df_anterior, nuevas], ignore_index=True)
+    try:
+        guardar_snapshot(df, huella)
+    except (OSError, pa.ArrowException):
+        return None
+    nuevas.index = df.index[len(df_anterior):]
+    estado = {"directorio": "incremental"}
+
+    # Matchmaking: TF-IDF por campos y los índices que dependen de él
+    estado["tfidf"] = estado["lsa"] = estado["ivf"] = "reconstruir"
+    tfidf = IndiceTfidf.cargar(ruta_indice("tfidf", huella_anterior), df_anterior.index)
+    if tfidf is not None:
+        tfidf = tfidf.agregar(nuevas, df.index)
+        if tfidf.deriva <= UMBRAL_DERIVA_TFIDF:
+            tfidf.guardar(ruta_indice("tfidf", huella))
+            estado["tfidf"] = "incremental"
+            matriz_nuevas = tfidf.matriz[len(df_anterior):]
+
+            lsa = IndiceLsa.cargar(ruta_indice_lsa(huella_anterior), df_anterior.index)
+            if lsa is not None:
+                lsa.agregar(matriz_nuevas, df.index).guardar(ruta_indice_lsa(huella))
+                estado["lsa"] = "incremental"
+
+            ivf = IndiceIVF.cargar(ruta_indice_ivf(huella_anterior), len(df_anterior))
+            if ivf is not None:
+                ivf.agregar(matriz_nuevas).guardar(ruta_indice_ivf(huella))
+                estado["ivf"] = "incremental"
+
+    # Búsqueda global
+    estado["bm25"] = "reconstruir"
+    bm25 = IndiceBM25.cargar(ruta_indice("bm25", huella_anterior))
+    if bm25 is not None and len(bm25) == len(df_anterior):
+        bm25 = bm25.agregar(nuevas)
+        if bm25.deriva <= UMBRAL_DERIVA_BM25:
+            bm25.guardar(ruta_indice("bm25", huella))
+            estado["bm25"] = "incremental"
+
+    return estado
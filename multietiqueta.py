@@ -0,0 +1,198 @@
+# multietiqueta.py
+"""Representación compacta de las columnas multi-etiqueta (industrias, áreas de acción)"""
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+
+class MatrizMultietiqueta:
+    """
+    Matriz indicadora dispersa filas × etiquetas construida una sola vez.
+
+    Sustituye a recorrer listas de Python fila a fila: las consultas
+    "tiene alguna de", "tiene todas", conteos y co-ocurrencias se resuelven
+    con operaciones vectorizadas sobre la matriz CSR (por filas) y su copia
+    CSC (por etiqueta, equivalente a listas de posting).
+
+    Las filas se identifican por la etiqueta del índice del DataFrame de
+    origen, de modo que se puede consultar con el índice de cualquier
+    subconjunto filtrado (`filtro.index`).
+    """
+
+    def __init__(self, matriz, etiquetas, index, primera):
+        self.matriz = matriz.tocsr()
+        self._csc = self.matriz.tocsc()
+        self.etiquetas = list(etiquetas)
+        self.posicion = {etiqueta: i for i, etiqueta in enumerate(self.etiquetas)}
+        self.index = index
+        # Primera etiqueta de cada fila en el orden original de la lista (-1 si no tiene)
+        self.primera = primera
+
+    @classmethod
+    def desde_listas(cls, serie):
+        """
+        Construir la matriz a partir de una columna de listas.
+
+        El vocabulario se ordena por primera aparición para que los empates
+        en los conteos se resuelvan igual que `pd.Series(lista).value_counts()`.
+        """
+        vocabulario = {}
+        indices = []
+        indptr = [0]
+        primera = np.full(len(serie), -1, dtype=np.int32)
+        for fila, lista in enumerate(serie):
+            if isinstance(lista, (list, np.ndarray)) and len(lista) > 0:
+                vistas = set()
+                for etiqueta in lista:
+                    columna = vocabulario.setdefault(etiqueta, len(vocabulario))
+                    if columna not in vistas:
+                        vistas.add(columna)
+                        indices.append(columna)
+                primera[fila] = indices[indptr[-1]]
+            indptr.append(len(indices))
+
+        matriz = sparse.csr_matrix(
+            (np.ones(len(indices), dtype=np.int32),
+             np.asarray(indices, dtype=np.int32),
+             np.asarray(indptr, dtype=np.int64)),
+            shape=(len(serie), len(vocabulario)),
+        )
+        matriz.sort_indices()
+        return cls(matriz, vocabulario, serie.index, primera)
+
+    def __len__(self):
+        return self.matriz.shape[0]
+
+    # --- Selección de filas ---
+
+    def posiciones(self, filas=None):
+        """
+        Traducir una selección de filas a posiciones enteras.
+
+        Args:
+            filas: None (todas), un pd.Index con etiquetas del DataFrame de
+                origen, o un array de posiciones / máscara booleana
+
+        Returns:
+            Array de posiciones o slice(None)
+        """
+        if filas is None:
+            return slice(None)
+        if isinstance(filas, pd.Index):
+            return self.index.get_indexer(filas)
+        filas = np.asarray(filas)
+        return np.flatnonzero(filas) if filas.dtype == bool else filas
+
+    def _columnas(self, etiquetas):
+        return [self.posicion[e] for e in etiquetas if e in self.posicion]
+
+    # --- Consultas vectorizadas ---
+
+    def num_etiquetas(self, filas=None):
+        """Número de etiquetas de cada fila"""
+        return np.diff(self.matriz.indptr)[self.posiciones(filas)]
+
+    def tiene_alguna(self, etiquetas, filas=None):
+        """Máscara booleana: la fila tiene al menos una de las etiquetas"""
+        mascara = np.zeros(len(self), dtype=bool)
+        for columna in self._columnas(etiquetas):
+            inicio, fin = self._csc.indptr[columna], self._csc.indptr[columna + 1]
+            mascara[self._csc.indices[inicio:fin]] = True
+        return mascara[self.posiciones(filas)]
+
+    def tiene_todas(self, etiquetas, filas=None):
+        """Máscara booleana: la fila tiene todas las etiquetas"""
+        etiquetas = set(etiquetas)
+        columnas = self._columnas(etiquetas)
+        if len(columnas) < len(etiquetas):
+            # Alguna etiqueta no existe en el vocabulario: ninguna fila las tiene todas
+            return np.zeros(len(self), dtype=bool)[self.posiciones(filas)]
+        if not columnas:
+            return np.ones(len(self), dtype=bool)[self.posiciones(filas)]
+        postings = np.concatenate([
+            self._csc.indices[self._csc.indptr[c]:self._csc.indptr[c + 1]] for c in columnas
+        ])
+        mascara = np.bincount(postings, minlength=len(self)) == len(columnas)
+        return mascara[self.posiciones(filas)]
+
+    def filas_etiqueta(self, etiqueta):
+        """Posiciones (ordenadas) de las filas que tienen la etiqueta"""
+        if etiqueta not in self.posicion:
+            return np.empty(0, dtype=np.int32)
+        columna = self.posicion[etiqueta]
+        return np.sort(self._csc.indices[self._csc.indptr[columna]:self._csc.indptr[columna + 1]])
+
+    def contiene_texto(self, texto, filas=None):
+        """Máscara booleana: alguna etiqueta de la fila contiene el texto dado"""
+        return self.tiene_alguna([e for e in self.etiquetas if texto in e], filas)
+
+    def conteos(self, filas=None):
+        """
+        Número de filas por etiqueta, de mayor a menor (equivalente a explotar + value_counts).
+
+        Returns:
+            pd.Series indexada por etiqueta, solo con conteos > 0
+        """
+        if filas is None:
+            cuentas = np.diff(self._csc.indptr)
+        else:
+            cuentas = np.bincount(self.matriz[self.posiciones(filas)].indices,
+                                  minlength=len(self.etiquetas))
+        orden = np.argsort(-cuentas, kind="stable")
+        orden = orden[cuentas[orden] > 0]
+        return pd.Series(cuentas[orden], index=[self.etiquetas[i] for i in orden], dtype=np.int64)
+
+    def conteos_primera(self, filas=None):
+        """Conteo de la primera etiqueta de cada fila (la etiqueta principal)"""
+        primera = self.primera[self.posiciones(filas)]
+        cuentas = np.bincount(primera[primera >= 0], minlength=len(self.etiquetas))
+        orden = np.argsort(-cuentas, kind="stable")
+        orden = orden[cuentas[orden] > 0]
+        return pd.Series(cuentas[orden], index=[self.etiquetas[i] for i in orden], dtype=np.int64)
+
+    def coocurrencia(self, otra=None, filas=None):
+        """
+        Matriz de co-ocurrencia etiqueta × etiqueta (Xᵀ·Y) en una sola multiplicación dispersa.
+
+        Args:
+            otra: Otra MatrizMultietiqueta sobre las mismas filas (por defecto, ella misma)
+            filas: Selección de filas a considerar
+
+        Returns:
+            pd.DataFrame con las etiquetas de esta matriz como filas y las de `otra` como columnas
+        """
+        otra = self if otra is None else otra
+        posiciones = self.posiciones(filas)
+        izquierda = self.matriz[posiciones]
+        derecha = otra.matriz[posiciones]
+        producto = (izquierda.T @ derecha).toarray()
+        return pd.DataFrame(producto, index=self.etiquetas, columns=otra.etiquetas)
+
+    # --- Acceso por fila ---
+
+    def etiquetas_fila(self, etiqueta_fila):
+        """Etiquetas de una fila identificada por su etiqueta de índice"""
+        posicion = self.index.get_loc(etiqueta_fila)
+        inicio, fin = self.matriz.indptr[posicion], self.matriz.indptr[posicion + 1]
+        return [self.etiquetas[c] for c in self.matriz.indices[inicio:fin]]
+
+    def comunes(self, fila1, fila2):
+        """Etiquetas compartidas por dos filas (identificadas por su etiqueta de índice)"""
+        p1, p2 = self.index.get_loc(fila1), self.index.get_loc(fila2)
+        c1 = self.matriz.indices[self.matriz.indptr[p1]:self.matriz.indptr[p1 + 1]]
+        c2 = self.matriz.indices[self.matriz.indptr[p2]:self.matriz.indptr[p2 + 1]]
+        return [self.etiquetas[c] for c in np.intersect1d(c1, c2, assume_unique=True)]
+
+
+def construir_multietiquetas(df, columnas=("Industrias normalizadas", "Areas de acción normalizadas")):
+    """
+    Construir las matrices indicadoras de las columnas multi-etiqueta presentes.
+
+    Returns:
+        dict nombre de columna -> MatrizMultietiqueta
+    """
+    return {
+        columna: MatrizMultietiqueta.desde_listas(df[columna])
+        for columna in columnas if columna in df.columns
+    }
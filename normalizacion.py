@@ -0,0 +1,227 @@
+# normalizacion.py
+"""Reglas de normalización del directorio compiladas una sola vez"""
+
+import functools
+import re
+
+import numpy as np
+import pandas as pd
+
+# Diccionario de normalizaciones por ciudad (el orden define la prioridad)
+UBICACIONES_NORMALIZADAS = {
+    'Madrid, España': [r'madrid', r'manzanares.*madrid', r'san\s+sebastian.*reyes', r'guadalajara.*españa'],
+    'Barcelona, España': [r'barcelona'],
+    'Valencia, España': [r'valencia'],
+    'Sevilla, España': [r'sevilla'],
+    'Alicante, España': [r'alicante'],
+    'Bilbao, España': [r'bilbao'],
+    'Zaragoza, España': [r'zaragoza'],
+    'Santiago de Compostela, España': [r'santiago.*compostela', r'santiago.*galicia'],
+    'Ciudad Real, España': [r'ciudad\s*real'],
+    'Donostia, España': [r'donosti'],
+    'Berlín, Alemania': [r'berlín', r'berlin'],
+    'Londres, Reino Unido': [r'londres', r'london'],
+    'París, Francia': [r'parís', r'paris'],
+    'Copenhague, Dinamarca': [r'copenhague', r'copenhagen'],
+    'Lima, Perú': [r'lima.*per[uú]'],
+    'Sydney, Australia': [r'sydney'],
+}
+
+
+def _compilar_patron_ubicaciones(normalizaciones):
+    """
+    Compilar todas las ciudades en una única expresión regular.
+
+    Cada ciudad es una alternativa `.*?(patrones)` con un grupo vacío con
+    nombre al final. Como `re.match` prueba las alternativas en orden, la
+    ciudad que gana es la primera del diccionario con algún patrón presente
+    en el texto, igual que recorrer el diccionario con `re.search`.
+    """
+    alternativas = []
+    for i, patrones in enumerate(normalizaciones.values()):
+        alternativas.append(f"(?s:.*?)(?:{'|'.join(patrones)})(?P<c{i}>)")
+    return re.compile("|".join(alternativas))
+
+
+_PATRON_UBICACIONES = _compilar_patron_ubicaciones(UBICACIONES_NORMALIZADAS)
+_CIUDADES = list(UBICACIONES_NORMALIZADAS)
+_RE_SEPARADORES = re.compile(r'\s*[/\-]\s*')
+_RE_PARENTESIS = re.compile(r'\s*\([^)]*\)')
+
+
+def normalizar_ubicacion(ub):
+    """Normalizar una ubicación libre al formato "Ciudad, País" """
+    if pd.isna(ub):
+        return np.nan
+    ub = str(ub).strip()
+
+    m = _PATRON_UBICACIONES.match(ub.lower())
+    if m:
+        return _CIUDADES[int(m.lastgroup[1:])]
+
+    # Limpieza genérica si no coincide con ningún patrón
+    ub = _RE_SEPARADORES.sub(', ', ub)
+    ub = _RE_PARENTESIS.sub('', ub)
+    return ub.strip()
+
+
+def mapear_valores_unicos(serie, funcion, valor_nulo=np.nan):
+    """
+    Aplicar `funcion` una sola vez por valor distinto de la serie.
+
+    Los valores se factorizan (códigos enteros + valores únicos), se
+    transforman los únicos y el resultado se propaga a todas las filas
+    indexando con los códigos. El coste crece con la cardinalidad de la
+    columna, no con el número de filas.
+
+    Args:
+        serie: Serie de entrada
+        funcion: Transformación a aplicar a cada valor no nulo
+        valor_nulo: Resultado para los valores nulos
+
+    Returns:
+        Serie de objetos alineada con el índice de la entrada
+    """
+    codigos, unicos = pd.factorize(serie, use_na_sentinel=True)
+    transformados = np.empty(len(unicos) + 1, dtype=object)
+    # Asignación elemento a elemento: numpy intentaría expandir resultados que sean listas
+    for i, valor in enumerate(unicos):
+        transformados[i] = funcion(valor)
+    transformados[-1] = valor_nulo
+    # El código -1 (nulo) apunta a la última posición
+    return pd.Series(transformados[codigos], index=serie.index, name=serie.name)
+
+
+def normalizar_ubicaciones(serie):
+    """Normalizar una columna de ubicaciones evaluando cada ubicación distinta una vez"""
+    return mapear_valores_unicos(serie, normalizar_ubicacion)
+
+
+# Palabras clave por industria (el orden define la prioridad)
+INDUSTRIAS_PALABRAS_CLAVE = {
+    'Ciencia y Salud': ['ciencia', 'salud', 'biotech', 'biomedicina', 'médico', 'farmacéutica', 'medicina'],
+    'Tecnología y Producto': ['tecnología', 'tech', 'software', 'producto', 'ai', 'inteligencia artificial', 'digital'],
+    'Energía y Sostenibilidad': ['energía', 'sostenibilidad', 'renovable', 'medio ambiente', 'clima'],
+    'Educación': ['educación', 'educacion', 'academia', 'universidad', 'formación'],
+    'Finanzas': ['finanzas', 'banca', 'inversión', 'inversion', 'financiero'],
+    'Consultoría': ['consultoría', 'consultoria', 'consulting'],
+    'Emprendimiento': ['emprendimiento', 'startup', 'founder'],
+    'Ingeniería': ['ingeniería', 'ingenieria', 'engineering'],
+    'Asuntos Públicos': ['asuntos públicos', 'público', 'gobierno', 'administración'],
+    'Servicios Profesionales': ['servicios profesionales', 'servicios'],
+}
+
+# Palabras clave por categoría de rol (el orden define la prioridad)
+ROLES_PALABRAS_CLAVE = {
+    'Liderazgo Ejecutivo': ['ceo', 'founder', 'cofundador', 'chief', 'co-founder',
+                            'director', 'head of', 'subdirector'],
+    'Medicina': ['médico', 'doctor', 'residente', 'msl', 'cirujano'],
+    'Investigación': ['investigador', 'researcher', 'postdoc', 'científico', 'phd'],
+    'Docencia': ['profesor', 'docente', 'teacher', 'lecturer'],
+    'Gestión': ['manager', 'lead', 'responsable', 'coordinador'],
+    'Consultoría': ['consultor', 'consultant', 'advisor', 'asesor'],
+    'Ingeniería/Desarrollo': ['engineer', 'ingeniero', 'developer', 'cto', 'architect'],
+    'Producto': ['product', 'producto'],
+    'Estudiante': ['estudiante', 'student'],
+    'Análisis': ['analista', 'analyst', 'data'],
+    'Asuntos Públicos': ['policy', 'política', 'gobierno'],
+    'Divulgación': ['divulgador', 'comunicación'],
+}
+
+
+class ClasificadorPalabrasClave:
+    """
+    Clasificador multi-patrón construido una vez a partir de una tabla de palabras clave.
+
+    Todas las palabras se compilan en una única expresión regular de tipo
+    lookahead `(?=(p1)|(p2)|...)`, de modo que una sola pasada de `finditer`
+    encuentra en cada posición del texto la palabra clave más larga que
+    empieza ahí. Como las palabras más cortas que empiezan en la misma
+    posición son prefijos de la más larga, cada palabra lleva asociadas
+    también las categorías de sus prefijos: el conjunto de categorías
+    devuelto es exacto, igual que con Aho-Corasick.
+
+    La coincidencia es por subcadena (como `palabra in texto`) y los
+    resultados se memorizan por texto de entrada.
+    """
+
+    def __init__(self, tabla, max_cache=65536):
+        """
+        Args:
+            tabla: dict categoría -> lista de palabras clave, en orden de prioridad
+            max_cache: Número máximo de textos distintos memorizados
+        """
+        self.categorias = list(tabla)
+
+        categorias_palabra = {}
+        for prioridad, palabras in enumerate(tabla.values()):
+            for palabra in palabras:
+                categorias_palabra.setdefault(palabra, set()).add(prioridad)
+
+        # Más largas primero: en cada posición gana la palabra más larga
+        ordenadas = sorted(categorias_palabra, key=len, reverse=True)
+        self._prioridades = [None]  # los grupos de la regex empiezan en 1
+        for palabra in ordenadas:
+            prioridades = set()
+            for otra, cats in categorias_palabra.items():
+                if palabra.startswith(otra):
+                    prioridades |= cats
+            self._prioridades.append(frozenset(prioridades))
+
+        alternativas = "|".join(f"({re.escape(p)})" for p in ordenadas)
+        self._patron = re.compile(f"(?=(?:{alternativas}))")
+
+        self._prioridades_texto = functools.lru_cache(maxsize=max_cache)(self._calcular_prioridades)
+
+    def _calcular_prioridades(self, texto):
+        prioridades = set()
+        for m in self._patron.finditer(texto):
+            prioridades |= self._prioridades[m.lastindex]
+        return frozenset(prioridades)
+
+    def clasificar(self, texto):
+        """Todas las categorías cuyas palabras clave aparecen en el texto (en minúsculas)"""
+        return {self.categorias[p] for p in self._prioridades_texto(texto)}
+
+    def primera_categoria(self, texto):
+        """Categoría de mayor prioridad presente en el texto (en minúsculas), o None"""
+        prioridades = self._prioridades_texto(texto)
+        return self.categorias[min(prioridades)] if prioridades else None
+
+
+clasificador_industrias = ClasificadorPalabrasClave(INDUSTRIAS_PALABRAS_CLAVE)
+clasificador_roles = ClasificadorPalabrasClave(ROLES_PALABRAS_CLAVE)
+
+
+def normalizar_industrias(ind):
+    """Normalizar un texto de industrias separado por comas a una lista de categorías"""
+    if pd.isna(ind):
+        return []
+
+    # Separar por comas
+    industrias_raw = [i.strip() for i in str(ind).split(',')]
+    industrias_normalizadas = []
+
+    for ind_raw in industrias_raw:
+        ind_lower = ind_raw.lower()
+
+        # Categorizar cada industria
+        categoria = clasificador_industrias.primera_categoria(ind_lower)
+        if categoria is not None:
+            if categoria not in industrias_normalizadas:
+                industrias_normalizadas.append(categoria)
+        elif 'otro' not in ind_lower and 'corporate' not in ind_lower:
+            # Si no es "Otro" ni "Corporate", mantener como categoría única
+            if ind_raw not in industrias_normalizadas:
+                industrias_normalizadas.append(ind_raw)
+
+    return industrias_normalizadas
+
+
+def categorizar_rol(rol):
+    """Asignar la categoría de rol de mayor prioridad al texto del rol actual"""
+    if pd.isna(rol):
+        return 'Sin especificar'
+
+    categoria = clasificador_roles.primera_categoria(str(rol).lower())
+    return categoria if categoria is not None else 'Otro'
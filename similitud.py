@@ -0,0 +1,498 @@
+# similitud.py
+"""Índices de similitud entre perfiles para el matchmaking"""
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.decomposition import TruncatedSVD
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import normalize
+
+from data import guardar_arrays, ruta_indice
+
+# Versión de las features y del formato del índice: incrementar al cambiarlos
+VERSION_INDICE_TFIDF = 3
+VERSION_INDICE_LSA = 1
+
+# Dimensiones de los embeddings LSA (64-256: más = más fiel al TF-IDF)
+DIMENSIONES_LSA = 128
+
+# Peso de cada campo en la similitud textual: cada campo se vectoriza por
+# separado y su bloque de columnas se multiplica por su peso
+PESOS_CAMPOS = {
+    # CORE
+    "Industrias normalizadas": 4,
+    "Categoría rol": 4,
+    # IMPORTANTES
+    "Areas de acción normalizadas": 3,
+    # SECUNDARIAS
+    "Ubicación normalizada": 2,
+    "Área de estudio:": 2,
+    # CONTEXTUALES
+    "¿Rol actual?": 2,
+    "Superpoder": 2,
+    "¿Motivación para unirte?": 2,
+    # ADICIONALES: conexiones y expertise
+    "¿Qué conexiones buscas?": 2,
+    "¿Área mas valor aportaría?": 2,
+    "Áreas de especialización o interés:": 2,
+    # COMPLEMENTARIAS
+    "¿Temas podría abordar?": 1,
+    "¿Empresa?": 1,
+    "¿Universidad?": 1,
+    # Meta-características (generación como contexto)
+    "Generación": 1,
+}
+
+# Ponderación del score híbrido y penalización por diversidad
+PESO_TEXTO = 0.70
+PESO_NUMERICO = 0.30
+UMBRAL_DIVERSIDAD = 0.95
+PENALIZACION_DIVERSIDAD = 0.05
+
+
+def filtrar_perfiles_validos_matchmaking(df, matriz_industrias=None):
+    """
+    Filtrar solo perfiles con datos mínimos necesarios para matchmaking.
+    Requisitos: Al menos tener industria O rol Y nombre completo
+    """
+    if matriz_industrias is not None:
+        tiene_industria = matriz_industrias.num_etiquetas(df.index) > 0
+    else:
+        tiene_industria = df["Industrias normalizadas"].str.len() > 0
+    perfiles_validos = df[
+        # Debe tener nombre
+        (df["Nombre y apellido"].notna()) &
+        (df["Nombre y apellido"].str.strip() != "") &
+        # Y debe tener AL MENOS industria O rol
+        (
+            tiene_industria |
+            (df["Categoría rol"].notna() & (df["Categoría rol"] != "Sin especificar"))
+        )
+    ]
+    return perfiles_validos
+
+
+def puntuacion_hibrida(similitudes_texto, similitudes_numericas):
+    """
+    Score final del matchmaking: 70% texto + 30% numérico.
+
+    Si la similitud es DEMASIADO alta (>0.95) se reduce ligeramente para
+    promover diversidad (evitar clones exactos).
+    """
+    scores_hibridos = (PESO_TEXTO * similitudes_texto) + (PESO_NUMERICO * similitudes_numericas)
+    diversity_penalty = np.where(scores_hibridos > UMBRAL_DIVERSIDAD, PENALIZACION_DIVERSIDAD, 0)
+    return scores_hibridos - diversity_penalty
+
+
+def umbral_matches(scores):
+    """Threshold adaptativo: percentil 25 de los scores positivos, como mínimo 0.1"""
+    scores_validos = scores[scores > 0]
+    if len(scores_validos) > 0:
+        return max(0.1, np.percentile(scores_validos, 25))
+    return 0.1
+
+
+def texto_campo(df, columna):
+    """Texto de un campo para su vectorizador: listas unidas por espacios, vacío si falta el dato"""
+    if columna not in df.columns:
+        return pd.Series("", index=df.index)
+    if columna == "Generación":
+        return df[columna].map(lambda v: f"Gen{v}" if pd.notna(v) else "")
+    return df[columna].map(
+        lambda v: " ".join(str(x) for x in v) if isinstance(v, list) else (str(v) if pd.notna(v) else "")
+    )
+
+
+def crear_vectorizador(norma="l2", vocabulario=None):
+    """Vectorizador TF-IDF del matchmaking (float32; con L2 el coseno es un producto escalar)"""
+    return TfidfVectorizer(
+        vocabulary=vocabulario,
+        stop_words='english',
+        max_features=1500,  # Más features para mejor captura
+        min_df=1,
+        max_df=0.95,  # Ignorar términos muy comunes
+        ngram_range=(1, 2),  # Unigramas y bigramas
+        sublinear_tf=True,  # Usar escala logarítmica para TF
+        norm=norma,
+        dtype=np.float32
+    )
+
+
+class IndiceTfidf:
+    """
+    Matriz TF-IDF por campos de todo el directorio.
+
+    Cada campo de PESOS_CAMPOS tiene su propio vectorizador y vocabulario;
+    sus matrices (sin normalizar) se apilan en bloques de columnas
+    (`bloques`, con el campo i en las columnas limites[i]:limites[i+1]).
+    `matriz` es esa misma matriz con cada bloque multiplicado por su peso y
+    las filas normalizadas (L2) en float32: la similitud coseno de un
+    perfil con un subconjunto es un único producto matriz × vector
+    restringido a las filas del subconjunto. Cambiar los pesos solo
+    re-escala bloques (`ponderar`), sin volver a tokenizar.
+
+    Se ajusta una sola vez por versión de datos sobre el directorio
+    completo, así que la similitud entre dos perfiles no depende de los
+    filtros del sidebar. Las filas se identifican por la etiqueta del
+    índice del DataFrame de origen, como en MatrizMultietiqueta.
+
+    Los perfiles nuevos se añaden con `agregar`, transformados con el
+    vocabulario ya ajustado; `deriva` mide cuánto texto nuevo queda fuera
+    de ese vocabulario para decidir cuándo volver a ajustarlo.
+    """
+
+    def __init__(self, bloques, limites, campos, vocabulario, idf, index, pesos=None,
+                 nnz_ajuste=None, fuera_vocabulario=0):
+        self.bloques = sparse.csr_matrix(bloques, dtype=np.float32)
+        self.limites = np.asarray(limites, dtype=np.int64)
+        self.campos = list(campos)
+        self.vocabulario = list(vocabulario)
+        self.idf = np.asarray(idf, dtype=np.float32)
+        self.index = index
+        self.pesos = dict(PESOS_CAMPOS if pesos is None else pesos)
+        # Términos distintos por perfil al ajustar y, de los añadidos después, fuera del vocabulario
+        self.nnz_ajuste = int(self.bloques.nnz if nnz_ajuste is None else nnz_ajuste)
+        self.fuera_vocabulario = int(fuera_vocabulario)
+
+        escala = np.repeat(
+            np.asarray([self.pesos.get(campo, 0) for campo in self.campos], dtype=np.float32),
+            np.diff(self.limites),
+        )
+        ponderada = (self.bloques @ sparse.diags(escala)).tocsr()
+        self.matriz = normalize(ponderada, copy=False) if ponderada.shape[0] else ponderada
+
+    def __len__(self):
+        return self.matriz.shape[0]
+
+    @classmethod
+    def construir(cls, df):
+        """Ajustar un vectorizador por campo sobre todos los perfiles y apilar los bloques"""
+        bloques, limites, campos, vocabulario, idf = [], [0], [], [], []
+        for campo in PESOS_CAMPOS:
+            vectorizer = crear_vectorizador(norma=None)
+            try:
+                bloque = vectorizer.fit_transform(texto_campo(df, campo))
+            except ValueError:
+                # Campo sin vocabulario (vacío o solo palabras vacías)
+                continue
+            bloques.append(bloque)
+            limites.append(limites[-1] + bloque.shape[1])
+            campos.append(campo)
+            vocabulario.extend(vectorizer.get_feature_names_out())
+            idf.append(vectorizer.idf_)
+
+        if not bloques:
+            return cls(sparse.csr_matrix((len(df), 0)), limites, campos, vocabulario, [], df.index)
+        return cls(sparse.hstack(bloques, format="csr"), limites, campos, vocabulario,
+                   np.concatenate(idf), df.index)
+
+    def ponderar(self, pesos):
+        """Mismo índice con otros pesos por campo (re-escala los bloques, no re-tokeniza)"""
+        return IndiceTfidf(self.bloques, self.limites, self.campos, self.vocabulario, self.idf,
+                           self.index, pesos, self.nnz_ajuste, self.fuera_vocabulario)
+
+    def _vectorizador(self, i):
+        """Vectorizador ya ajustado del campo i (vocabulario e IDF guardados)"""
+        inicio, fin = self.limites[i], self.limites[i + 1]
+        vectorizer = crear_vectorizador(norma=None, vocabulario=self.vocabulario[inicio:fin])
+        vectorizer.idf_ = self.idf[inicio:fin]
+        return vectorizer
+
+    @property
+    def deriva(self):
+        """Términos fuera del vocabulario añadidos desde el ajuste, relativos a los del ajuste"""
+        return self.fuera_vocabulario / max(self.nnz_ajuste, 1)
+
+    def agregar(self, df_nuevas, index):
+        """
+        Índice con perfiles nuevos al final, sin volver a ajustar los vectorizadores.
+
+        Args:
+            df_nuevas: DataFrame limpio con solo los perfiles nuevos
+            index: pd.Index del directorio completo (anteriores + nuevos)
+        """
+        bloques, fuera = [], 0
+        for campo in PESOS_CAMPOS:
+            textos = texto_campo(df_nuevas, campo)
+            if campo in self.campos:
+                vectorizer = self._vectorizador(self.campos.index(campo))
+                bloques.append(vectorizer.transform(textos))
+                conocidos = vectorizer.vocabulary_
+            else:
+                # Campo sin vocabulario al ajustar: todo su texto queda fuera
+                vectorizer, conocidos = crear_vectorizador(), {}
+            analizador = vectorizer.build_analyzer()
+            fuera += sum(len(set(analizador(texto)) - conocidos.keys()) for texto in textos)
+
+        nuevas = (sparse.hstack(bloques, format="csr") if bloques
+                  else sparse.csr_matrix((len(df_nuevas), 0), dtype=np.float32))
+        return IndiceTfidf(sparse.vstack([self.bloques, nuevas], format="csr"), self.limites, self.campos,
+                           self.vocabulario, self.idf, index, self.pesos,
+                           self.nnz_ajuste, self.fuera_vocabulario + fuera)
+
+    def posiciones(self, filas=None):
+        """Posiciones enteras de un pd.Index de etiquetas (None = todas)"""
+        if filas is None:
+            return np.arange(len(self))
+        return self.index.get_indexer(filas)
+
+    def similitudes(self, fila, filas=None):
+        """
+        Similitud coseno de un perfil con cada perfil de un subconjunto.
+
+        Args:
+            fila: Etiqueta de índice del perfil de referencia
+            filas: pd.Index con las etiquetas de los perfiles a comparar (None = todos)
+
+        Returns:
+            Array float32 alineado con `filas`
+        """
+        referencia = self.matriz[self.index.get_loc(fila)].toarray().ravel()
+        if filas is None:
+            return self.matriz @ referencia
+        return self.matriz[self.posiciones(filas)] @ referencia
+
+    # --- Persistencia junto al snapshot de datos ---
+
+    def guardar(self, ruta):
+        """Guardar los bloques por campo, el vocabulario y los IDF en un .npz (escritura atómica)"""
+        guardar_arrays(
+            ruta,
+            version=np.int32(VERSION_INDICE_TFIDF),
+            data=self.bloques.data,
+            indices=self.bloques.indices,
+            indptr=self.bloques.indptr,
+            forma=np.asarray(self.bloques.shape),
+            limites=self.limites,
+            campos=np.asarray(self.campos, dtype=str),
+            vocabulario=np.asarray(self.vocabulario, dtype=str),
+            idf=self.idf,
+            deriva=np.asarray([self.nnz_ajuste, self.fuera_vocabulario]),
+        )
+
+    @classmethod
+    def cargar(cls, ruta, index):
+        """Cargar un índice guardado; None si no existe o es de otra versión"""
+        if not ruta.exists():
+            return None
+        with np.load(ruta) as datos:
+            if int(datos["version"]) != VERSION_INDICE_TFIDF or datos["forma"][0] != len(index):
+                return None
+            bloques = sparse.csr_matrix(
+                (datos["data"], datos["indices"], datos["indptr"]), shape=tuple(datos["forma"])
+            )
+            nnz_ajuste, fuera_vocabulario = datos["deriva"]
+            return cls(bloques, datos["limites"], datos["campos"].tolist(), datos["vocabulario"].tolist(),
+                       datos["idf"], index, nnz_ajuste=nnz_ajuste, fuera_vocabulario=fuera_vocabulario)
+
+
+class IndiceLsa:
+    """
+    Embeddings densos LSA de los perfiles: TF-IDF proyectado con TruncatedSVD.
+
+    Cada perfil es un vector float32 de dimensión fija (DIMENSIONES_LSA),
+    normalizado L2 y guardado en una matriz C-contigua, así que la
+    similitud coseno con un subconjunto es un producto matriz × vector de
+    BLAS. Al proyectar sobre los componentes latentes, términos que
+    aparecen en los mismos perfiles (sinónimos) dejan de ser independientes.
+
+    Misma interfaz que IndiceTfidf (`posiciones`, `similitudes`), así que
+    encontrar_matches puede usar cualquiera de los dos.
+    """
+
+    def __init__(self, vectores, componentes, index):
+        self.vectores = np.ascontiguousarray(vectores, dtype=np.float32)
+        self.componentes = np.asarray(componentes, dtype=np.float32)
+        self.index = index
+
+    def __len__(self):
+        return self.vectores.shape[0]
+
+    @property
+    def dimensiones(self):
+        return self.vectores.shape[1]
+
+    @classmethod
+    def construir(cls, indice_tfidf, dimensiones=DIMENSIONES_LSA, semilla=0):
+        """
+        Ajustar la SVD truncada sobre la matriz TF-IDF de todo el directorio.
+
+        Args:
+            indice_tfidf: IndiceTfidf del directorio
+            dimensiones: Dimensión de los embeddings (acotada por el tamaño de la matriz)
+            semilla: Semilla del algoritmo aleatorizado de la SVD
+        """
+        dimensiones = max(1, min(dimensiones, min(indice_tfidf.matriz.shape) - 1))
+        svd = TruncatedSVD(dimensiones, algorithm="randomized", random_state=semilla)
+        vectores = svd.fit_transform(indice_tfidf.matriz).astype(np.float32)
+        vectores /= np.maximum(np.linalg.norm(vectores, axis=1, keepdims=True), 1e-12)
+        return cls(vectores, svd.components_, indice_tfidf.index)
+
+    def agregar(self, matriz_nuevas, index):
+        """
+        Índice con perfiles nuevos al final, proyectados con los componentes ya ajustados.
+
+        Args:
+            matriz_nuevas: Filas TF-IDF (ponderadas y normalizadas) de los perfiles nuevos
+            index: pd.Index del directorio completo (anteriores + nuevos)
+        """
+        nuevos = np.asarray(matriz_nuevas @ self.componentes.T, dtype=np.float32)
+        nuevos /= np.maximum(np.linalg.norm(nuevos, axis=1, keepdims=True), 1e-12)
+        return IndiceLsa(np.vstack([self.vectores, nuevos]), self.componentes, index)
+
+    def posiciones(self, filas=None):
+        """Posiciones enteras de un pd.Index de etiquetas (None = todas)"""
+        if filas is None:
+            return np.arange(len(self))
+        return self.index.get_indexer(filas)
+
+    def similitudes(self, fila, filas=None):
+        """
+        Similitud coseno (en el espacio LSA) de un perfil con cada perfil de un subconjunto.
+
+        Args:
+            fila: Etiqueta de índice del perfil de referencia
+            filas: pd.Index con las etiquetas de los perfiles a comparar (None = todos)
+
+        Returns:
+            Array float32 alineado con `filas`
+        """
+        referencia = self.vectores[self.index.get_loc(fila)]
+        if filas is None:
+            return self.vectores @ referencia
+        return self.vectores[self.posiciones(filas)] @ referencia
+
+    # --- Persistencia junto al snapshot de datos ---
+
+    def guardar(self, ruta):
+        """Guardar los embeddings y los componentes de la SVD en un .npz (escritura atómica)"""
+        guardar_arrays(
+            ruta,
+            version=np.int32(VERSION_INDICE_LSA),
+            vectores=self.vectores,
+            componentes=self.componentes,
+        )
+
+    @classmethod
+    def cargar(cls, ruta, index):
+        """Cargar un índice guardado; None si no existe, es de otra versión o de otro tamaño"""
+        if not ruta.exists():
+            return None
+        with np.load(ruta) as datos:
+            if int(datos["version"]) != VERSION_INDICE_LSA or datos["vectores"].shape[0] != len(index):
+                return None
+            return cls(datos["vectores"], datos["componentes"], index)
+
+
+class SimilitudNumerica:
+    """
+    Similitud de experiencia y generación entre perfiles, vectorizada.
+
+    Guarda los años de experiencia y la generación de todo el directorio
+    como arrays float (NaN si falta el dato) y compara un perfil con un
+    subconjunto con operaciones de numpy, promediando solo las
+    características disponibles en ambos perfiles.
+    """
+
+    # Máxima diferencia de años de experiencia considerada
+    MAX_DIFERENCIA_EXPERIENCIA = 15
+
+    # Similitud por diferencia de generación: 0, 1, 2 y 3 o más
+    SIMILITUD_GENERACION = np.array([1.0, 0.7, 0.4, 0.1])
+
+    def __init__(self, df):
+        self.index = df.index
+        self.experiencia = self._columna_numerica(df, "Años experiencia num")
+        self.generacion = self._columna_numerica(df, "Generación")
+
+    @staticmethod
+    def _columna_numerica(df, columna):
+        if columna not in df.columns:
+            return np.full(len(df), np.nan)
+        return pd.to_numeric(df[columna], errors="coerce").to_numpy(dtype=float)
+
+    def similitudes(self, fila, filas=None):
+        """
+        Similitud numérica (0-1) de un perfil con cada perfil de un subconjunto.
+
+        Args:
+            fila: Etiqueta de índice del perfil de referencia
+            filas: pd.Index con las etiquetas de los perfiles a comparar (None = todos)
+
+        Returns:
+            Array alineado con `filas` (0 si no comparten ninguna característica)
+        """
+        referencia = self.index.get_loc(fila)
+        posiciones = slice(None) if filas is None else self.index.get_indexer(filas)
+        return self.entre_posiciones([referencia], posiciones)[0]
+
+    def entre_posiciones(self, referencias, posiciones):
+        """
+        Matriz de similitud numérica entre dos conjuntos de posiciones (por broadcasting).
+
+        Returns:
+            Array len(referencias) × len(posiciones)
+        """
+        exp_ref = self.experiencia[referencias][:, None]
+        gen_ref = self.generacion[referencias][:, None]
+
+        # Experiencia: diferencia normalizada (más cercano = más similar)
+        diferencia = np.abs(self.experiencia[posiciones][None, :] - exp_ref)
+        sim_exp = 1 - np.minimum(diferencia, self.MAX_DIFERENCIA_EXPERIENCIA) / self.MAX_DIFERENCIA_EXPERIENCIA
+        con_exp = ~np.isnan(sim_exp)
+
+        # Generación: misma o cercana = más afinidad
+        diferencia_gen = np.abs(self.generacion[posiciones][None, :] - gen_ref)
+        con_gen = ~np.isnan(diferencia_gen)
+        sim_gen = self.SIMILITUD_GENERACION[np.minimum(np.nan_to_num(diferencia_gen), 3).astype(int)]
+
+        # Promedio solo sobre las características presentes en ambos perfiles
+        presentes = con_exp.astype(int) + con_gen
+        suma = np.where(con_exp, sim_exp, 0) + np.where(con_gen, sim_gen, 0)
+        return np.divide(suma, presentes, out=np.zeros(suma.shape), where=presentes > 0)
+
+
+def cargar_indice_tfidf(df, huella):
+    """
+    Índice TF-IDF del directorio, leído de la caché en disco si existe para esta huella.
+
+    Si hay que construirlo se guarda junto al snapshot de datos.
+    """
+    ruta = ruta_indice("tfidf", huella)
+    indice = IndiceTfidf.cargar(ruta, df.index)
+    if indice is not None:
+        return indice
+
+    indice = IndiceTfidf.construir(df)
+    try:
+        indice.guardar(ruta)
+    except OSError:
+        # La caché es una optimización: si no se puede escribir, seguimos sin ella
+        pass
+    return indice
+
+
+def ruta_indice_lsa(huella, dimensiones=DIMENSIONES_LSA):
+    """Dependen de la matriz TF-IDF: el nombre incluye VERSION_INDICE_TFIDF y las dimensiones"""
+    return ruta_indice("lsa", f"{huella}-t{VERSION_INDICE_TFIDF}-d{dimensiones}")
+
+
+def cargar_indice_lsa(indice_tfidf, huella, dimensiones=DIMENSIONES_LSA):
+    """
+    Embeddings LSA del directorio, leídos de la caché en disco si existen para esta huella.
+
+    Si hay que construirlos se guardan junto al snapshot de datos.
+    """
+    ruta = ruta_indice_lsa(huella, dimensiones)
+    indice = IndiceLsa.cargar(ruta, indice_tfidf.index)
+    if indice is not None:
+        return indice
+
+    indice = IndiceLsa.construir(indice_tfidf, dimensiones)
+    try:
+        indice.guardar(ruta)
+    except OSError:
+        # La caché es una optimización: si no se puede escribir, seguimos sin ella
+        pass
+    return indice
@@ -0,0 +1,178 @@
+# tabla_matches.py
+"""
+Tabla precalculada con los mejores matches de cada miembro del directorio.
+
+Proceso batch: calcula, para cada perfil elegible, sus k mejores matches
+con el mismo score que `encontrar_matches` (70% texto + 30% numérico, con
+penalización por diversidad) y el threshold adaptativo de su fila. La app
+memory-mapea la tabla y sirve los matches sin recalcularlos.
+
+Uso:
+    python tabla_matches.py
+"""
+
+import os
+import time
+
+import numpy as np
+
+from data import DIRECTORIO_CACHE, cargar_directorio, huella_datos
+from multietiqueta import construir_multietiquetas
+from similitud import (
+    VERSION_INDICE_TFIDF,
+    SimilitudNumerica,
+    cargar_indice_tfidf,
+    filtrar_perfiles_validos_matchmaking,
+    puntuacion_hibrida,
+    umbral_matches,
+)
+
+# Versión del formato de la tabla: incrementar al cambiarlo
+VERSION_TABLA_MATCHES = 1
+
+# Matches por miembro (los mismos que calcula encontrar_matches)
+K_MATCHES = 15
+
+# Máximo de celdas de la matriz de scores densa de cada bloque (~128 MB en float64)
+MAX_CELDAS_BLOQUE = 1 << 24
+
+
+def tipo_registro(k=K_MATCHES):
+    """Registro por miembro: índices int32 y scores float16 de sus k matches, más su threshold"""
+    return np.dtype([
+        ("vecinos", np.int32, (k,)),
+        ("puntuaciones", np.float16, (k,)),
+        ("umbral", np.float16),
+    ])
+
+
+def ruta_tabla_matches(huella):
+    return DIRECTORIO_CACHE / f"topk-{huella}-t{VERSION_INDICE_TFIDF}-v{VERSION_TABLA_MATCHES}.npy"
+
+
+def calcular_tabla_matches(df, indice_tfidf, similitud_numerica, matriz_industrias=None, k=K_MATCHES):
+    """
+    Top-k de matches de todos los perfiles elegibles, por bloques de filas.
+
+    Cada bloque es un producto disperso (bloque × elegibles) de la matriz
+    TF-IDF más la similitud numérica por broadcasting; `argpartition`
+    selecciona los k mejores de cada fila sin ordenar la fila completa.
+
+    Returns:
+        Array estructurado (tipo_registro) con una fila por perfil de `df`;
+        los perfiles no elegibles tienen vecinos -1 y threshold NaN
+    """
+    tabla = np.zeros(len(df), dtype=tipo_registro(k))
+    tabla["vecinos"] = -1
+    tabla["umbral"] = np.nan
+
+    elegibles = indice_tfidf.posiciones(filtrar_perfiles_validos_matchmaking(df, matriz_industrias).index)
+    m = len(elegibles)
+    if m < 2:
+        return tabla
+
+    matriz = indice_tfidf.matriz[elegibles]
+    traspuesta = matriz.T.tocsc()
+    k_efectivo = min(k, m - 1)
+    tamano_bloque = max(1, MAX_CELDAS_BLOQUE // m)
+
+    for inicio in range(0, m, tamano_bloque):
+        fin = min(inicio + tamano_bloque, m)
+        filas = np.arange(fin - inicio)
+
+        similitudes_texto = (matriz[inicio:fin] @ traspuesta).toarray()
+        similitudes_numericas = similitud_numerica.entre_posiciones(elegibles[inicio:fin], elegibles)
+        scores = puntuacion_hibrida(similitudes_texto, similitudes_numericas)
+        # Excluir el propio perfil
+        scores[filas, inicio + filas] = -1
+
+        top = np.argpartition(-scores, k_efectivo - 1, axis=1)[:, :k_efectivo]
+        scores_top = np.take_along_axis(scores, top, axis=1)
+        orden = np.argsort(-scores_top, axis=1, kind="stable")
+        top = np.take_along_axis(top, orden, axis=1)
+
+        destino = elegibles[inicio:fin]
+        tabla["vecinos"][destino, :k_efectivo] = elegibles[top]
+        tabla["puntuaciones"][destino, :k_efectivo] = np.take_along_axis(scores_top, orden, axis=1)
+        tabla["umbral"][destino] = [umbral_matches(fila) for fila in scores]
+
+    return tabla
+
+
+def guardar_tabla_matches(tabla, huella):
+    """Guardar la tabla como .npy (memory-mapeable) y borrar las de otras versiones"""
+    destino = ruta_tabla_matches(huella)
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    temporal = destino.with_suffix(".tmp")
+    with open(temporal, "wb") as f:
+        np.save(f, tabla)
+    os.replace(temporal, destino)
+
+    for antiguo in DIRECTORIO_CACHE.glob("topk-*.npy"):
+        if antiguo != destino:
+            antiguo.unlink(missing_ok=True)
+
+
+class TablaMatches:
+    """
+    Tabla de matches memory-mapeada desde disco.
+
+    Solo se leen del archivo los registros de los perfiles consultados; las
+    filas se identifican por la etiqueta del índice del DataFrame de origen.
+    """
+
+    def __init__(self, registros, index):
+        self.registros = registros
+        self.index = index
+        self.num_elegibles = int((registros["vecinos"][:, 0] >= 0).sum())
+
+    @classmethod
+    def cargar(cls, huella, index):
+        """Memory-mapear la tabla de esta huella; None si no se ha calculado"""
+        ruta = ruta_tabla_matches(huella)
+        if not ruta.exists():
+            return None
+        registros = np.load(ruta, mmap_mode="r")
+        if len(registros) != len(index):
+            return None
+        return cls(registros, index)
+
+    def cubre(self, perfiles_validos):
+        """La tabla sirve para este conjunto de perfiles elegibles (todos, sin filtros)"""
+        return len(perfiles_validos) == self.num_elegibles
+
+    def matches(self, fila):
+        """
+        Matches precalculados de un perfil.
+
+        Returns:
+            (etiquetas de los vecinos, scores, threshold), ordenados de mayor a menor score
+        """
+        registro = self.registros[self.index.get_loc(fila)]
+        validos = registro["vecinos"] >= 0
+        return (
+            self.index[registro["vecinos"][validos]],
+            registro["puntuaciones"][validos].astype(np.float64),
+            float(registro["umbral"]),
+        )
+
+
+def main():
+    inicio = time.perf_counter()
+    huella = huella_datos()
+    df = cargar_directorio()
+    indice_tfidf = cargar_indice_tfidf(df, huella)
+    similitud_numerica = SimilitudNumerica(df)
+    matriz_industrias = construir_multietiquetas(df).get("Industrias normalizadas")
+
+    tabla = calcular_tabla_matches(df, indice_tfidf, similitud_numerica, matriz_industrias)
+    guardar_tabla_matches(tabla, huella)
+
+    elegibles = int((tabla["vecinos"][:, 0] >= 0).sum())
+    print(f"Tabla de matches: {elegibles:,} perfiles elegibles de {len(df):,}, "
+          f"{tabla.nbytes / 1e6:.1f} MB, {time.perf_counter() - inicio:.1f} s")
+    print(f"  {ruta_tabla_matches(huella)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+# vecinos_aproximados.py
+"""
+Índice de vecinos aproximados (IVF) sobre los vectores TF-IDF del matchmaking.
+
+Para directorios muy grandes (varias comunidades fusionadas) el recorrido
+exacto de encontrar_matches crece linealmente con el número de perfiles.
+Este índice agrupa los perfiles por su centroide más cercano y solo
+compara cada consulta con los perfiles de unas pocas listas.
+
+Uso (informe de recall@k frente al recorrido exacto):
+    python vecinos_aproximados.py [K]
+"""
+
+import sys
+import time
+
+import numpy as np
+from sklearn.cluster import MiniBatchKMeans
+
+from data import cargar_directorio, guardar_arrays, huella_datos, ruta_indice
+from similitud import VERSION_INDICE_TFIDF, cargar_indice_tfidf
+
+# Versión del formato del índice: incrementar al cambiarlo
+VERSION_INDICE_IVF = 1
+
+# Listas recorridas por consulta: el control recall/latencia
+SONDAS_POR_DEFECTO = 4
+
+# Por debajo de este tamaño el recorrido exacto ya es inmediato
+MIN_PERFILES_ANN = 20_000
+
+# Perfiles puntuados para estimar el threshold adaptativo en modo aproximado
+MUESTRA_UMBRAL = 2000
+
+# Filas de muestra por centroide para entrenar el k-means
+MUESTRA_POR_LISTA = 64
+
+
+class IndiceIVF:
+    """
+    Índice de listas invertidas (IVF) con centroides de k-means esférico.
+
+    Cada perfil se guarda en la lista de su centroide más cercano (por
+    producto escalar, los vectores TF-IDF ya están normalizados). Una
+    consulta se compara con los centroides, recorre solo las `sondas`
+    listas más cercanas y reordena esos candidatos con el producto
+    escalar exacto. Más sondas = más recall y más candidatos.
+    """
+
+    def __init__(self, centroides, orden, limites):
+        self.centroides = np.asarray(centroides, dtype=np.float32)
+        # Posiciones de los perfiles agrupadas por lista (estilo CSR)
+        self.orden = np.asarray(orden, dtype=np.int32)
+        self.limites = np.asarray(limites, dtype=np.int64)
+
+    @property
+    def num_listas(self):
+        return len(self.centroides)
+
+    def __len__(self):
+        return len(self.orden)
+
+    @classmethod
+    def construir(cls, matriz, num_listas=None, semilla=0):
+        """
+        Entrenar los centroides sobre una muestra y asignar todos los perfiles.
+
+        Args:
+            matriz: Matriz TF-IDF (CSR, filas normalizadas L2)
+            num_listas: Número de listas (por defecto, ~raíz cuadrada del número de perfiles)
+            semilla: Semilla del muestreo y del k-means
+        """
+        n = matriz.shape[0]
+        num_listas = num_listas or int(np.clip(np.sqrt(n), 1, 4096))
+        num_listas = min(num_listas, n)
+
+        rng = np.random.default_rng(semilla)
+        muestra = rng.choice(n, size=min(n, num_listas * MUESTRA_POR_LISTA), replace=False)
+        kmeans = MiniBatchKMeans(num_listas, batch_size=2048, n_init=1, max_iter=20, random_state=semilla)
+        kmeans.fit(matriz[np.sort(muestra)])
+
+        # Centroides normalizados: el más cercano es el de mayor producto escalar
+        centroides = kmeans.cluster_centers_.astype(np.float32)
+        centroides /= np.maximum(np.linalg.norm(centroides, axis=1, keepdims=True), 1e-12)
+
+        return cls.agrupar(centroides, cls.asignar(centroides, matriz))
+
+    @staticmethod
+    def asignar(centroides, matriz):
+        """Lista (centroide más cercano) de cada fila de la matriz, por bloques"""
+        listas = np.empty(matriz.shape[0], dtype=np.int32)
+        for inicio in range(0, matriz.shape[0], 16384):
+            bloque = matriz[inicio:inicio + 16384] @ centroides.T
+            listas[inicio:inicio + 16384] = np.asarray(bloque).argmax(axis=1)
+        return listas
+
+    @classmethod
+    def agrupar(cls, centroides, listas):
+        """Índice a partir de la lista asignada a cada perfil"""
+        orden = np.argsort(listas, kind="stable")
+        limites = np.searchsorted(listas[orden], np.arange(len(centroides) + 1))
+        return cls(centroides, orden, limites)
+
+    def agregar(self, matriz_nuevas):
+        """Índice con perfiles nuevos al final, asignados a sus listas sin reentrenar los centroides"""
+        listas = np.empty(len(self), dtype=np.int32)
+        listas[self.orden] = np.repeat(np.arange(self.num_listas), np.diff(self.limites))
+        return self.agrupar(self.centroides, np.concatenate([listas, self.asignar(self.centroides, matriz_nuevas)]))
+
+    def candidatos(self, vector, sondas=SONDAS_POR_DEFECTO):
+        """Posiciones (ordenadas) de los perfiles de las `sondas` listas más cercanas al vector"""
+        sondas = min(sondas, self.num_listas)
+        cercania = self.centroides @ vector
+        listas = np.argpartition(-cercania, sondas - 1)[:sondas]
+        return np.sort(np.concatenate([self.orden[self.limites[l]:self.limites[l + 1]] for l in listas]))
+
+    def buscar(self, matriz, posicion, k=10, sondas=SONDAS_POR_DEFECTO):
+        """
+        Los k perfiles más similares (coseno TF-IDF) a uno dado, aproximados.
+
+        Returns:
+            (posiciones, similitudes) ordenadas de mayor a menor, sin el propio perfil
+        """
+        vector = matriz[posicion].toarray().ravel()
+        candidatos = self.candidatos(vector, sondas)
+        candidatos = candidatos[candidatos != posicion]
+        similitudes = matriz[candidatos] @ vector
+        top = np.argsort(-similitudes, kind="stable")[:k]
+        return candidatos[top], similitudes[top]
+
+    # --- Persistencia junto al snapshot de datos ---
+
+    def guardar(self, ruta):
+        """Guardar centroides y listas en un .npz (escritura atómica)"""
+        guardar_arrays(
+            ruta,
+            version=np.int32(VERSION_INDICE_IVF),
+            centroides=self.centroides,
+            orden=self.orden,
+            limites=self.limites,
+        )
+
+    @classmethod
+    def cargar(cls, ruta, n):
+        """Cargar un índice guardado; None si no existe, es de otra versión o de otro tamaño"""
+        if not ruta.exists():
+            return None
+        with np.load(ruta) as datos:
+            if int(datos["version"]) != VERSION_INDICE_IVF or len(datos["orden"]) != n:
+                return None
+            return cls(datos["centroides"], datos["orden"], datos["limites"])
+
+
+def ruta_indice_ivf(huella):
+    """Depende de la matriz TF-IDF, así que su nombre incluye también VERSION_INDICE_TFIDF"""
+    return ruta_indice("ivf", f"{huella}-t{VERSION_INDICE_TFIDF}")
+
+
+def cargar_indice_ivf(indice_tfidf, huella):
+    """
+    Índice IVF del directorio, leído de la caché en disco si existe para esta huella.
+
+    Si hay que construirlo se guarda junto al snapshot de datos.
+    """
+    ruta = ruta_indice_ivf(huella)
+    indice = IndiceIVF.cargar(ruta, len(indice_tfidf))
+    if indice is not None:
+        return indice
+
+    indice = IndiceIVF.construir(indice_tfidf.matriz)
+    try:
+        indice.guardar(ruta)
+    except OSError:
+        # La caché es una optimización: si no se puede escribir, seguimos sin ella
+        pass
+    return indice
+
+
+def informe_recall(indice_ivf, matriz, k=10, sondas=(1, 2, 4, 8, 16), consultas=200, semilla=0):
+    """
+    Recall@k del índice frente al recorrido exacto, para varios valores de sondas.
+
+    Un resultado aproximado cuenta como acierto si su similitud alcanza la
+    del k-ésimo vecino exacto (los empates no penalizan).
+
+    Returns:
+        Lista de dicts con sondas, recall, candidatos medios y latencias (ms)
+    """
+    n = matriz.shape[0]
+    rng = np.random.default_rng(semilla)
+    posiciones = rng.choice(n, size=min(consultas, n), replace=False)
+
+    # Camino exacto: producto con toda la matriz
+    umbrales, inicio = [], time.perf_counter()
+    for posicion in posiciones:
+        similitudes = matriz @ matriz[posicion].toarray().ravel()
+        similitudes[posicion] = -np.inf
+        umbrales.append(np.partition(similitudes, -k)[-k] if n > k else similitudes.min())
+    ms_exacto = (time.perf_counter() - inicio) * 1000 / len(posiciones)
+
+    informe = []
+    for s in sondas:
+        aciertos, num_candidatos, inicio = 0, 0, time.perf_counter()
+        for posicion, umbral in zip(posiciones, umbrales):
+            vecinos, similitudes = indice_ivf.buscar(matriz, posicion, k, s)
+            aciertos += int((similitudes >= umbral - 1e-6).sum())
+            num_candidatos += len(indice_ivf.candidatos(matriz[posicion].toarray().ravel(), s))
+        informe.append({
+            "sondas": s,
+            "recall": aciertos / (len(posiciones) * min(k, n - 1)),
+            "candidatos": num_candidatos / len(posiciones),
+            "ms_aproximado": (time.perf_counter() - inicio) * 1000 / len(posiciones),
+            "ms_exacto": ms_exacto,
+        })
+    return informe
+
+
+def imprimir_informe(informe, k):
+    print(f"  {'sondas':>6}  {'recall@' + str(k):>9}  {'candidatos':>10}  {'ms aprox.':>9}  {'ms exacto':>9}")
+    for fila in informe:
+        print(f"  {fila['sondas']:>6}  {fila['recall']:>9.3f}  {fila['candidatos']:>10.0f}  "
+              f"{fila['ms_aproximado']:>9.2f}  {fila['ms_exacto']:>9.2f}")
+
+
+def main():
+    k = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    huella = huella_datos()
+    indice_tfidf = cargar_indice_tfidf(cargar_directorio(), huella)
+    indice_ivf = cargar_indice_ivf(indice_tfidf, huella)
+    print(f"{len(indice_tfidf):,} perfiles, {indice_ivf.num_listas} listas")
+    imprimir_informe(informe_recall(indice_ivf, indice_tfidf.matriz, k), k)
+
+
+if __name__ == "__main__":
+    main()